@@ -27,14 +27,23 @@ import os, sys
 import datetime
 import subprocess
 import signal
+import threading
+import io
+import collections
 import cv2
 import glob
 import shutil
 from datetime import timedelta
 import numpy as np
+from RPiCamLib import jpeg_size,yuv_release,yuv_rgb,fake_frame,small_rgb,tile_scores,hist_counts,hist_log,hist_trace
 import math
 from gpiozero import Button
 from gpiozero import LED
+try:
+    from picamera2 import Picamera2
+    from libcamera import Transform
+except ImportError:
+    Picamera2 = None
 
 version      = 6.05
 
@@ -61,6 +70,56 @@ STR         = 12  # external GPIO trigger for capture
 # set alt_dis = 0 for normal, 1 for a square display, 2 for a 16x9 camera ONLY !! 
 alt_dis     = 0
 
+# set preview_pipe = 1 to read preview frames from rpicam-vid stdout, 2 to read raw yuv420 frames from stdout (no jpeg encode / decode),
+# 0 to use jpg files in /run/shm
+preview_pipe = 1
+yuv_align    = 64  # row stride alignment (bytes) of rpicam-vid yuv420 output
+ring_size    = 3   # number of preview frames held waiting for display, newest wins
+show_fstats  = 0   # set to 1 to print preview frame statistics every 10 seconds
+show_times   = 0   # set to 1 to show preview stage times (p50 / p95 / p99 ms) and touch response times on the preview
+log_times    = 0   # set to 1 to log preview stage times of every frame to /run/shm/preview_times.csv
+fast_decode  = 1   # set to 1 to decode preview jpgs at reduced size (1/2,1/4,1/8) when large enough for the preview
+preview_plan = 1   # set to 1 to size the preview stream from display size, zoom and sensor modes, 0 for fixed sizes per camera
+rgb_mode     = 0   # RGB: readout of the histogram area, 0 = peak levels averaged over the last sam frames, 1 = mean, 2 = median
+peaking      = 0   # set to 1 to show a focus peaking overlay, edges stronger than peak_level in peak_color
+peak_level   = 40  # focus peaking edge threshold (Laplacian of the reduced luminance)
+peak_scale   = 4   # focus peaking map is computed at 1/peak_scale of the preview size
+peak_every   = 2   # focus peaking map is recomputed every peak_every preview frames
+peak_color   = (255,0,255)
+zebra        = 0   # set to 1 to stripe highlights at or above zebra_high (red) and shadows at or below zebra_low (blue)
+zebra_high   = 250
+zebra_low    = 5
+zebra_rgb    = 0   # set to 1 to stripe pixels where any one of R, G, B clips, 0 to use luminance
+zebra_scale  = 2   # zebra map is computed at 1/zebra_scale of the preview size
+zebra_every  = 2   # zebra map is recomputed every zebra_every preview frames
+tile_map     = 0   # set to 1 to score focus over a tile_cols x tile_rows grid of the preview and outline the sharpest tiles
+tile_cols    = 8
+tile_rows    = 6
+tile_scale   = 4   # tile scores are computed at 1/tile_scale of the preview size
+tile_metric  = 0   # tile focus score, 0 = Laplacian variance, 1 = Tenengrad, 2 = Brenner
+tile_best    = 3   # number of sharpest tiles outlined
+auto_spot    = 0   # set to 1 to move the spot focus window to the sharpest tile (AF cameras, not zoomed)
+af_coarse    = 9   # lens positions scored in the first pass of the autofocus sweep (both focus buttons, or right click FOCUS)
+af_fine      = 4   # the autofocus sweep stops when the step between lens positions is this small
+af_settle    = 1   # preview frames skipped after each lens move of the autofocus sweep
+ana_budget   = 8   # ms per preview frame for peaking, zebra, tiles, histogram, noise and focus, analyses that are due wait
+                   # for a later frame once it is used up, but never more than 4 x their cadence (0 = no limit)
+hist_every   = 1   # histogram, scope and RGB readout are recomputed every hist_every preview frames
+noise_every  = 1   # noise readout is recomputed every noise_every preview frames
+focus_every  = 1   # focus readout is recomputed every focus_every preview frames (every frame during an autofocus sweep)
+tile_every   = 2   # tile focus scores are recomputed every tile_every preview frames
+preview_worker = 0 # set to 1 to decode, scale and rotate preview frames in a worker thread, the main loop then only blits them
+text_cache_n = 256 # rendered messages kept by text(), least recently used are dropped
+press_bounce = 0.04 # a release within press_bounce seconds of its press is taken as contact bounce and ignored
+press_gap    = 0.2 # held buttons repeat every press_gap seconds
+restart_quiet = 0.3 # changes that restart rpicam-vid are applied together, once no button has been pressed for restart_quiet seconds
+press_repeat = 0   # set to 1 to repeat a setting button held for press_hold seconds, every press_gap seconds
+press_hold   = 0.5
+
+# preview backend: 0 = rpicam-vid (restarted on every change), 1 = Picamera2 session (control changes and zoom applied live),
+# 2 = fake test pattern session (for testing without camera frames)
+preview_backend = 0
+
 # set default values (see limits below)
 camera      = 0    # choose camera to use, usually 0 unless using a Pi5 or multiswitcher
 mode        = 1    # set camera mode ['manual','normal','sport'] 
@@ -90,6 +149,7 @@ level       = 0    # set h264 level
 histogram   = 5    # OFF = 0, 1 = red, 2 = green, 3 = blue, 4 = luminance, 5 = ALL
 histarea    = 50   # set histogram area size
 ns          = 2    # Noise sampling area size
+noise_mode  = 0    # Noise readout, 0 = level range of the ns area, 1 = sigma and SNR (dB) per channel of the histogram area
 v3_f_mode   = 0    # v3 focus mode,  see v3_f_modes below
 v3_f_range  = 0    # v3 focus range, see v3_f_ranges below
 v3_f_speed  = 0    # v3 focus speed, see v3_f_speeds below
@@ -121,6 +181,9 @@ config_file = "/home/" + Home_Files[0]+ "/" + con_file
 # inital parameters
 prev_fps    = 20 
 focus_fps   = 25
+auto_fps    = 0    # set to 1 to adjust prev_fps / focus_fps to the rate the Pi can sustain
+fps_min     = 5
+fps_max     = 30
 focus       = 700
 foc_man     = 0
 focus_mode  = 0
@@ -148,10 +211,84 @@ v3_af       = 1
 v5_af       = 1
 sam         = 50
 ct          = 0
-ravs        = [0] * sam
-gavs        = [0] * sam
-bavs        = [0] * sam
+rgb_n       = 0
+rgb_buf     = np.zeros((sam,3),dtype=np.int64)
+rgb_sum     = np.zeros(3,dtype=np.int64)
 bits        = bitrate * 1000000
+pipe_ring   = collections.deque(maxlen=ring_size)
+frame_stats = {'arrived':0,'decoded':0,'displayed':0,'dropped':0}
+fstats_time = time.monotonic()
+pipe_gen    = 0
+pipe_lock   = threading.Lock()
+pipe_event  = threading.Event()
+work_lock   = threading.Lock()
+work_ready  = None
+work_free   = collections.deque()
+work_held   = None
+p           = None
+picam2      = None
+sess_type   = 0
+sess_key    = None
+sess_max    = (0,0,0,0)
+sess_ctrls  = {}
+sess_thread = None
+upd_batch   = 0
+upd_rects   = []
+stages      = ['wait','decode','scale','blit','analysis','update','total']
+stage_times = {}
+for key in stages:
+    stage_times[key] = collections.deque(maxlen=200)
+trec        = {}
+tlast       = 0
+tlog        = None
+frame_time  = 0
+yuv_w       = 0
+yuv_h       = 0
+yuv_out     = None
+yuv_y       = None
+gov_cost    = collections.deque(maxlen=100)
+gov_time    = 0
+hist_out    = np.zeros((256,100,3),dtype=np.uint8)
+hist_surf   = None
+scope_time  = 0
+scope_hist  = 0
+peak_out    = None
+peak_surf   = None
+zebra_pat   = None
+noise_prev  = None
+noise_cur   = None
+noise_key   = None
+noise_n     = 0
+noise_sig   = np.zeros(3)
+noise_mean  = np.zeros(3)
+zebra_surf  = None
+zebra_big   = None
+tile_score  = None
+tile_spot   = (-1,-1)
+tile_area   = Rect(0,0,0,0)
+tile_time   = 0
+af_state    = 0
+af_todo     = []
+af_scores   = {}
+af_step     = 0
+af_wait     = 0
+af_time     = 0
+ana_frame   = 0
+ana_start   = 0
+ana_last    = {}
+ana_key     = {}
+ana_time    = {}
+ana_res     = {}
+text_fonts  = {}
+text_cache  = collections.OrderedDict()
+touch_time  = 0
+touch_ms    = collections.deque(maxlen=50)
+press_start = 0
+press_time  = 0
+handled     = 0
+press_held  = None
+gpio_key    = None
+gpio_time   = 0
 
 if tinterval > 0:
     tduration  = tshots * tinterval
@@ -212,7 +349,7 @@ denoises     = ['off','cdn_off','cdn_fast','cdn_hq']
 v3_f_modes   = ['auto','manual','continuous']
 v3_f_ranges  = ['normal','macro','full']
 v3_f_speeds  = ['normal','fast']
-histograms   = ["OFF","Red","Green","Blue","Lum","ALL"]
+histograms   = ["OFF","Red","Green","Blue","Lum","ALL","Wave","Vect"]
 strs         = ["Still","Video","Stream","Timelapse"]
 v3_hdrs      = ["off","single-exp","auto","sensor"]
 st_scales    = ["","FULL","1/2 Scale","","1/4 Scale","","","","2x2 Binning"]
@@ -611,85 +748,187 @@ yellowColor = pygame.Color(255, 255,   0)
 blueColor =   pygame.Color(  0,   0, 255)
 redColor =    pygame.Color(200,   0,   0)
 
+def layout():
+    # screen area of every button for this display (pre_width x pre_height, alt_dis) and button size (bw x bh), kept in
+    # cells[(col,row)]. button(), text(), the bars and cell_at() look them up instead of working them out on each call,
+    # and skip buttons that are not in the table
+    global cells,cell_top
+    cells = {}
+    if alt_dis == 1:
+        cell_top = pre_height
+    elif alt_dis == 2:
+        cell_top = int(pre_height * 0.75)
+    else:
+        cell_top = 0
+    rows = int(pre_height/bh) + 1
+    if alt_dis > 0:
+        rows = 16
+    for col in range(0,2):
+        for row in range(0,rows):
+            if alt_dis == 0:
+                bx = pre_width + (col * bw)
+                by = row * bh
+            else:
+                # rows 0-7 and 8-15 of each column are two lines of buttons below the preview
+                bx = (row % 8) * bw
+                by = cell_top + (((col * 2) + (row // 8)) * bh)
+            cells[(col,row)] = Rect(bx,by,bw,bh)
+
+def cell_rect(col,row):
+    # screen area of the button at col,row, as laid out by button(), empty if there is no such button
+    return cells.get((col,row),Rect(0,0,0,0))
+
+def cell_at(x,y):
+    # button_column (1,2), button_row (from 1) and button_pos of the button at x,y, 0,0,0 if there is none.
+    # button_pos is which half of the button was pressed, with alt_dis 0 counted across both columns (0-3)
+    if alt_dis == 0:
+        if x <= pre_width:
+            return 0,0,0
+        col = int((x - pre_width) / bw)
+        row = int(y / bh)
+    else:
+        if y <= cell_top or y - cell_top >= bh * 4:
+            return 0,0,0
+        line = int((y - cell_top) / bh)
+        col = line // 2
+        row = int(x / bw) + ((line % 2) * 8)
+    if (col,row) not in cells:
+        return 0,0,0
+    pos = 0
+    if x > cells[(col,row)].x + (bw/2):
+        pos = 1
+    if alt_dis == 0:
+        pos += col * 2
+    return col + 1,row + 1,pos
+
+layout()
+
+def press_down(pos,button):
+    # start auto repeat of a held setting button, not the capture buttons (row 1 and timelapse)
+    global press_held,press_start
+    press_start = time.monotonic()
+    col,row,bpos = cell_at(pos[0],pos[1])
+    if press_repeat == 1 and col > 0 and row > 1 and (col,row) != (2,10):
+        press_held = [pos,button,time.monotonic(),0]
+
+def press_again():
+    # post the held press again every press_gap seconds, once it has been held for press_hold seconds
+    now = time.monotonic()
+    if now - press_held[2] < press_hold:
+        return
+    press_held[2] = now - press_hold + press_gap
+    press_held[3] += 1
+    pygame.event.post(pygame.event.Event(MOUSEBUTTONUP,{"button":press_held[1],"pos":press_held[0],"held":1}))
+
+def press_up(event):
+    # 1 if a button release should be handled. Auto repeated presses are, the release that ends them is not,
+    # and a release within press_bounce seconds of its press is taken as contact bounce. press_time is when the last one was handled
+    global press_held,press_time
+    now = time.monotonic()
+    if event.dict.get("held",0) == 1:
+        press_time = now
+        return 1
+    if press_held != None:
+        reps = press_held[3]
+        press_held = None
+        if reps > 0:
+            return 0
+    if cell_at(event.pos[0],event.pos[1])[0] > 0 and now - press_start < press_bounce:
+        return 0
+    press_time = now
+    return 1
+
+def press_gpio(key):
+    # 1 if a held GPIO button should step now, at once when pressed, then every press_gap seconds once held for press_hold seconds
+    global gpio_key,gpio_time
+    now = time.monotonic()
+    if key != gpio_key:
+        gpio_key  = key
+        gpio_time = now + press_hold
+        return 1
+    if now < gpio_time:
+        return 0
+    gpio_time = now + press_gap
+    return 1
+
+def show_rect(rect):
+    # send rect of the window to the display, or queue it while a batch of draws is being collected
+    if upd_batch > 0:
+        upd_rects.append(Rect(rect))
+    else:
+        pygame.display.update(rect)
+
+def batch_start():
+    # collect display updates from button(), text(), draw_bar() etc. until batch_end()
+    global upd_batch
+    upd_batch += 1
+
+def batch_end():
+    # send all rects collected since batch_start() to the display in one update
+    global upd_batch,upd_rects
+    upd_batch -= 1
+    if upd_batch > 0 or len(upd_rects) == 0:
+        return
+    rects = []
+    for r in upd_rects:
+        if r not in rects:
+            rects.append(r)
+    upd_rects = []
+    keep = []
+    for r in rects:
+        inside = 0
+        for o in rects:
+            if o is not r and o.contains(r):
+                inside = 1
+        if inside == 0:
+            keep.append(r)
+    pygame.display.update(keep)
+
 def button(col,row,bkgnd_Color,border_Color):
     global pre_width,bw,bh,alt_dis,pre_height
     colors = [greyColor, dgryColor,yellowColor,purpleColor,greenColor,whiteColor,lgrnColor,lpurColor,lyelColor,blueColor]
     Color = colors[bkgnd_Color]
-    if alt_dis == 0:
-        bx = pre_width + (col * bw)
-        by = row * bh
-    else:
-        if col == 0:
-            if row < 8:
-                bx = row * bw
-                if alt_dis == 1:
-                    by = pre_height
-                else:
-                    by = pre_height * 0.75
-            else:
-                bx = (row - 8) * bw
-                if alt_dis == 1:
-                    by = pre_height + bh
-                else:
-                    by = (pre_height *.75 + bh) 
-        elif row < 8:
-            bx = row * bw
-            if alt_dis == 1:
-                by = pre_height + (bh*2)
-            else:
-                by = (pre_height *.75 + (bh*2)) 
-        else:
-            bx = (row - 8) * bw
-            if alt_dis == 1:
-                by = pre_height + (bh*3)
-            else:
-                by = (pre_height *.75 + (bh*3)) 
+    if (col,row) not in cells:
+        return
+    bx,by = cells[(col,row)].topleft
     pygame.draw.rect(windowSurfaceObj,Color,Rect(bx+1,by,bw-2,bh))
     pygame.draw.line(windowSurfaceObj,whiteColor,(bx,by),(bx,by+bh-1),3)
     pygame.draw.line(windowSurfaceObj,whiteColor,(bx,by),(bx+bw-1,by),2)
     pygame.draw.line(windowSurfaceObj,dgryColor,(bx,by+bh-1),(bx+bw-1,by+bh-1),1)
     pygame.draw.line(windowSurfaceObj,dgryColor,(bx+bw-2,by),(bx+bw-2,by+bh),2)
-    pygame.display.update()
+    show_rect(cell_rect(col,row).inflate(2,2))
+
+def text_font(fsize):
+    # the text font at size fsize, loaded once for each size
+    if fsize not in text_fonts:
+        if os.path.exists ('/usr/share/fonts/truetype/freefont/FreeSerif.ttf'): 
+            text_fonts[fsize] = pygame.font.Font('/usr/share/fonts/truetype/freefont/FreeSerif.ttf', fsize)
+        else:
+            text_fonts[fsize] = pygame.font.Font(None, fsize)
+    return text_fonts[fsize]
+
+def text_render(msg,fsize,fColor,Color):
+    # msg rendered at size fsize in colour fColor, from a cache of the last text_cache_n rendered messages
+    key = (msg,fsize,fColor)
+    if key in text_cache:
+        text_cache.move_to_end(key)
+        return text_cache[key]
+    msgSurfaceObj = text_font(fsize).render(msg, False, Color)
+    text_cache[key] = msgSurfaceObj
+    if len(text_cache) > text_cache_n:
+        text_cache.popitem(last=False)
+    return msgSurfaceObj
 
 def text(col,row,fColor,top,upd,msg,fsize,bkgnd_Color):
     global bh,pre_width,fv,tduration
     colors =  [dgryColor, greenColor, yellowColor, redColor, purpleColor, blueColor, whiteColor, greyColor, blackColor, purpleColor,lgrnColor,lpurColor,lyelColor]
     Color  =  colors[fColor]
     bColor =  colors[bkgnd_Color]
-    if alt_dis == 0:
-        bx = pre_width + (col * bw)
-        by = row * bh
-    else:
-        if col == 0:
-            if row < 8:
-                bx = row * bw
-                if alt_dis == 1:
-                    by = pre_height
-                else:
-                    by = pre_height * 0.75
-            else:
-                bx = (row - 8) * bw
-                if alt_dis == 1:
-                    by = pre_height + bh
-                else:
-                    by = (pre_height *.75 + bh)
-        elif row < 8:
-            bx = row * bw
-            if alt_dis == 1:
-                by = pre_height + (bh*2)
-            else:
-                by = (pre_height *.75 + (bh*2))
-        else:
-            bx = (row - 8) * bw
-            if alt_dis == 1:
-                by = pre_height + (bh*3)
-            else:
-                by = (pre_height *.75 + (bh*3))
-    if os.path.exists ('/usr/share/fonts/truetype/freefont/FreeSerif.ttf'): 
-        fontObj = pygame.font.Font('/usr/share/fonts/truetype/freefont/FreeSerif.ttf', int(fsize))
-    else:
-        fontObj = pygame.font.Font(None, int(fsize))
-    msgSurfaceObj = fontObj.render(msg, False, Color)
+    if top != 2:
+        if (col,row) not in cells:
+            return
+        bx,by = cells[(col,row)].topleft
+    msgSurfaceObj = text_render(msg,int(fsize),fColor,Color)
     msgRectobj = msgSurfaceObj.get_rect()
     if msg == "Save      EXIT" or msg == "Load      EXIT" or msg == "CAPTURE STILL" or msg == "CAPTURE/Stream" or msg == "CAP T/LPSE" or msg == "CAPTURING" :
         pygame.draw.rect(windowSurfaceObj,bColor,Rect(bx+2,by+int(bh/3)-3,bw-4,int(bh/3)))
@@ -709,9 +948,9 @@ def text(col,row,fColor,top,upd,msg,fsize,bkgnd_Color):
         msgRectobj.topleft = (0,row * fsize)
     windowSurfaceObj.blit(msgSurfaceObj, msgRectobj)
     if upd == 1 and top == 2:
-        pygame.display.update(0,0,pre_width,fv*2)
-    if upd == 1:
-        pygame.display.update(bx, by, bw, bh)
+        show_rect(Rect(0,row * fsize,pre_width,max(fv*2,msgRectobj.height)))
+    elif upd == 1:
+        show_rect(Rect(bx, by, bw, bh))
 
 def draw_bar(col,row,color,msg,value):
     global bw,bh,pre_width,still_limits,max_speed,v3_mag
@@ -721,19 +960,13 @@ def draw_bar(col,row,color,msg,value):
             pmax = still_limits[f+2]
     if msg == "speed":
         pmax = max_speed
+    if (col,row) not in cells:
+        return
+    bx,by = cells[(col,row)].topleft
     if alt_dis == 0:
-        pygame.draw.rect(windowSurfaceObj,color,Rect(pre_width + col*bw + 2,(row * bh) + 1,bw-4,int(bh/3)-1))
+        pygame.draw.rect(windowSurfaceObj,color,Rect(bx + 2,by + 1,bw-4,int(bh/3)-1))
     else:
-        if row < 8:
-            if alt_dis == 1:
-                pygame.draw.rect(windowSurfaceObj,color,Rect(row*bw,pre_height ,bw-1,int(bh/3)))
-            else:
-                pygame.draw.rect(windowSurfaceObj,color,Rect(row*bw,int(pre_height *.75) ,bw-1,int(bh/3)))
-        else:
-            if alt_dis == 1:
-                pygame.draw.rect(windowSurfaceObj,color,Rect((row-8)*bw,pre_height + bh,bw-1,int(bh/3)))
-            else:
-                pygame.draw.rect(windowSurfaceObj,color,Rect((row-8)*bw,int((pre_height *.75) + bh),bw-1,int(bh/3)))
+        pygame.draw.rect(windowSurfaceObj,color,Rect(bx,by,bw-1,int(bh/3)))
     if pmin > -1: 
         j = int((value / (pmax - pmin) * bw) * 0.93)
         jag = int((mag / (pmax - pmin) * bw) * 0.93)
@@ -741,26 +974,14 @@ def draw_bar(col,row,color,msg,value):
         j = int((bw/2) + (value / (pmax - pmin)  * bw) * 0.93)
     j = min(j,bw-5)
     if alt_dis == 0:
-        pygame.draw.rect(windowSurfaceObj,(0,200,0),Rect(int(pre_width + int(col*bw) + 2),int(row * bh) + 1,int(j-1),int(bh/3)-1))
+        pygame.draw.rect(windowSurfaceObj,(0,200,0),Rect(bx + 2,by + 1,int(j-1),int(bh/3)-1))
         if msg == "gain" and value > mag:
-           pygame.draw.rect(windowSurfaceObj,(200,200,0),Rect(int(pre_width + int(col*bw) + 2 + jag),int(row * bh),int(j-1 - jag),int(bh/3)-1))
-        pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width + int(col*bw) + j + 2),int(row * bh) + 1,3,int(bh/3)-1))
+           pygame.draw.rect(windowSurfaceObj,(200,200,0),Rect(bx + 2 + jag,by,int(j-1 - jag),int(bh/3)-1))
+        pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(bx + j + 2,by + 1,3,int(bh/3)-1))
     else:
-        if row < 8:
-            if alt_dis == 1:
-                pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(int((row*bw) + 2),pre_height ,int(j+1),int(bh/3)))
-                pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int((row*bw) + j) ,pre_height ,3,int(bh/3)))
-            else:
-                pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(int((row*bw) + 2),int(pre_height * 0.75),int(j+1),int(bh/3)))
-                pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int((row*bw) + j) ,int(pre_height * 0.75) ,3,int(bh/3)))
-        else:
-            if alt_dis == 1:
-                pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(int(((row-8)*bw) + 2),int(pre_height + bh),int(j+1),int(bh/3)))
-                pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(((row-8)*bw) + j) ,int(pre_height +  bh),3,int(bh/3)))
-            else:
-                pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(int(((row-8)*bw) + 2),int((pre_height *.75) + bh),int(j+1),int(bh/3)))
-                pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(((row-8)*bw) + j) ,int((pre_height *.75) + bh),3,int(bh/3)))
-    pygame.display.update()
+        pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(bx + 2,by,int(j+1),int(bh/3)))
+        pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(bx + j,by,3,int(bh/3)))
+    show_rect(cell_rect(col,row))
 
 def draw_Vbar(bpos,col,row,color,msg,value):
     global bw,bh,pre_width,video_limits
@@ -770,98 +991,963 @@ def draw_Vbar(bpos,col,row,color,msg,value):
             pmax = video_limits[f+2]
     if msg == "vformat":
         pmax = max_vformat
+    if (col,row) not in cells:
+        return
+    bx,by = cells[(col,row)].topleft
     if alt_dis == 0:
-        pygame.draw.rect(windowSurfaceObj,color,Rect(pre_width + col*bw + 2 ,(row * bh) + 1,bw-4,int(bh/3)-1))
+        pygame.draw.rect(windowSurfaceObj,color,Rect(bx + 2,by + 1,bw-4,int(bh/3)-1))
     else:
-        if row < 8:
-            if alt_dis == 1:
-                 pygame.draw.rect(windowSurfaceObj,color,Rect(row*bw,pre_height + (bh*2),bw-1,int(bh/3)))
-            else:
-                 pygame.draw.rect(windowSurfaceObj,color,Rect(row*bw,int((pre_height *.75) + (bh*2)),bw-1,int(bh/3)))
-        else:
-            if alt_dis == 1:
-                pygame.draw.rect(windowSurfaceObj,color,Rect((row-8)*bw,pre_height + (bh*3),bw-1,int(bh/3)))
-            else:
-                pygame.draw.rect(windowSurfaceObj,color,Rect((row-8)*bw,int((pre_height *.75) + (bh*3)),bw-1,int(bh/3)))
+        pygame.draw.rect(windowSurfaceObj,color,Rect(bx,by,bw-1,int(bh/3)))
     if pmin > -1: 
         j = int((value / (pmax - pmin)  * bw) * 0.92)
     else:
         j = int(((bw/2) + (value / (pmax - pmin)  * bw)) * 0.92)
     j = min(j,bw-5)
     if alt_dis == 0 and bpos == 0:
-        pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(int(pre_width + int(col*bw) + 2),int(row * bh)+1,int(j-1),int(bh/3)-1))
-        pygame.draw.rect(windowSurfaceObj,(155,0,150),  Rect(int(pre_width + int(col*bw) + j + 2),int(row * bh)+1,3,int(bh/3)-1))
+        pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(bx + 2,by + 1,int(j-1),int(bh/3)-1))
+        pygame.draw.rect(windowSurfaceObj,(155,0,150),  Rect(bx + j + 2,by + 1,3,int(bh/3)-1))
     elif alt_dis == 0 and bpos > 0:
-        pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(int(pre_width + int(col*bw) + 2),int(row * bh)+1,int(bpos * bw),int(bh/3)-1))
-        pygame.draw.rect(windowSurfaceObj,(155,0,150),  Rect(int(pre_width + int(col*bw) + int(bpos * bw) + 2),int(row * bh)+1,3,int(bh/3)-1))
+        pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(bx + 2,by + 1,int(bpos * bw),int(bh/3)-1))
+        pygame.draw.rect(windowSurfaceObj,(155,0,150),  Rect(bx + int(bpos * bw) + 2,by + 1,3,int(bh/3)-1))
+    else:
+        pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(bx + 2,by,int(j+1),int(bh/3)))
+        pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(bx + j,by,3,int(bh/3)))
+    show_rect(cell_rect(col,row))
+
+def pipe_reader(proc,gen):
+    # read MJPEG stream from rpicam-vid stdout, split into frames on SOI/EOI markers and queue them in pipe_ring
+    buf = bytearray()
+    scan = 0
+    while True:
+        try:
+            chunk = proc.stdout.read1(65536)
+        except (OSError, ValueError):
+            break
+        if not chunk:
+            break
+        buf += chunk
+        while True:
+            soi = buf.find(b'\xff\xd8')
+            if soi < 0:
+                # keep the last byte, it may be the start of a marker
+                del buf[:max(len(buf) - 1,0)]
+                scan = 0
+                break
+            if soi > 0:
+                del buf[:soi]
+                scan = max(scan - soi,2)
+            eoi = buf.find(b'\xff\xd9',max(scan,2))
+            if eoi < 0:
+                scan = max(len(buf) - 1,2)
+                break
+            with pipe_lock:
+                if gen == pipe_gen:
+                    if len(pipe_ring) == pipe_ring.maxlen:
+                        frame_stats['dropped'] += 1
+                    pipe_ring.append((time.time(),bytes(buf[:eoi + 2])))
+                    frame_stats['arrived'] += 1
+                    pipe_event.set()
+            del buf[:eoi + 2]
+            scan = 0
+
+def pipe_latest():
+    # return newest complete preview frame from the pipe, or None if no new frame
+    # older frames still waiting are stale, they are counted as dropped and never decoded
+    global frame_time
+    jpg = None
+    with pipe_lock:
+        if len(pipe_ring) > 0:
+            frame_time,jpg = pipe_ring.pop()
+            frame_stats['dropped'] += len(pipe_ring)
+            for old in pipe_ring:
+                yuv_release(old[1])
+            pipe_ring.clear()
+    return jpg
+
+def file_latest():
+    # return newest complete preview jpg written to /run/shm by rpicam-vid, or None if no new frame. Older files are dropped
+    global frame_time
+    pics = glob.glob('/run/shm/*.jpg')
+    if len(pics) < 2:
+        return None
+    pics.sort(reverse=True)
+    # pics[0] is still being written, pics[1] is the newest complete frame
+    with pipe_lock:
+        frame_stats['arrived'] += len(pics) - 1
+        frame_stats['dropped'] += len(pics) - 2
+    try:
+        frame_time = os.path.getmtime(pics[1])
+        with open(pics[1],'rb') as f:
+            jpg = f.read()
+        for tt in range(1,len(pics)):
+             os.remove(pics[tt])
+    except OSError:
+        return None
+    return jpg
+
+def frame_stats_report():
+    # print preview frame counts and rates since the last report
+    global fstats_time
+    now = time.monotonic()
+    if now - fstats_time < 10:
+        return
+    with pipe_lock:
+        fs = dict(frame_stats)
+        for key in frame_stats:
+            frame_stats[key] = 0
+    secs = now - fstats_time
+    fstats_time = now
+    msg = "Preview frames: "
+    for key in fs:
+        msg += key + " " + str(fs[key]) + " (" + str(round(fs[key]/secs,1)) + "/s) "
+    print(msg)
+
+def yuv_reader(proc,gen,w,h):
+    # read yuv420 frames of known size from rpicam-vid stdout into a pool of reused buffers and queue them in pipe_ring.
+    # Frames carry the pool's free list, a buffer is only read into again once its consumer has given it back with yuv_release()
+    stride = (w + yuv_align - 1) // yuv_align * yuv_align
+    size = (stride * h * 3) // 2
+    free = collections.deque()
+    for x in range(0,ring_size + 2):
+        free.append(np.empty(size,dtype=np.uint8))
+    while True:
+        if len(free) > 0:
+            buf = free.popleft()
+        else:
+            buf = np.empty(size,dtype=np.uint8)
+        mv = memoryview(buf)
+        got = 0
+        while got < size:
+            try:
+                r = proc.stdout.readinto(mv[got:])
+            except (OSError, ValueError):
+                r = 0
+            if not r:
+                return
+            got += r
+        with pipe_lock:
+            if gen != pipe_gen:
+                return
+            if len(pipe_ring) == pipe_ring.maxlen:
+                frame_stats['dropped'] += 1
+                yuv_release(pipe_ring[0][1])
+            pipe_ring.append((time.time(),(buf,w,h,stride,free)))
+            frame_stats['arrived'] += 1
+            pipe_event.set()
+
+def yuv_surface(frm):
+    # convert a yuv420 frame to an RGB surface at the size the main loop shows it, the scaled Y plane is kept in yuv_y for analysis
+    global yuv_out,yuv_y
+    yuv_out,rgb = yuv_rgb(frm,yuv_out,preview_target(frm[1],frm[2]))
+    yuv_release(frm)
+    yuv_y = yuv_out[0:rgb.shape[0]]
+    return pygame.image.frombuffer(rgb.tobytes(),(rgb.shape[1],rgb.shape[0]),"RGB")
+
+def preview_target(w,h):
+    # size the preview frame is scaled to in the main loop, in frame orientation (before any rotate)
+    if Pi_Cam == 4 and zoom > 1 and zoom < 6:
+        return pre_width,int(pre_width * (h/w))
+    if rotate == 0:
+        if igw/igh > 1.5:
+            return pre_width,int(pre_height * 0.75)
+        return pre_width,pre_height
+    if rotate == 2:
+        return pre_width,pre_height
+    if igw/igh > 1.5 and alt_dis == 2:
+        th = int(pre_height * .75)
+    else:
+        th = pre_height
+    return th,int(th * (h/w))
+
+def zoom_crop():
+    # part of the sensor shown in the preview at the current zoom, as fractions of igw,igh
+    return zfs[zoom],zfs[zoom]
+
+def plan_preview(fw,fh):
+    # smallest preview stream size that still fills the display (and histarea) for a sensor crop of fw x fh (fractions of igw x igh),
+    # plus the smallest full field sensor mode from --list-cameras that covers it. Returns width,height,mode ("" if none suitable)
+    cw = igw * fw
+    ch = igh * fh
+    tw,th = preview_target(cw,ch)
+    tw = max(tw,histarea * 2)
+    th = max(th,histarea * 2)
+    scale = min(max(tw/cw,th/ch),1)
+    pw = int(math.ceil(cw * scale / 2) * 2)
+    ph = int(math.ceil(ch * scale / 2) * 2)
+    pmode = ""
+    best = 0
+    for x in range(0,len(vwidths2)):
+        if abs((vwidths2[x]/vheights2[x]) - (igw/igh)) < 0.01 and vwidths2[x] * fw >= pw and vheights2[x] * fh >= ph:
+            if best == 0 or vwidths2[x] * vheights2[x] < best:
+                best = vwidths2[x] * vheights2[x]
+                pmode = str(vwidths2[x]) + ":" + str(vheights2[x])
+    return pw,ph,pmode
+
+def decode_rgb(jpg):
+    # decode a preview jpeg to an RGB array, letting the jpeg decoder scale it by 1/8, 1/4 or 1/2 if the result still covers the preview
+    flag = cv2.IMREAD_COLOR
+    size = jpeg_size(jpg)
+    if size != None and fast_decode == 1:
+        tw,th = preview_target(size[0],size[1])
+        for red,rflag in ((8,cv2.IMREAD_REDUCED_COLOR_8),(4,cv2.IMREAD_REDUCED_COLOR_4),(2,cv2.IMREAD_REDUCED_COLOR_2)):
+            if size[0]//red >= tw and size[1]//red >= th:
+                flag = rflag
+                break
+    img = cv2.imdecode(np.frombuffer(jpg,dtype=np.uint8),flag)
+    if img is None:
+        return None
+    return cv2.cvtColor(img,cv2.COLOR_BGR2RGB)
+
+def decode_jpeg(jpg):
+    # decode a preview jpeg to a surface, at reduced size if fast_decode is set
+    img = decode_rgb(jpg)
+    if img is None:
+        return None
+    return pygame.image.frombuffer(img.tobytes(),(img.shape[1],img.shape[0]),"RGB")
+
+def preview_controls():
+    # libcamera controls matching the current settings, as used by rpicam-vid in preview()
+    speed2 = min(sspeed,2000000)
+    ctrls = {"Brightness":brightness/100,"Contrast":contrast/100,"Saturation":saturation/10,"Sharpness":sharpness/10}
+    ctrls["ExposureValue"] = ev
+    if mode == 0:
+        ctrls["AeEnable"] = False
+        ctrls["ExposureTime"] = int(speed2)
+        fps = min(1000000/speed2,25)
+    else:
+        ctrls["AeEnable"] = True
+        ctrls["AeExposureMode"] = [0,0,1][mode] # normal, sport = short
+        if zoom > 0:
+            fps = focus_fps
+        else:
+            fps = prev_fps
+    ctrls["FrameDurationLimits"] = (int(1000000/fps),int(1000000/fps))
+    if sspeed > 5000000 and mode == 0:
+        ctrls["AnalogueGain"] = 1.0
+        ctrls["AwbEnable"] = False
+        ctrls["ColourGains"] = (red/10,blue/10)
     else:
-        if row < 8:
-            if alt_dis == 1:
-                pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(int((row*bw) + 2),int(pre_height + (bh*2)),int(j+1),int(bh/3)))
-                pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int((row*bw) + j) ,int(pre_height + (bh*2)),3,int(bh/3)))
+        if gain > 0:
+            ctrls["AnalogueGain"] = float(gain)
+        if awb == 0:
+            ctrls["AwbEnable"] = False
+            ctrls["ColourGains"] = (red/10,blue/10)
+        else:
+            ctrls["AwbEnable"] = True
+            ctrls["AwbMode"] = awb - 1
+    ctrls["AeMeteringMode"] = meter # centre, spot, average = matrix
+    ctrls["NoiseReductionMode"] = [0,3,1,2][denoise]
+    if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8:
+        ctrls["AfMode"] = [1,0,2][v3_f_mode]
+        if v3_f_mode == 1:
+            if Pi_Cam == 3:
+                ctrls["LensPosition"] = v3_focus/100
             else:
-                pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(int((row*bw) + 2),int((pre_height *.75) + (bh*2)),int(j+1),int(bh/3)))
-                pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int((row*bw) + j) ,int((pre_height *.75) + (bh*2)),3,int(bh/3)))
-                
+                ctrls["LensPosition"] = focus/100
+    if Pi_Cam == 3 and v3_af == 1:
+        ctrls["AfSpeed"] = v3_f_speed
+        ctrls["AfRange"] = v3_f_range
+    return ctrls
+
+def session_controls():
+    # preview_controls() plus the controls that depend on the sensor crop of the camera session
+    ctrls = preview_controls()
+    fw,fh = zoom_crop()
+    x0,y0,mw,mh = sess_max
+    ctrls["ScalerCrop"] = (int(x0 + mw * (1 - fw)/2),int(y0 + mh * (1 - fh)/2),int(mw * fw),int(mh * fh))
+    if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8) and zoom == 0 and fxx != 0 and v3_f_mode != 1:
+        ctrls["AfMetering"] = 1
+        ctrls["AfWindows"]  = [(int(x0 + mw * fxx),int(y0 + mh * fxy),int(mw * fxz),int(mh * fyz))]
+    if Pi == 5 and (v3_hdrs[v3_hdr] == "single-exp" or v3_hdrs[v3_hdr] == "auto"):
+        ctrls["HdrMode"] = [0,3,2][v3_hdr]
+    return ctrls
+
+def session_size():
+    # camera session output size and sensor mode, planned for the full field of view. Zoom only changes ScalerCrop
+    # (session_controls()), so it is applied live and never restarts the session
+    if len(vwidths2) > 0:
+        return plan_preview(1,1)
+    pw,ph = preview_target(igw,igh)
+    return pw,ph,""
+
+def session_key():
+    # settings that need a new sensor configuration, any change restarts the camera session
+    return (camera,Pi_Cam,session_size(),vflip,hflip,v3_hdr,scientific,mode == 0,gain == 0)
+
+def session_reader(gen,pw,ph):
+    # read frames from the camera session, or make test frames, and queue them in pipe_ring
+    t = 0
+    while gen == pipe_gen:
+        if sess_type == 1:
+            try:
+                frm = picam2.capture_array("main")
+            except Exception:
+                break
+        else:
+            time.sleep(sess_ctrls["FrameDurationLimits"][0]/1000000)
+            frm = fake_frame(pw,ph,t,sess_ctrls)
+            t += 1
+        with pipe_lock:
+            if gen == pipe_gen:
+                if len(pipe_ring) == pipe_ring.maxlen:
+                    frame_stats['dropped'] += 1
+                pipe_ring.append((time.time(),frm))
+                frame_stats['arrived'] += 1
+                pipe_event.set()
+
+def session_start():
+    # start a long lived camera session (Picamera2, or fake test pattern) feeding frames into pipe_ring
+    global picam2,sess_type,sess_key,sess_max,sess_ctrls,sess_thread,pipe_gen
+    pw,ph,pmode = session_size()
+    with pipe_lock:
+        pipe_gen += 1
+        frame_stats['dropped'] += len(pipe_ring)
+        pipe_ring.clear()
+    sess_type = preview_backend
+    sess_key = session_key()
+    if sess_type == 1:
+        try:
+            tuning = None
+            if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
+                tuning = Picamera2.load_tuning_file("/home/" + Home_Files[0] + "/imx290a.json")
+            if Pi_Cam == 4 and scientific == 1:
+                if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
+                    tuning = Picamera2.load_tuning_file('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json')
+                if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
+                    tuning = Picamera2.load_tuning_file('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json')
+            picam2 = Picamera2(camera,tuning=tuning)
+            sensor = {}
+            if pmode != "":
+                mw,mh = pmode.split(":")
+                sensor = {"output_size":(int(mw),int(mh))}
+            config = picam2.create_video_configuration(main={"size":(pw,ph),"format":"BGR888"},sensor=sensor,
+                                                       transform=Transform(hflip=hflip,vflip=vflip),buffer_count=4)
+            picam2.configure(config)
+            sess_max = picam2.camera_controls["ScalerCrop"][1]
+            sess_ctrls = session_controls()
+            picam2.set_controls(sess_ctrls)
+            picam2.start()
+        except Exception as e:
+            # camera busy or the configuration was refused, fall back to rpicam-vid for this preview
+            print("Picamera2 session failed, using rpicam-vid for preview:",e)
+            if picam2 != None:
+                try:
+                    picam2.close()
+                except Exception:
+                    pass
+                picam2 = None
+            sess_type = 0
+            return
+    else:
+        sess_max = (0,0,igw,igh)
+        sess_ctrls = session_controls()
+    if show_cmds == 1:
+        print("Session",pw,ph,pmode,sess_ctrls)
+    sess_thread = threading.Thread(target=session_reader, args=(pipe_gen,pw,ph), daemon=True)
+    sess_thread.start()
+
+def session_set():
+    # apply the current settings to the running camera session without restarting it
+    global sess_ctrls
+    sess_ctrls = session_controls()
+    if sess_type == 1:
+        picam2.set_controls(sess_ctrls)
+    if show_cmds == 1:
+        print("Session",sess_ctrls)
+
+def session_stop():
+    # stop the camera session and its reader thread
+    global picam2,sess_type,pipe_gen
+    with pipe_lock:
+        pipe_gen += 1
+    if sess_thread != None:
+        sess_thread.join(3)
+    if sess_type == 1:
+        picam2.stop()
+        picam2.close()
+        picam2 = None
+    sess_type = 0
+
+def stop_preview():
+    # stop the preview, rpicam-vid process or camera session
+    if sess_type > 0:
+        session_stop()
+    elif p != None:
+        poll = p.poll()
+        if poll == None:
+            os.killpg(p.pid, signal.SIGTERM)
+
+def update_preview(wait):
+    # apply changed settings, live if a camera session is running and the sensor mode is unchanged, otherwise restart the preview
+    if sess_type > 0 and session_key() == sess_key:
+        session_set()
+        return
+    stop_preview()
+    if rotate == 0:
+        text(0,0,6,2,1,"Waiting for preview ...",int(fv*1.7),1)
+        time.sleep(wait)
+    preview()
+
+def scale_surface(image):
+    # scale (and rotate) a preview frame to the size it is shown, returns the surface and its position on the display
+    if Pi_Cam == 4 and zoom > 1 and zoom < 6:
+        pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,int(pre_height * 0.75),int(pre_width),int(pre_height/4)),0)
+        image = pygame.transform.scale(image,(pre_width,int(pre_width * (image.get_height()/image.get_width()))))
+    elif igw/igh > 1.5:
+        if rotate == 0:
+            image = pygame.transform.scale(image, (pre_width,int(pre_height * 0.75)))
         else:
-            if alt_dis == 1:
-                pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(int(((row-8)*bw) + 2),int(pre_height + (bh*3)),int(j+1),int(bh/3)))
-                pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(((row-8)*bw) + j) ,int(pre_height + (bh*3)),3,int(bh/3)))
+            image = pygame.transform.rotate(image, int(rotate * 90))
+            if rotate != 2:
+                igwr = image.get_width()
+                ighr = image.get_height()
+                if alt_dis < 2:
+                    image = pygame.transform.scale(image, (int(pre_height * (igwr/ighr)),pre_height))
+                else:
+                    image = pygame.transform.scale(image, (int(pre_height * .75 * (igwr/ighr)),pre_height * .75))
             else:
-                pygame.draw.rect(windowSurfaceObj,(150,120,150),Rect(int(((row-8)*bw) + 2),int((pre_height *.75) + (bh*3)),int(j+1),int(bh/3)))
-                pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(((row-8)*bw) + j) ,int((pre_height *.75) + (bh*3)),3,int(bh/3)))
-                
-    pygame.display.update()
+                image = pygame.transform.scale(image, (pre_width,pre_height))
+    else:
+        if rotate == 0:
+            image = pygame.transform.scale(image, (pre_width,pre_height))
+        else:
+            image = pygame.transform.rotate(image, int(rotate * 90))
+            if rotate != 2:
+                igwr = image.get_width()
+                ighr = image.get_height()
+                image = pygame.transform.scale(image, (int(pre_height * (igwr/ighr)),pre_height))
+            else:
+                image = pygame.transform.scale(image, (pre_width,pre_height))
+    if rotate == 1 or rotate == 3:
+        return image,(int((pre_width/2) - ((pre_height * (image.get_width()/image.get_height())))/2),0)
+    return image,(0,0)
+
+def scale_rgb(rgb):
+    # as scale_surface() but with cv2 on an RGB array, so it can run in the preview worker thread.
+    # The frame is scaled before it is rotated, so fewer pixels are rotated
+    tw,th = preview_target(rgb.shape[1],rgb.shape[0])
+    if (rgb.shape[1],rgb.shape[0]) != (tw,th):
+        rgb = cv2.resize(rgb,(tw,th),interpolation=cv2.INTER_AREA)
+    if rotate == 0 or (Pi_Cam == 4 and zoom > 1 and zoom < 6):
+        return np.ascontiguousarray(rgb),(0,0)
+    rgb = cv2.rotate(rgb,[0,cv2.ROTATE_90_COUNTERCLOCKWISE,cv2.ROTATE_180,cv2.ROTATE_90_CLOCKWISE][rotate])
+    if rotate == 2:
+        return rgb,(0,0)
+    return rgb,(int((pre_width/2) - ((pre_height * (rgb.shape[1]/rgb.shape[0])))/2),0)
+
+def frame_worker():
+    # decode, scale and rotate preview frames away from the main loop, which then only blits them and stays free for touch and buttons.
+    # The newest result is left in work_ready as (pipe_gen,stage times,time done,RGB array,position,Y plane or None,yuv planes or None).
+    # The yuv planes come from work_free, the main loop gives them back when it is done with the Y plane
+    global work_ready
+    while True:
+        gen = pipe_gen
+        if sess_type == 0 and preview_pipe == 0:
+            time.sleep(0.01)
+            frm = file_latest()
+        else:
+            pipe_event.wait(0.1)
+            pipe_event.clear()
+            frm = pipe_latest()
+        if frm is None:
+            continue
+        t0 = time.time()
+        rec = {"written":frame_time,"wait":(t0 - frame_time) * 1000}
+        Y = None
+        out = None
+        try:
+            if type(frm) == bytes:
+                rgb = decode_rgb(frm)
+            elif type(frm) == tuple:
+                if len(work_free) > 0:
+                    out = work_free.popleft()
+                try:
+                    out,rgb = yuv_rgb(frm,out,preview_target(frm[1],frm[2]))
+                finally:
+                    yuv_release(frm)
+                Y = out[0:rgb.shape[0]]
+            else:
+                rgb = frm
+            if rgb is None:
+                continue
+            t1 = time.time()
+            rec["decode"] = (t1 - t0) * 1000
+            rgb,pos = scale_rgb(rgb)
+        except cv2.error:
+            if out is not None:
+                work_free.append(out)
+            continue
+        if Y is not None and Y.shape != rgb.shape[0:2]:
+            Y = None
+        t2 = time.time()
+        rec["scale"] = (t2 - t1) * 1000
+        with pipe_lock:
+            frame_stats['decoded'] += 1
+        with work_lock:
+            if work_ready != None and work_ready[6] is not None:
+                work_free.append(work_ready[6])
+            work_ready = (gen,rec,t2,rgb,pos,Y,out)
+
+def time_start(t_written):
+    # start timing a preview frame, t_written = time.time() when the frame was complete
+    global trec,tlast
+    tlast = time.time()
+    trec = {"written":t_written,"wait":(tlast - t_written) * 1000}
+
+def time_stage(name):
+    # add the time since the last stage (ms) to stage name of the current frame
+    global tlast
+    if show_times == 0 and log_times == 0 and auto_fps == 0:
+        return
+    now = time.time()
+    trec[name] = trec.get(name,0) + (now - tlast) * 1000
+    tlast = now
+
+def time_end():
+    # keep the frame stage times for the overlay and write them to the csv log
+    global tlog
+    if show_times == 0 and log_times == 0:
+        return
+    trec["total"] = (tlast - trec["written"]) * 1000
+    for key in stages:
+        stage_times[key].append(trec.get(key,0))
+    if log_times == 1:
+        if tlog == None:
+            tlog = open("/run/shm/preview_times.csv","w",buffering=1)
+            tlog.write("time," + ",".join(stages) + "\n")
+        tlog.write(str(round(trec["written"],3)))
+        for key in stages:
+            tlog.write("," + str(round(trec.get(key,0),2)))
+        tlog.write("\n")
+
+def time_overlay():
+    # draw rolling p50 / p95 / p99 stage times (ms) on the preview
+    if len(stage_times["total"]) == 0:
+        return
+    for s in range(0,len(stages)):
+        pc = np.percentile(stage_times[stages[s]],[50,95,99])
+        text(0,s + 7,6,2,0,stages[s] + ": " + str(round(pc[0],1)) + " / " + str(round(pc[1],1)) + " / " + str(round(pc[2],1)) + " ms",fv,1)
+    # age of the latest result of each analysis
+    now = time.monotonic()
+    ages = ""
+    for name in ana_time:
+        ages += name + " " + str(int((now - ana_time[name]) * 1000)) + " "
+    text(0,len(stages) + 7,6,2,0,"age: " + ages + "ms",fv,1)
+    # touch response, from taking a press off the event queue until the main loop is back for the next one
+    if len(touch_ms) > 0:
+        pc = np.percentile(touch_ms,[50,95])
+        text(0,len(stages) + 8,6,2,0,"touch: " + str(round(pc[0],1)) + " / " + str(round(pc[1],1)) + " ms",fv,1)
+
+def fps_governor():
+    # adjust prev_fps (focus_fps when zoomed) to the rate this Pi can sustain, from the measured frame cost,
+    # cpu load and temperature. Changes need a 20% difference and at least 10 seconds between them.
+    # returns 1 if the preview framerate was changed
+    global prev_fps,focus_fps,gov_time
+    cost = 0
+    for key in ['decode','scale','blit','analysis','update']:
+        cost += trec.get(key,0)
+    gov_cost.append(cost)
+    now = time.monotonic()
+    if len(gov_cost) < 30 or now - gov_time < 10:
+        return 0
+    if zoom > 0:
+        fps = focus_fps
+    else:
+        fps = prev_fps
+    # allow preview work 60% of the main loop, the rest is left for the buttons and touch
+    target = (0.6 * 1000) / max(np.percentile(gov_cost,90),1)
+    load = os.getloadavg()[0] / os.cpu_count()
+    if load > 0.9:
+        target = min(target,fps * 0.8)
+    temp = 0
+    if os.path.exists("/sys/class/thermal/thermal_zone0/temp"):
+        with open("/sys/class/thermal/thermal_zone0/temp") as f:
+            temp = int(f.read()) / 1000
+    if temp > 80:
+        target = min(target,fps * 0.7)
+    elif temp > 75 or load > 0.75:
+        target = min(target,fps)
+    target = int(max(fps_min,min(fps_max,target)))
+    if abs(target - fps) / fps <= 0.2:
+        return 0
+    if zoom > 0:
+        focus_fps = target
+    else:
+        prev_fps = target
+    if show_cmds == 1:
+        print("Preview fps",fps,"->",target,"cost",round(np.percentile(gov_cost,90),1),"ms load",round(load,2),"temp",temp)
+    gov_time = now
+    gov_cost.clear()
+    return 1
+
+def ana_begin():
+    # start the analysis budget of a preview frame
+    global ana_frame,ana_start
+    ana_frame += 1
+    ana_start = time.monotonic()
+
+def ana_due(name,every,key=None):
+    # 1 if analysis name should run on this preview frame. It runs at once the first time and when its key (the settings
+    # it depends on) changes, otherwise every every frames while the frame's ana_budget lasts, or when 4 x every frames late
+    if name not in ana_last or ana_key[name] != key:
+        return 1
+    late = ana_frame - ana_last[name]
+    if late < every:
+        return 0
+    if ana_budget == 0 or (time.monotonic() - ana_start) * 1000 < ana_budget or late >= every * 4:
+        return 1
+    return 0
+
+def ana_done(name,key=None,result=None):
+    # keep the result of analysis name, with the frame and time it was made
+    ana_last[name] = ana_frame
+    ana_key[name]  = key
+    ana_time[name] = time.monotonic()
+    ana_res[name]  = result
+
+def small_gray(image,scale):
+    # luminance of the preview frame at 1/scale size (rows,columns), from the Y plane if there is one
+    w = max(image.get_width() // scale,1)
+    h = max(image.get_height() // scale,1)
+    if yuv_y is not None and yuv_y.shape == (image.get_height(),image.get_width()):
+        return cv2.resize(yuv_y,(w,h),interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small_rgb(image,w,h),cv2.COLOR_RGB2GRAY)
+
+def peak_map(image):
+    # focus peaking overlay for the preview frame, an edge map computed on a 1/peak_scale copy (from the Y plane
+    # if there is one) every peak_every frames, in peak_color on black (transparent). Returns the overlay surface
+    global peak_out,peak_surf
+    if ana_due('peak',peak_every,image.get_size()) == 0:
+        return peak_surf
+    small = small_gray(image,peak_scale)
+    edges = np.abs(cv2.Laplacian(small,cv2.CV_16S)).T > peak_level
+    w,h = edges.shape
+    if peak_out is None or peak_out.shape != (w,h,3):
+        peak_out = np.zeros((w,h,3),dtype=np.uint8)
+    peak_out[:] = 0
+    peak_out[edges] = peak_color
+    small = pygame.surfarray.make_surface(peak_out)
+    peak_surf = pygame.transform.scale(small,image.get_size())
+    peak_surf.set_colorkey((0,0,0))
+    ana_done('peak',image.get_size())
+    return peak_surf
+
+def zebra_map(image):
+    # exposure overlay, diagonal stripes over clipped highlights and shadows of a 1/zebra_scale copy of the preview frame.
+    # The stripe patterns and the 8 bit overlay surface are kept for the frame size, the overlay is recomputed every
+    # zebra_every frames. Returns the overlay surface
+    global zebra_pat,zebra_surf,zebra_big
+    if ana_due('zebra',zebra_every,image.get_size()) == 0:
+        return zebra_big
+    w = max(image.get_width() // zebra_scale,1)
+    h = max(image.get_height() // zebra_scale,1)
+    if zebra_pat is None or zebra_pat.shape[1:3] != (w,h):
+        st = ((np.arange(0,w)[:,None] + np.arange(0,h)[None,:]) // 4) % 2 == 0
+        zebra_pat = np.stack((st * 1,(~st) * 2)).astype(np.uint8)
+        zebra_surf = pygame.Surface((w,h),depth=8)
+        zebra_surf.set_palette([(0,0,0),(255,0,0),(0,0,255)] + [(0,0,0)] * 253)
+        zebra_surf.set_colorkey(0)
+    if zebra_rgb == 1:
+        r,g,b = cv2.split(small_rgb(image,w,h))
+        hi = (cv2.max(cv2.max(r,g),b) >= zebra_high).T
+        lo = (cv2.min(cv2.min(r,g),b) <= zebra_low).T
+    else:
+        gray = small_gray(image,zebra_scale).T
+        hi = gray >= zebra_high
+        lo = gray <= zebra_low
+    pygame.surfarray.blit_array(zebra_surf,(zebra_pat[0] * hi) + (zebra_pat[1] * lo))
+    zebra_big = pygame.transform.scale(zebra_surf,image.get_size())
+    ana_done('zebra',image.get_size())
+    return zebra_big
+
+def spot_tile(col,row):
+    # set the spot focus window to the centre half of tile col,row of the focus tile grid, in both directions
+    global fxx,fxy,fxz,fyz,tile_spot
+    col = min(max(col,0),tile_cols - 1)
+    row = min(max(row,0),tile_rows - 1)
+    fxz = 0.5 / tile_cols
+    fyz = 0.5 / tile_rows
+    fxx = ((col + 0.5) / tile_cols) - (fxz / 2)
+    fxy = ((row + 0.5) / tile_rows) - (fyz / 2)
+    tile_spot = (col,row)
+
+def tile_focus(image,pos):
+    # score the focus tiles of the preview frame and outline the tile_best sharpest, the sharpest thicker.
+    # With auto_spot the spot focus window follows the sharpest tile, at most every 5 seconds. Returns 1 if it moved.
+    # The grid is kept in tile_area, where the frame was shown, to map clicks to tiles
+    global tile_score,tile_time,tile_area
+    tile_area = Rect(pos,image.get_size())
+    if ana_due('tile',tile_every,image.get_size()) == 1:
+        tile_score = tile_scores(small_gray(image,tile_scale),tile_cols,tile_rows)
+        ana_done('tile',image.get_size())
+    score = tile_score[tile_metric]
+    tw = image.get_width() / tile_cols
+    th = image.get_height() / tile_rows
+    order = np.argsort(score,axis=None)[::-1]
+    for n in range(0,min(tile_best,len(order))):
+        row,col = divmod(int(order[n]),tile_cols)
+        pygame.draw.rect(windowSurfaceObj,(0,200,0),Rect(pos[0] + int(col * tw),pos[1] + int(row * th),int(tw),int(th)),1 + (n == 0))
+    row,col = divmod(int(order[0]),tile_cols)
+    if auto_spot == 1 and ((Pi_Cam == 3 and v3_af == 1) or Pi_Cam == 5 or Pi_Cam == 6 or Pi_Cam == 8) and zoom == 0 and (v3_f_mode == 0 or v3_f_mode == 2):
+        if (col,row) != tile_spot and time.monotonic() - tile_time > 5:
+            spot_tile(col,row)
+            tile_time = time.monotonic()
+            return 1
+    return 0
+
+def af_limits():
+    # lens position limits (v3_focus units) of the manual focus slider of this camera
+    name = 'v6_focus'
+    if Pi_Cam == 3:
+        name = 'v3_focus'
+    elif Pi_Cam == 5:
+        name = 'v5_focus'
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == name:
+            return video_limits[f+1],video_limits[f+2]
+    return 10,1000
+
+def af_show():
+    # show the lens position on the FOCUS button
+    if Pi_Cam == 3:
+        pmin,pmax = af_limits()
+        draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
+        fd = 1/(v3_focus/100)
+        text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+    else:
+        if Pi_Cam == 5:
+            draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
+        else:
+            draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
+        text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
+
+def af_begin():
+    # start the contrast autofocus sweep. It needs a camera session, so the lens moves without restarting the preview
+    global af_state,af_todo,af_scores,af_step,af_wait,af_time,v3_f_mode,foc_man,focus_mode,v3_focus,focus
+    if sess_type == 0 or rotate != 0:
+        text(0,0,6,2,1,"AF sweep needs preview_backend 1",int(fv*1.7),1)
+        return
+    focus_mode = 1
+    v3_f_mode = 1 # manual focus
+    foc_man = 1
+    button(1,7,1,9)
+    text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,0)
+    pmin,pmax = af_limits()
+    af_step = max(int((pmax - pmin) / (af_coarse - 1)),1)
+    af_todo = []
+    for n in range(0,af_coarse):
+        af_todo.append(min(pmin + (n * af_step),pmax))
+    af_scores = {}
+    af_time = time.monotonic()
+    af_state = 1
+    v3_focus = af_todo.pop(0)
+    focus = v3_focus
+    session_set()
+    af_wait = af_settle
+
+def af_sweep(score):
+    # one step of the autofocus sweep for each new preview frame, score is the focus of the frame at lens position v3_focus.
+    # A coarse pass over the whole range, then best +/- step with the step halved each pass, it ends at the sharpest position
+    global af_state,af_todo,af_step,af_wait,v3_focus,focus
+    if af_wait > 0:
+        af_wait -= 1
+        return
+    af_scores[v3_focus] = score
+    pmin,pmax = af_limits()
+    while len(af_todo) == 0:
+        best = max(af_scores,key=af_scores.get)
+        if af_step <= af_fine:
+            af_state = 0
+            v3_focus = best
+            focus = best
+            session_set()
+            af_show()
+            if show_cmds == 1:
+                print("AF sweep",best,len(af_scores),"positions",round(time.monotonic() - af_time,2),"s")
+            return
+        af_step = max(af_step // 2,1)
+        for pos in (best - af_step,best + af_step):
+            if pos >= pmin and pos <= pmax and pos not in af_scores:
+                af_todo.append(pos)
+    v3_focus = af_todo.pop(0)
+    focus = v3_focus
+    session_set()
+    af_wait = af_settle
+
+def noise_mad(d):
+    # robust sigma of each channel of differences d (n x 3) from the median absolute deviation, d is a difference of two samples
+    return 1.4826 * np.median(np.abs(d - np.median(d,0)),0) / math.sqrt(2)
+
+def noise_stats(crop):
+    # noise of the histogram area (RGB crop) per channel, the smaller of the frame to frame and the neighbour pixel
+    # difference estimates, so neither movement nor scene texture dominates. Running means over 20 frames are kept
+    # in preallocated buffers, reset when the area moves. Returns sigma and SNR (dB) per channel
+    global noise_prev,noise_cur,noise_key,noise_n
+    if noise_prev is None or noise_prev.shape != crop.shape or noise_key != (xx,xy):
+        noise_prev = np.empty(crop.shape,dtype=np.float32)
+        noise_cur = np.empty(crop.shape,dtype=np.float32)
+        noise_key = (xx,xy)
+        noise_n = 0
+    noise_cur[:] = crop
+    sig = noise_mad((noise_cur[1:] - noise_cur[:-1]).reshape(-1,3))
+    if noise_n > 0:
+        sig = np.minimum(sig,noise_mad((noise_cur - noise_prev).reshape(-1,3)))
+    noise_prev,noise_cur = noise_cur,noise_prev
+    # the first frame to frame estimate replaces the neighbour only estimate of the first frame
+    k = min(max(noise_n,1),20)
+    noise_sig[:] += (sig - noise_sig) / k
+    noise_mean[:] += (crop.reshape(-1,3).mean(0) - noise_mean) / k
+    noise_n += 1
+    # 8 bit levels, no less than the quantisation noise
+    sigma = np.maximum(noise_sig,0.29)
+    return sigma,20 * np.log10(np.maximum(noise_mean,1) / sigma)
+
+def rgb_level(counts):
+    # RGB levels of an area from its red, green and blue histogram counts (3 x 256, eg rows 1-3 of hist_counts()).
+    # rgb_mode 0: the peak level of each channel, averaged over the last sam calls with a circular buffer and running sum,
+    # 1: mean level, 2: median level. Returns r,g,b
+    global ct,rgb_n
+    if rgb_mode == 1:
+        lev = (counts * np.arange(0,256)).sum(1) / np.maximum(counts.sum(1),1)
+    elif rgb_mode == 2:
+        cum = np.cumsum(counts,1)
+        lev = [np.searchsorted(cum[c],cum[c][255] / 2) for c in range(0,3)]
+    else:
+        peak = counts.argmax(1)
+        rgb_sum[:] += peak - rgb_buf[ct]
+        rgb_buf[ct] = peak
+        ct += 1
+        if ct > sam-1:
+            ct = 0
+        rgb_n = min(rgb_n + 1,sam)
+        lev = rgb_sum / rgb_n
+    return int(lev[0]),int(lev[1]),int(lev[2])
+
+def hist_draw(lume,rede,greene,bluee):
+    # draw the selected histogram channels into hist_out and push it to the reused graph surface, which is returned
+    global hist_surf
+    if hist_surf == None:
+        hist_surf = pygame.Surface((256,100))
+        hist_surf.set_alpha(160)
+    hist_out[:] = 0
+    if histogram == 4 or histogram == 5:
+        hist_out[hist_trace(lume)] = 255
+    if histogram == 1 or histogram == 5:
+        hist_out[:,:,0][hist_trace(rede)] = 255
+    if histogram == 2 or histogram == 5:
+        hist_out[:,:,1][hist_trace(greene)] = 255
+    if histogram == 3 or histogram == 5:
+        hist_out[:,:,2][hist_trace(bluee)] = 255
+    # y = 0 is the bottom of the graph
+    pygame.surfarray.blit_array(hist_surf,hist_out[:,::-1])
+    return hist_surf
+
+def scope_draw(image):
+    # waveform (histogram 6, the luminance levels of each column) or vectorscope (histogram 7, Cb/Cr of the pixels) of the
+    # whole preview frame, by np.bincount of a 256 pixel wide copy. Drawn into the histogram graph surface, at most 10 times a second
+    global hist_surf,scope_time,scope_hist
+    if hist_surf == None:
+        hist_surf = pygame.Surface((256,100))
+        hist_surf.set_alpha(160)
+    now = time.monotonic()
+    if now - scope_time < 0.1 and scope_hist == histogram:
+        return hist_surf
+    scope_time = now
+    scope_hist = histogram
+    h = max(int(256 * image.get_height() / image.get_width()),1)
+    ycc = cv2.cvtColor(small_rgb(image,256,h),cv2.COLOR_RGB2YCrCb).astype(np.int32)
+    hist_out[:] = 0
+    if histogram == 6:
+        idx = (np.arange(0,256)[None,:] * 100) + ((ycc[:,:,0] * 100) // 256)
+        level = np.minimum(hist_log(np.bincount(idx.ravel(),minlength=25600).reshape(256,100)) * 4,255)
+        hist_out[:,:,0] = level
+        hist_out[:,:,1] = level
+        hist_out[:,:,2] = level
+    else:
+        # Cb across, Cr up, neutral grey in the centre
+        idx = (((ycc[:,:,2] * 100) // 256) * 100) + ((ycc[:,:,1] * 100) // 256)
+        level = np.minimum(hist_log(np.bincount(idx.ravel(),minlength=10000).reshape(100,100)) * 4,255)
+        hist_out[78:178,:,0] = level
+        hist_out[78:178,:,1] = level
+        hist_out[78:178,:,2] = level
+        hist_out[128,50,1] = 255
+        hist_out[77,:,:] = 80
+        hist_out[178,:,:] = 80
+    pygame.surfarray.blit_array(hist_surf,hist_out[:,::-1])
+    return hist_surf
 
 def preview():
     global use_ard,lver,Pi,scientif,scientific,fxx,fxy,fxz,v3_focus,v3_hdr,v3_f_mode,v3_f_modes,prev_fps,focus_fps,focus_mode,restart,datastr
     global count,p, brightness,contrast,modes,mode,red,blue,gain,sspeed,ev,pre_width,pre_height,zoom,igw,igh,zx,zy,awbs,awb,saturations
     global saturation,meters,meter,flickers,flicker,sharpnesss,sharpness,rotate,v3_hdrs,bits,vformat,vwidths,vheights,zoom,crop4_f
+    global pipe_gen,vwidths2,vheights2,yuv_w,yuv_h
     
     files = glob.glob('/run/shm/*.jpg')
     for f in files:
         os.remove(f)
+    if preview_backend > 0 and v3_hdrs[v3_hdr] != "sensor":
+        if Pi_Cam == 4 and zoom > 1 and PiHQ_ON == 1:  # HQ cropped
+            vformat = crop4_f[zoom]
+        session_start()
+    if sess_type > 0:
+        restart = 0
+        time.sleep(0.2)
+        if igw/igh > 1.5 and rotate == 0 and alt_dis == 1:
+            pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,int(pre_height * .75),pre_width,int(pre_height *.24) ))
+        return
     speed2 = sspeed
     speed2 = min(speed2,2000000)
     if lver < 12:
         datastr = "libcamera-vid"
     else:
         datastr = "rpicam-vid"
-    datastr += " --camera " + str(camera) + " -n --codec mjpeg -t 0 --segment 1"
+    if preview_pipe == 2:
+        datastr += " --camera " + str(camera) + " -n --codec yuv420 -t 0"
+    else:
+        datastr += " --camera " + str(camera) + " -n --codec mjpeg -t 0"
     if Pi_Cam == 4 and zoom > 1 and PiHQ_ON == 1:  # HQ cropped
         vformat = crop4_f[zoom]
         vwidth  = vwidths[vformat]
         vheight = vheights[vformat]
-        datastr += " --mode 4056:2160:8  --width " + str(vwidth) + " --height " + str(vheight) + " -o /run/shm/test%04d.jpg "
+        datastr += " --mode 4056:2160:8  --width " + str(vwidth) + " --height " + str(vheight)
+        yuv_w = vwidth
+        yuv_h = vheight
+    elif preview_plan == 1 or preview_pipe == 2:
+        pw,ph,pmode = plan_preview(zfs[zoom],zfs[zoom])
+        yuv_w = pw
+        yuv_h = ph
+        if pmode != "":
+            datastr += " --mode " + pmode
+        datastr += " --width " + str(pw) + " --height " + str(ph)
     elif (Pi_Cam == 5 or Pi_Cam == 6 or Pi_Cam == 8) and (focus_mode == 1 or zoom > 0):
-        datastr += " --width 3280 --height 2464 -o /run/shm/test%04d.jpg "
+        datastr += " --width 3280 --height 2464"
     elif (Pi_Cam == 5 or Pi_Cam == 6 or Pi_Cam == 8) or focus_mode == 1 :
-        datastr += " --width 1920 --height 1440 -o /run/shm/test%04d.jpg "
+        datastr += " --width 1920 --height 1440"
     elif Pi_Cam == 3:  # Pi v3
-        datastr += " --width 2304 --height 1296 -o /run/shm/test%04d.jpg "
+        datastr += " --width 2304 --height 1296"
     elif Pi_Cam == 7:  # Pi GS
-        datastr += " --width 1456 --height 1088 -o /run/shm/test%04d.jpg "
+        datastr += " --width 1456 --height 1088"
     elif Pi_Cam == 9:  # imx290
-        datastr += " --width 1920 --height 1080 -o /run/shm/test%04d.jpg "
+        datastr += " --width 1920 --height 1080"
     elif Pi_Cam == 10: # imx585
-        datastr += " --width 1928 --height 1090 -o /run/shm/test%04d.jpg "
+        datastr += " --width 1928 --height 1090"
     elif Pi_Cam == 11: # imx293
-        datastr += " --width 1920 --height 1080 -o /run/shm/test%04d.jpg "
+        datastr += " --width 1920 --height 1080"
     elif Pi_Cam == 12: # imx294
-        datastr += " --width 2048 --height 1080 -o /run/shm/test%04d.jpg "
+        datastr += " --width 2048 --height 1080"
     elif Pi_Cam == 13: # imx283
-        datastr += " --width 1920 --height 1080 -o /run/shm/test%04d.jpg "
+        datastr += " --width 1920 --height 1080"
     elif Pi_Cam == 14 or Pi_Cam == 4: # imx500 or Pi HQ
-        datastr += " --width 2028 --height 1520 -o /run/shm/test%04d.jpg "
+        datastr += " --width 2028 --height 1520"
     elif Pi_Cam == 15: # ov9281
-        datastr += " --width 1280 --height  800 -o /run/shm/test%04d.jpg "
+        datastr += " --width 1280 --height  800"
     elif Pi_Cam == 1:  # v1 / ov5647
-        datastr += " --width 1296 --height 972 -o /run/shm/test%04d.jpg "
+        datastr += " --width 1296 --height 972"
     else:
         if pre_width == 640 and pre_height == 480:
-            datastr += " --width 720 --height 540 -o /run/shm/test%04d.jpg "
+            datastr += " --width 720 --height 540"
         else:
-            datastr += " --width 1920 --height 1440 -o /run/shm/test%04d.jpg "
+            datastr += " --width 1920 --height 1440"
     if ev != 0:
         datastr += " --ev " + str(ev)
     datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
@@ -903,7 +1989,7 @@ def preview():
             if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
                 datastr += " --lens-position " + str(focus/100)
     if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8) and zoom == 0 and fxx != 0 and v3_f_mode != 1:
-        datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fxz)
+        datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fyz)
     if (Pi_Cam == 3 and v3_af == 1) and v3_f_speed != 0:
         datastr += " --autofocus-speed " + v3_f_speeds[v3_f_speed]
     if (Pi_Cam == 3 and v3_af == 1) and v3_f_range != 0:
@@ -929,7 +2015,20 @@ def preview():
         zxo = ((igw-zws)/2)/igw
         zyo = ((2160-zhs)/2)/2160
         datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
-    p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
+    if preview_pipe == 1 or preview_pipe == 2:
+        datastr += " -o -"
+        with pipe_lock:
+            pipe_gen += 1
+            frame_stats['dropped'] += len(pipe_ring)
+            pipe_ring.clear()
+        p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid, stdout=subprocess.PIPE)
+        if preview_pipe == 2:
+            threading.Thread(target=yuv_reader, args=(p,pipe_gen,yuv_w,yuv_h), daemon=True).start()
+        else:
+            threading.Thread(target=pipe_reader, args=(p,pipe_gen), daemon=True).start()
+    else:
+        datastr += " --segment 1 -o /run/shm/test%04d.jpg"
+        p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
     if show_cmds == 1:
         print(datastr)
     restart = 0
@@ -959,6 +2058,7 @@ button(0,17,0,5)
 
 def Menu():
   global vwidths2,vheights2,Pi_Cam,scientif,mode,v3_hdr,scientific,tinterval,zoom,vwidth,vheight,pre_width,pre_height,ft,fv,focus,fxz,v3_hdr,v3_hdrs
+  batch_start()
   text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
   if tinterval > 0:
     text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
@@ -1070,10 +2170,12 @@ def Menu():
       text(1,17,3,1,1,"OFF",fv,7)
   else:
 	  text(1,17,3,1,1,"ON",fv,7)
+  batch_end()
 
 def Menu2():
     global mode,speed,gain,brightness,contrast,frame,red,blue,ev,vlen,fps,vformat,codec,tinterval,tshots,extn,zx,zy,zoom,saturation,tduration
     global meter,awb,sharpness,denoise,quality,profile,level,histogram,histarea,v3_f_speed,v3_f_range,rotate,IRF,str_cap,v3_hdr,timet,vflip,hflip
+    batch_start()
     # write button texts
     text(0,0,1,0,1,"CAPTURE STILL",ft,7)
     text(1,0,1,0,1,"CAPTURE/Stream",ft-2,7)
@@ -1218,690 +2320,1375 @@ def Menu2():
     draw_Vbar(0,1,12,lyelColor,'tshots',tshots)
     if rotate == 0:
         draw_Vbar(0,1,14,greyColor,'histarea',histarea)
+    batch_end()
 
-text(0,0,6,2,1,"Please Wait, checking camera",int(fv* 1.7),1)
-text(0,0,6,2,1,"Found " + str(cameras[Pi_Cam]),int(fv*1.7),1)
-
-Menu()
-Menu2()
+def take_still():
+    global datastr,vformat,vwidth,vheight,image,restart,st_scale
+    if event.button == 1:
+            # TAKE STILL
+            stop_preview()
+            button(0,0,1,4)
+            if os.path.exists("PiLibtext.txt"):
+                 os.remove("PiLibtext.txt")
+            text(0,0,2,0,1,"CAPTURING",ft,0)
+            text(0,0,2,1,1,str(st_scales[st_scale]),ft,0)
+            text(1,0,0,0,1,"CAPTURE/Stream",ft-2,7)
+            text(1,0,0,1,1,"Video",ft,7)
+            text(1,9,0,0,1,"CAP T/LPSE",ft,7)
+            if tinterval > 0:
+                text(1,9,0,1,1,str(st_scales[st_scale]),ft,7)
+            else:
+                text(1,9,0,1,1,"   ",ft,7)
+            text(0,0,6,2,1,"Please Wait, taking still ...",int(fv*1.7),1)
+            now = datetime.datetime.now()
+            timestamp = now.strftime("%y%m%d%H%M%S")
+            if extns[extn] != 'raw':
+                fname =  pic_dir + str(timestamp) + '.' + extns2[extn]
+                if lver < 12:
+                    datastr = "libcamera-still"
+                else:
+                    datastr = "rpicam-still"
+                if Pi == 5 and extns[extn] == "jpg" and Pi_Cam != 8:
+                    datastr += " --zsl"
+                datastr += " --camera " + str(camera) + " -e " + extns[extn] + " -n "
+                datastr += "-t " + str(timet) + " -o " + fname
+            else:
+                fname =  pic_dir + str(timestamp) + '.' + extns2[extn]
+                if lver < 12:
+                    datastr = "libcamera-still"
+                else:
+                     datastr = "rpicam-still"
+                datastr += " --camera " + str(camera) + " -r -n -o " + fname
+            datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
+            if mode == 0:
+                datastr += " --shutter " + str(sspeed)
+            else:
+                datastr += " --exposure " + str(modes[mode])
+            if ev != 0:
+                datastr += " --ev " + str(ev)
+            if sspeed > 1000000 and mode == 0 and (Pi_Cam < 5 or Pi_Cam == 7):
+                datastr += " --gain " + str(gain) + " --immediate --awbgains " + str(red/10) + "," + str(blue/10)
+            else:
+                datastr += " --gain " + str(gain)
+                if awb == 0:
+                    datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
+                else:
+                    datastr += " --awb " + awbs[awb]
+            datastr += " --metering " + meters[meter]
+            datastr += " --saturation " + str(saturation/10)
+            datastr += " --sharpness " + str(sharpness/10)
+            datastr += " --quality " + str(quality)
+            if vflip == 1:
+                datastr += " --vflip"
+            if hflip == 1:
+                datastr += " --hflip"
+            datastr += " --denoise " + denoises[denoise]
+            if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
+                datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
+            if Pi_Cam == 4 and scientific == 1:
+                if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
+                    datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json"
+                if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
+                    datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json"
+            if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8:
+                datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode]
+                if v3_f_mode == 1:
+                    if Pi_Cam == 3:
+                        datastr += " --lens-position " + str(v3_focus/100)
+                    if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
+                        datastr += " --lens-position " + str(focus/100)
+            elif (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0 and fxz == 1:
+                datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode] + " --autofocus-on-capture"
+            if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1)or Pi_Cam == 6)) or Pi_Cam == 8) and zoom == 0 and fxz != 1:
+                datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fyz)
+            if Pi_Cam == 3 or Pi == 5:
+                datastr += " --hdr " + v3_hdrs[v3_hdr]
+            if (Pi_Cam == 6 or Pi_Cam == 8) and st_scale == 8:
+                datastr += " --width 4624 --height 3472 " # 16MP superpixel mode for higher light sensitivity
+            elif Pi_Cam == 4 and zoom > 1 and PiHQ_ON == 1:  # HQ cropped
+                vformat = crop4_f[zoom]
+                vwidth  = vwidths[vformat]
+                vheight = vheights[vformat]
+                datastr += " --mode 4056:2160:10  --width " + str(int(vwidth/st_scale)) + " --height " + str(int(vheight/st_scale))
+            elif Pi_Cam == 4 and st_scale == 8: # HQ 2x2 binning
+                datastr += " --mode 2028:1520:10  --width 2028 --height 1520"
+            elif st_scale > 1: # image reduced by st_scale
+                datastr += " --mode " + str(x_sens[Pi_Cam]) + ":" + str(y_sens[Pi_Cam]) + ":10" + " --width " + str(int(x_sens[Pi_Cam]/int(st_scale))) + " --height " + str(int(y_sens[Pi_Cam]/int(st_scale)))
+            elif Pi_Cam == 6 or Pi_Cam == 8:
+                if Pi != 5 and lo_res == 1:
+                    datastr += " --width 4624 --height 3472"
+                elif Pi_Cam == 6:
+                    datastr += " --width 9152 --height 6944"
+                elif Pi_Cam == 8:
+                    datastr += " --width 9248 --height 6944"
+            if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
+                zws = vwidths[vformat]
+                zhs = vheights[vformat]
+                zxo = ((igw-zws)/2)/igw
+                zyo = ((2160-zhs)/2)/2160
+                datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
+            elif zoom > 1:
+                zws = int(igw * zfs[zoom])
+                zhs = int(igh * zfs[zoom])
+                zxo = ((igw-zws)/2)/igw
+                zyo = ((igh-zhs)/2)/igh
+                datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
+            datastr += " --metadata - --metadata-format txt >> PiLibtext.txt"
+            if show_cmds == 1:
+                print (datastr)
+            os.system(datastr)
 
-time.sleep(1)
-pygame.display.update()
+            while not os.path.exists(fname):
+                pass
+            if extns2[extn] == 'jpg' or extns2[extn] == 'bmp' or extns2[extn] == 'png':
+                image = pygame.image.load(fname)
+                if rotate != 0:
+                    image = pygame.transform.rotate(image, int(rotate * 90))
+                    pygame.image.save(image,fname[:-4]+"r." + extns2[extn])
+                if image.get_width()/image.get_height() > 1.333:
+                    if rotate == 0:
+                        image = pygame.transform.scale(image,(pre_width,int(pre_width * (image.get_height()/image.get_width()))))
+                    else:
+                        if rotate != 2:
+                            igwr = image.get_width()
+                            ighr = image.get_height()
+                            if alt_dis < 2:
+                                image = pygame.transform.scale(image, (int(pre_height * (igwr/ighr)),pre_height))
+                            else:
+                                image = pygame.transform.scale(image, (int(pre_height * .75 * (igwr/ighr)),pre_height * .75))
+                        else:
+                            image = pygame.transform.scale(image, (pre_width,pre_height))
+                else:
+                    if rotate == 0 or rotate == 2:
+                        image = pygame.transform.scale(image, (pre_width,pre_height))
+                    else:
+                        if rotate != 2:
+                            igwr = image.get_width()
+                            ighr = image.get_height()
+                            image = pygame.transform.scale(image, (int(pre_height * (igwr/ighr)),pre_height))
+                        else:
+                            image = pygame.transform.scale(image, (pre_width,pre_height))
+                if rotate == 1 or rotate == 3:
+                    windowSurfaceObj.blit(image, (int((pre_width/2) - ((pre_height * (igwr/ighr)))/2),0))
+                else:
+                    windowSurfaceObj.blit(image, (0,0))
+            dgain = 0
+            again = 0
+            etime = 0
+            if os.path.exists("PiLibtext.txt"):
+              with open("PiLibtext.txt", "r") as file:
+                line = file.readline()
+                check = line.split("=")
+                if check[0] == "DigitalGain":
+                    dgain = check[1][:-1]
+                if check[0] == "AnalogueGain":
+                    again = check[1][:-1]
+                if check[0] == "ExposureTime":
+                    etime = check[1][:-1]
+                while line:
+                    line = file.readline()
+                    check = line.split("=")
+                    if check[0] == "DigitalGain":
+                        dgain = check[1][:-1]
+                    if check[0] == "AnalogueGain":
+                        again = check[1][:-1]
+                    if check[0] == "ExposureTime":
+                        etime = check[1][:-1]
+              if alt_dis < 2:
+                  text(0,26,6,2,1,"Ana Gain: " + str(again) + " Dig Gain: " + str(dgain) + " Exp Time: " + str(etime) +"uS",int(fv*1.5),1)
+              else:
+                  text(0,19,6,2,1,"Ana Gain: " + str(again) + " Dig Gain: " + str(dgain) + " Exp Time: " + str(etime) +"uS",int(fv*1.5),1)
+            text(0,0,6,2,1,fname,int(fv*1.5),1)
+            pygame.display.update()
+            time.sleep(3)
+            if rotate != 0 and alt_dis < 2:
+                pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,pre_width,pre_height),0)
+            if rotate == 0 and alt_dis < 2:
+                pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,int(pre_height * .75),pre_width,pre_height /4),0)
+            button(0,0,0,4)
+            text(0,0,1,0,1,"CAPTURE STILL",ft,7)
+            text(1,0,1,0,1,"CAPTURE/Stream",ft-2,7)
+            text(1,0,1,1,1,"Video",ft,7)
+            text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
+            text(1,9,1,0,1,"CAP T/LPSE",ft,7)
+            if tinterval > 0:
+                text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
+            else:
+                text(1,9,3,1,1,"",ft,7)
+            restart = 2
+    else:
+        st_scale = int(st_scale * 2)
+        if st_scale > 8:
+            st_scale = 1
+        if st_scale > 4 and Pi_Cam != 4 and Pi_Cam != 6 and Pi_Cam != 8:
+            st_scale = 1
+        text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
+        if tinterval > 0:
+            text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
+        else:
+            text(1,9,1,1,1,"",ft,7)
 
-# determine max speed for camera
-max_speed = 0
-while max_shutter > shutters[max_speed]:
-    max_speed +=1
-if speed > max_speed:
-    speed = max_speed
-    shutter = shutters[speed]
-    if shutter < 0:
-        shutter = abs(1/shutter)
-    sspeed = int(shutter * 1000000)
+def set_mode():
+    # MODE
+    global mode,gain,tduration,speed,shutter,sspeed,restart
+    for f in range(0,len(still_limits)-1,3):
+        if still_limits[f] == 'mode':
+            pmin = still_limits[f+1]
+            pmax = still_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        mode = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
+        mode = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
+        mode = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            mode -=1
+            mode  = max(mode ,pmin)
+        else:
+            mode  +=1
+            mode = min(mode ,pmax)
     if mode == 0:
+        text(0,2,5,0,1,"Shutter S",ft,10)
+        draw_bar(0,2,lgrnColor,'speed',speed)
         if shutters[speed] < 0:
             text(0,2,3,1,1,"1/" + str(abs(shutters[speed])),fv,10)
         else:
             text(0,2,3,1,1,str(shutters[speed]),fv,10)
+        if gain == 0:
+            gain = 1
+            text(0,3,5,0,1,"Gain    A/D",ft,10)
+            if gain <= mag:
+                text(0,3,3,1,1,str(gain) + " :  " + str(gain) + "/1",fv,10)
+            else:
+                text(0,3,3,1,1,str(gain) + " :  " + str(int(mag)) + "/" + str(((gain/mag)*10)/10)[0:3],fv,10)
+            draw_bar(0,3,lgrnColor,'gain',gain)
     else:
+        text(0,2,5,0,1,"eV",ft,10)
+        text(0,2,3,1,1,str(ev),fv,10)
+        draw_bar(0,2,lgrnColor,'ev',ev)
+        gain = 0
+        text(0,3,5,0,1,"Gain ",ft,10)
+        text(0,3,3,1,1,"Auto",fv,10)
+        draw_bar(0,3,lgrnColor,'gain',gain)
+    text(0,1,3,1,1,modes[mode],fv,10)
+    draw_bar(0,1,lgrnColor,'mode',mode)
+    td = timedelta(seconds=tinterval)
+    text(1,11,3,1,1,str(td),fv,12)
+    draw_Vbar(0,1,10,lyelColor,'tinterval',tinterval)
+    if tinterval > 0:
+        tduration = tinterval * tshots
+    if mode == 0 and tinterval == 0 :
+        speed = 15
+        shutter = shutters[speed]
+        if shutter < 0:
+            shutter = abs(1/shutter)
+        sspeed = int(shutter * 1000000)
+        if (shutter * 1000000) - int(shutter * 1000000) > 0.5:
+            sspeed +=1
         if shutters[speed] < 0:
-            text(0,2,0,1,1,"1/" + str(abs(shutters[speed])),fv,10)
+            text(0,2,3,1,1,"1/" + str(abs(shutters[speed])),fv,10)
         else:
-            text(0,2,0,1,1,str(shutters[speed]),fv,10)
-if mode == 0:
-    draw_bar(0,2,lgrnColor,'speed',speed)
-pygame.display.update()
-time.sleep(.25)
+            text(0,2,3,1,1,str(shutters[speed]),fv,10)
+        draw_bar(0,2,lgrnColor,'speed',speed)
 
-xx = int(pre_width/2)
-xy = int(pre_height/2)
+    restart = 1
 
-fxx = 0
-fxy = 0
-fxz = 1
-fyz = 1
-old_histarea = histarea
+def set_speed():
+    # SHUTTER SPEED or EV (dependent on MODE set)
+    global speed,shutter,sspeed,tinterval,tduration,restart,ev
+    if mode == 0 :
+        for f in range(0,len(still_limits)-1,3):
+            if still_limits[f] == 'speed':
+                pmin = still_limits[f+1]
+                pmax = max_speed
+        if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+            speed = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
+            speed = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height * .75 and mousey < pre_height * .75  + int(bh/3)) and alt_dis == 2:
+            speed = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+        else:
+            if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                speed -=1
+                speed  = max(speed ,pmin)
+            else:
+                speed  +=1
+                speed = min(speed ,pmax)
+        shutter = shutters[speed]
+        if shutter < 0:
+            shutter = abs(1/shutter)
+        sspeed = int(shutter * 1000000)
+        if (shutter * 1000000) - int(shutter * 1000000) > 0.5:
+            sspeed +=1
+        if shutters[speed] < 0:
+            text(0,2,3,1,1,"1/" + str(abs(shutters[speed])),fv,10)
+        else:
+            text(0,2,3,1,1,str(shutters[speed]),fv,10)
+        draw_bar(0,2,lgrnColor,'speed',speed)
+        if tinterval > 0:
+            tinterval = int(sspeed/1000000)
+            tinterval = max(tinterval,1)
+            td = timedelta(seconds=tinterval)
+            text(1,11,3,1,1,str(td),fv,12)
+            draw_Vbar(0,1,11,lyelColor,'tinterval',tinterval)
+            tduration = tinterval * tshots
+            td = timedelta(seconds=tduration)
+            text(1,10,3,1,1,str(td),fv,12)
+            draw_Vbar(0,1,10,lyelColor,'tduration',tduration)
 
-# start preview
-if rotate == 0:
-    text(0,0,6,2,1,"Please Wait for preview...",int(fv*1.7),1)
-preview()
-ncount = 0
-nvalues = [0] * 20
-# main loop
-while True:
-    time.sleep(0.01)
-    # focus UP button
-    if (Pi_Cam == 3 and v3_af == 1) or Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
-      if buttonFUP.is_pressed:
-        if v3_f_mode != 1:
-            focus_mode = 1
-            v3_f_mode = 1 # manual focus
-            foc_man = 1 
-            button(1,7,1,9)
-            text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,0)
-        v3_focus += 10
-        for f in range(0,len(video_limits)-1,3):
-          if video_limits[f] == 'v3_focus':
-            v3_pmin = video_limits[f+1]
-            v3_pmax = video_limits[f+2]
-        v3_focus = min(v3_focus,v3_pmax)
-        focus = v3_focus
-        if Pi_Cam == 3:
-            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus * 4)
-            fd = 1/(v3_focus/100)
-            text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+        restart = 1
+    else:
+        # EV
+        for f in range(0,len(still_limits)-1,3):
+            if still_limits[f] == 'ev':
+                pmin = still_limits[f+1]
+                pmax = still_limits[f+2]
+        if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+            ev = int(((mousex-pre_width) / bw) * (pmax+1-pmin)) + pmin
+        elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
+            ev = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin)) + pmin
+        elif (mousey > pre_height * .75  and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
+            ev = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin)) + pmin
         else:
-            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus)
-            text(1,7,3,0,1,'<<< ' + str(v3_focus) + ' >>>',fv,0)
-        poll = p.poll()
-        if poll == None:
-            os.killpg(p.pid, signal.SIGTERM)
-        if rotate == 0:
-            text(0,0,6,2,1,"Waiting for preview ...",int(fv*1.7),1)
-        preview()
+            if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                ev -=1
+                ev  = max(ev ,pmin)
+            else:
+                ev  +=1
+                ev = min(ev ,pmax)
+        text(0,2,3,1,1,str(ev),fv,10)
+        draw_bar(0,2,lgrnColor,'ev',ev)
+        restart = 1
 
-    # focus DOWN button
-    if (Pi_Cam == 3 and v3_af == 1) or Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
-      if buttonFDN.is_pressed:
-        if v3_f_mode != 1:
-            focus_mode = 1
-            v3_f_mode = 1 # manual focus
-            foc_man = 1 
-            button(1,7,1,9)
-            text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,0)
-        v3_focus -= 10
-        for f in range(0,len(video_limits)-1,3):
-          if video_limits[f] == 'v3_focus':
-            v3_pmin = video_limits[f+1]
-            v3_pmax = video_limits[f+2]
-        v3_focus = max(v3_focus,v3_pmin)
-        focus = v3_focus
-        if Pi_Cam == 3:
-            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus * 4)
-            fd = 1/(v3_focus/100)
-            text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+def set_gain():
+    # GAIN
+    global gain,restart
+    for f in range(0,len(still_limits)-1,3):
+        if still_limits[f] == 'gain':
+            pmin = still_limits[f+1]
+            pmax = still_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        gain = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
+        gain = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75  and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
+        gain = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            gain -=1
+            gain  = max(gain ,pmin)
         else:
-            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus)
-            text(1,7,3,0,1,'<<< ' + str(v3_focus) + ' >>>',fv,0)
-        poll = p.poll()
-        if poll == None:
-            os.killpg(p.pid, signal.SIGTERM)
-        if rotate == 0:
-            text(0,0,6,2,1,"Waiting for preview ...",int(fv*1.7),1)
-        preview()    
+            gain  +=1
+            gain = min(gain ,pmax)
+    if gain > 0:
+        text(0,3,5,0,1,"Gain    A/D",ft,10)
+        if gain <= mag:
+            text(0,3,3,1,1,str(gain) + " :  " + str(gain) + "/1",fv,10)
+        else:
+            text(0,3,3,1,1,str(gain) + " :  " + str(int(mag)) + "/" + str(((gain/mag)*10)/10)[0:3],fv,10)
+    else:
+        if gain == 0:
+            text(0,3,5,0,1,"Gain ",ft,10)
+        else:
+            text(0,3,5,0,1,"Gain    A/D",ft,10)
+        text(0,3,3,1,1,"Auto",fv,10)
+    draw_bar(0,3,lgrnColor,'gain',gain)
+    restart = 1
 
-       
-    pics = glob.glob('/run/shm/*.jpg')
-    if len(pics) > 1:
-        pics.sort(reverse=True)
-        try:
-            image = pygame.image.load(pics[1])
-            for tt in range(1,len(pics)):
-                 os.remove(pics[tt])
-        except pygame.error:
-            pass
-            
-        if Pi_Cam == 4 and zoom > 1 and zoom < 6:
-            pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,int(pre_height * 0.75),int(pre_width),int(pre_height/4)),0)
-            image = pygame.transform.scale(image,(pre_width,int(pre_width * (image.get_height()/image.get_width()))))
-        elif igw/igh > 1.5:
-            if rotate == 0:
-                image = pygame.transform.scale(image, (pre_width,int(pre_height * 0.75)))
+def set_brightness():
+    # BRIGHTNESS
+    global brightness,restart
+    for f in range(0,len(still_limits)-1,3):
+        if still_limits[f] == 'brightness':
+            pmin = still_limits[f+1]
+            pmax = still_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        brightness = int(((mousex-pre_width) / bw) * (pmax+1-pmin)) + pmin
+    elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
+        brightness = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin)) + pmin
+    elif (mousey > pre_height * .75  and mousey < pre_height * .75+ int(bh/3)) and alt_dis == 2:
+        brightness = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin)) + pmin
+    else:
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            brightness -=1
+            brightness  = max(brightness ,pmin)
+        else:
+            brightness  +=1
+            brightness = min(brightness ,pmax)
+    text(0,4,3,1,1,str(brightness/100),fv,10)
+    draw_bar(0,4,lgrnColor,'brightness',brightness)
+    time.sleep(0.025)
+    restart = 1
+
+def set_contrast():
+    # CONTRAST
+    global contrast,restart
+    for f in range(0,len(still_limits)-1,3):
+        if still_limits[f] == 'contrast':
+            pmin = still_limits[f+1]
+            pmax = still_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        contrast = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
+        contrast = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75  and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
+        contrast = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            contrast -=1
+            contrast  = max(contrast ,pmin)
+        else:
+            contrast  +=1
+            contrast = min(contrast ,pmax)
+    text(0,5,3,1,1,str(contrast/100)[0:4],fv,10)
+    draw_bar(0,5,lgrnColor,'contrast',contrast)
+    time.sleep(0.025)
+    restart = 1
+
+def set_awb():
+    # AWB
+    global awb,restart
+    for f in range(0,len(still_limits)-1,3):
+        if still_limits[f] == 'awb':
+            pmin = still_limits[f+1]
+            pmax = still_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        awb = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height and mousey < pre_height + int(bh/3)) and alt_dis == 1:
+        awb = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
+        awb = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            awb -=1
+            awb  = max(awb ,pmin)
+        else:
+            awb  +=1
+            awb = min(awb ,pmax)
+    text(0,6,3,1,1,awbs[awb],fv,10)
+    draw_bar(0,6,lgrnColor,'awb',awb)
+    if awb == 0:
+        text(0,7,5,0,1,"Blue",ft,10)
+        text(0,8,5,0,1,"Red",ft,10)
+        text(0,8,3,1,1,str(red/10)[0:3],fv,10)
+        text(0,7,3,1,1,str(blue/10)[0:3],fv,10)
+        draw_bar(0,7,lgrnColor,'blue',blue)
+        draw_bar(0,8,lgrnColor,'red',red)
+    else:
+        text(0,7,5,0,1,"Denoise",fv,10)
+        text(0,7,3,1,1,denoises[denoise],fv,10)
+        text(0,8,5,0,1,"Sharpness",fv,10)
+        text(0,8,3,1,1,str(sharpness/10),fv,10)
+        draw_bar(0,7,lgrnColor,'denoise',denoise)
+        draw_bar(0,8,lgrnColor,'sharpness',sharpness)
+    restart = 1
+
+def set_blue_denoise():
+    # BLUE if AWB is off, else DENOISE
+    global blue,restart,denoise
+    if awb == 0:
+        # BLUE
+        for f in range(0,len(still_limits)-1,3):
+            if still_limits[f] == 'blue':
+                pmin = still_limits[f+1]
+                pmax = still_limits[f+2]
+        if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+            blue = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
+            blue = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height * .75  and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
+            blue = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+        else:
+            if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                blue -=1
+                blue  = max(blue ,pmin)
             else:
-                image = pygame.transform.rotate(image, int(rotate * 90))
-                if rotate != 2:
-                    igwr = image.get_width()
-                    ighr = image.get_height()
-                    if alt_dis < 2:
-                        image = pygame.transform.scale(image, (int(pre_height * (igwr/ighr)),pre_height))
-                    else:
-                        image = pygame.transform.scale(image, (int(pre_height * .75 * (igwr/ighr)),pre_height * .75))
-                else:
-                    image = pygame.transform.scale(image, (pre_width,pre_height))
+                blue  +=1
+                blue = min(blue ,pmax)
+        text(0,7,3,1,1,str(blue/10)[0:3],fv,10)
+        draw_bar(0,7,lgrnColor,'blue',blue)
+        restart = 1
+    elif awb != 0:
+        # DENOISE
+        for f in range(0,len(still_limits)-1,3):
+            if still_limits[f] == 'denoise':
+                pmin = still_limits[f+1]
+                pmax = still_limits[f+2]
+        if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+            denoise = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
+            denoise = int(((mousex-((button_row -1)*bw)) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height * .75  and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
+            denoise = int(((mousex-((button_row -1)*bw)) / bw) * (pmax+1-pmin))
         else:
-            if rotate == 0:
-                image = pygame.transform.scale(image, (pre_width,pre_height))
+            if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                denoise -=1
+                denoise = max(denoise,pmin)
             else:
-                image = pygame.transform.rotate(image, int(rotate * 90))
-                if rotate != 2:
-                    igwr = image.get_width()
-                    ighr = image.get_height()
-                    image = pygame.transform.scale(image, (int(pre_height * (igwr/ighr)),pre_height))
-                else:
-                    image = pygame.transform.scale(image, (pre_width,pre_height))
-        if rotate == 1 or rotate == 3:
-            windowSurfaceObj.blit(image, (int((pre_width/2) - ((pre_height * (igwr/ighr)))/2),0))
+                denoise +=1
+                denoise = min(denoise,pmax)
+        text(0,7,3,1,1,denoises[denoise],fv,10)
+        draw_bar(0,7,lgrnColor,'denoise',denoise)
+        restart = 1
+
+def set_red_sharpness():
+    # RED if AWB is off, else SHARPNESS
+    global red,restart,sharpness
+    if awb == 0:
+        # RED
+        for f in range(0,len(still_limits)-1,3):
+            if still_limits[f] == 'red':
+                pmin = still_limits[f+1]
+                pmax = still_limits[f+2]
+        if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+            red = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
+            red = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
+            red = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
         else:
-            windowSurfaceObj.blit(image, (0,0))
-        if (zoom > 0 or foc_man == 1) and rotate == 0:
-            image2 = pygame.surfarray.pixels3d(image)
-            crop2 = image2[xx-histarea:xx+histarea,xy-histarea:xy+histarea]
-            gray = cv2.cvtColor(crop2,cv2.COLOR_RGB2GRAY)
-            crop3 = image2[xx-ns:xx+ns,xy-ns:xy+ns]
-            gray3 = cv2.cvtColor(crop3,cv2.COLOR_RGB2GRAY)
-            if zoom > 0 and histogram > 0:
-                if (histogram == 1 or histogram == 5):
-                    red2   = crop2[:,:,0]
-                    rede   = [0] * 256
-                if (histogram == 2 or histogram == 5):
-                    green2 = crop2[:,:,1]
-                    greene = [0] * 256
-                if (histogram == 3 or histogram == 5):
-                    blue2  = crop2[:,:,2]
-                    bluee  = [0] * 256
-                lume   = [0] * 256
-                lume4  = [0] * 256
-                rav    = 0
-                gav    = 0
-                bav    = 0
-                for q in range(0,255):
-					# make RGBL graphs
-                    lume[q]   = np.sum(gray == q)
-                    rede[q]   = np.sum(red2 == q)
-                    greene[q] = np.sum(green2 == q)
-                    bluee[q]  = np.sum(blue2 == q)
-                    #make noise graph
-                    lume4[q] = np.sum(gray3 == q)
-                # calculate RGB values
-                redo = rede[0]
-                greo = greene[0]
-                bluo = bluee[0]
-                for av in range(1,len(rede)):
-                    if rede[av] > redo:
-                        redo = rede[av]
-                        ravs[ct] = av
-                    if greene[av] > greo:
-                        greo = greene[av]
-                        gavs[ct] = av
-                    if bluee[av] > bluo:
-                        bluo = bluee[av]
-                        bavs[ct] = av
-                    ct +=1
-                    if ct > sam-1:
-                        ct = 0
-                rav = int(sum(ravs)/sam)
-                gav = int(sum(gavs)/sam)
-                bav = int(sum(bavs)/sam)
-                text(30,3,3,2,0,"RGB: " + str(rav) + ":" + str(gav) + ":" + str(bav),fv*2,0)
-                for t in range(0,256):
-                    if histogram == 4 or histogram == 5:
-                        if lume[t] > 0:
-                            lume[t] = int(25*math.log10(lume[t]))
-                    if histogram == 1 or histogram == 5:
-                        if rede[t] > 0:
-                            rede[t] = int(25*math.log10(rede[t]))
-                    if histogram == 2 or histogram == 5:
-                        if greene[t] > 0:
-                            greene[t] = int(25*math.log10(greene[t]))
-                    if histogram == 3 or histogram == 5:
-                        if bluee[t] > 0:
-                            bluee[t] = int(25*math.log10(bluee[t]))
-                max_val = -1
-                min_val = -1
-                for t in range(0,256):
-                    if lume4[t] > 0 and min_val == -1:
-                        min_val = t
-                for t in range(255,0,-1):
-                    if lume4[t] > 0 and max_val == -1:
-                        max_val = t
-                nvalues.append(max_val-min_val)
-                del nvalues[0]
-                nave = int(sum(nvalues)/20) 
-                output = np.zeros((256,100,3))
-                old_lume   = 0
-                old_rede   = 0
-                old_greene = 0
-                old_bluee  = 0
-                for count in range(0,255):
-                    if histogram == 4 or histogram == 5:
-                      if lume[count] > 0:
-                        if lume[count] > old_lume:
-                            st = 1
-                        else:
-                            st = -1
-                        for y in range(old_lume,lume[count],st):
-                            output[count, y,0] = 255
-                            output[count, y,1] = 255
-                            output[count, y,2] = 255
-                    if histogram == 1 or histogram == 5:
-                      if rede[count] > 0:
-                        if rede[count] > old_rede:
-                            st = 1
-                        else:
-                            st = -1
-                        for y in range(old_rede,rede[count],st):
-                            output[count, y,0] = 255
-                    if histogram == 2 or histogram == 5:
-                      if greene[count] > 0:
-                        if greene[count] > old_greene:
-                            st = 1
-                        else:
-                            st = -1
-                        for y in range(old_greene,greene[count],st):
-                            output[count, y,1] = 255
-                    if histogram == 3 or histogram == 5:
-                      if bluee[count] > 0:
-                        if bluee[count] > old_bluee:
-                            st = 1
-                        else:
-                            st = -1
-                        for y in range(old_bluee,bluee[count],st):
-                            output[count, y,2] = 255
-                    if histogram == 4 or histogram == 5:
-                        old_lume   = lume[count]
-                    if histogram == 1 or histogram == 5:
-                        old_rede   = rede[count]
-                    if histogram == 2 or histogram == 5:
-                        old_greene = greene[count]
-                    if histogram == 3 or histogram == 5:
-                        old_bluee  = bluee[count]
-                graph = pygame.surfarray.make_surface(output)
-                graph = pygame.transform.flip(graph,0,1)
-                graph.set_alpha(160)
-                if alt_dis < 2:
-                    pygame.draw.rect(windowSurfaceObj,dgryColor,Rect(min_val + 10,pre_height-111,int(nave),102),0)
-                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(9,pre_height-111,64,102),1)
-                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(73,pre_height-111,64,102),1)
-                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(137,pre_height-111,64,102),1)
-                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(201,pre_height-111,66,102),1)
-                    windowSurfaceObj.blit(graph, (10,pre_height-110))
-                elif alt_dis == 2:
-                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(9,(pre_height * .75)-111,64,102),1)
-                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(73,(pre_height * .75)-111,64,102),1)
-                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(137,(pre_height * .75)-111,64,102),1)
-                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(201,(pre_height * .75)-111,66,102),1)
-                    windowSurfaceObj.blit(graph, (10,(pre_height * .75)-110))
-            if rotate != 0:
-                pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,int(pre_width/4.5),int(pre_height/8)),0)
-            foc = cv2.Laplacian(gray, cv2.CV_64F).var()
-            text(20,1,3,2,0,"Focus: " + str(int(foc)),fv* 2,0)
-            if zoom > 0 and histogram > 0:
-                text(20,2,3,2,0,"Noise: " + str(int(nave)),fv* 2,0)
-            pygame.draw.rect(windowSurfaceObj,redColor,Rect(xx-ns,xy-ns,ns*2,ns*2),1)
-            pygame.draw.rect(windowSurfaceObj,redColor,Rect(xx-histarea,xy-histarea,histarea*2,histarea*2),1)
-            pygame.draw.line(windowSurfaceObj,(255,255,255),(xx-int(histarea/2),xy),(xx+int(histarea/2),xy),1)
-            pygame.draw.line(windowSurfaceObj,(255,255,255),(xx,xy-int(histarea/2)),(xx,xy+int(histarea/2)),1)
-        if zoom == 0:
-            if rotate != 0:
-                pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,int(pre_width/4.5),int(pre_height/8)),0)
-            text(0,0,6,2,0,"Preview",fv* 2,0)
-            zxp = (zx -((pre_width/2) / (igw/pre_width)))
-            zyp = (zy -((pre_height/2) / (igh/pre_height)))
-            zxq = (zx - zxp) * 2
-            zyq = (zy - zyp) * 2
-            if zxp + zxq > pre_width:
-                zx = pre_width - int(zxq/2)
-                zxp = (zx -((pre_width/2) / (igw/pre_width)))
-                zxq = (zx - zxp) * 2
-            if zyp + zyq > pre_height:
-                zy = pre_height - int(zyq/2)
-                zyp = (zy -((pre_height/2) / (igh/pre_height)))
-                zyq = (zy - zyp) * 2
-            if zxp < 0:
-                zx = int(zxq/2) + 1
-                zxp = 0
-                zxq = (zx - zxp) * 2
-            if zyp < 0:
-                zy = int(zyq/2) + 1
-                zyp = 0
-                zyq = (zy - zyp) * 2
-            if pre_width < 800:
-                gw = 2
+            if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                red -=1
+                red  = max(red ,pmin)
             else:
-                gw = 1
-            if ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 or Pi_Cam == 6)) or Pi_Cam == 8) and fxz != 1 and zoom == 0 and rotate == 0:
-                pygame.draw.rect(windowSurfaceObj,(200,0,0),Rect(int(fxx*pre_width),int(fxy*pre_height*.75),int(fxz*pre_width),int(fyz*pre_height)),1)
-            if (Pi_Cam == 5 or Pi_Cam == 6) and (rotate == 0 or rotate == 2):
-                if vwidth == 1280 and vheight == 960:
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.20),int(pre_height * 0.22),int(pre_width * 0.62),int(pre_height * 0.57)),gw)
-                elif vwidth == 1280 and vheight == 720:
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.22),int(pre_height * 0.30),int(pre_width * 0.56),int(pre_height * 0.41)),gw)
-                elif (vwidth == 1296 and vheight == 972) or (vwidth == 2592 and vheight == 1944) or (vwidth == 1332 and vheight == 990) or (vwidth == 1456 and vheight == 1088):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.19),int(pre_height * 0.18),int(pre_width * 0.62),int(pre_height * 0.64)),gw)
-                elif (vwidth == 640 and vheight == 480) or (vwidth == 720 and vheight == 540) or (vwidth == 800 and vheight == 600):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.30),int(pre_height * 0.30),int(pre_width * 0.41),int(pre_height * 0.41)),gw)
-                elif (vwidth == 1920 and vheight == 1080) or (vwidth == 3840 and vheight == 2160) or (vwidth == 1536 and vheight == 864) or (vwidth == 4608 and vheight == 2592):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.09),int(pre_height * 0.20),int(pre_width * 0.82),int(pre_height * 0.62)),gw)
-            elif Pi_Cam == 8 and (rotate == 0 or rotate == 2):
-                if (vwidth == 1920 and vheight == 1080) or (vwidth == 3840 and vheight == 2160) or (vwidth == 1280 and vheight == 720) or (vwidth == 4608 and vheight == 2592) or (vwidth == 4624 and vheight == 3472) or (vwidth == 2304 and vheight == 1296) or (vwidth == 2028 and vheight == 1080):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.09),int(pre_height * 0.20),int(pre_width * 0.82),int(pre_height * 0.62)),gw)
-                elif vwidth == 1280 and vheight == 960:
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.20),int(pre_height * 0.22),int(pre_width * 0.62),int(pre_height * 0.57)),gw)
-                elif vwidth == 1296 and vheight == 972:
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.19),int(pre_height * 0.16),int(pre_width * 0.62),int(pre_height * 0.64)),gw)
-            elif Pi_Cam == 9:
-                if (vwidth == 800 and vheight == 600) or (vwidth == 640 and vheight == 480) or (vwidth == 720 and vheight == 540):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.25),int(pre_height * 0.13),int(pre_width * 0.50),int(pre_height * 0.49)),gw)
-                elif (vwidth == 1280 and vheight == 720):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.17),int(pre_height * 0.12),int(pre_width * 0.67),int(pre_height * 0.48)),gw)
-            elif rotate == 0 or rotate == 2:
-                if Pi_Cam == 1 and ((vwidth == 1920 and vheight == 1080) or (vwidth == 1280 and vheight == 720) or (vwidth == 1536 and vheight == 864)):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.13),int(pre_height * 0.22),int(pre_width * 0.74),int(pre_height * 0.57)),gw)
-                elif Pi_Cam == 2 and ((vwidth == 1920 and vheight == 1080) or (vwidth == 1280 and vheight == 720) or (vwidth == 1536 and vheight == 864)):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.2),int(pre_height * 0.28),int(pre_width * 0.60),int(pre_height * 0.45)),gw)
-                elif Pi_Cam == 2 and ((vwidth == 640 and vheight == 480) or (vwidth == 720 and vheight == 540)):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.30),int(pre_height * 0.30),int(pre_width * 0.41),int(pre_height * 0.41)),gw)
-                elif (Pi_Cam == 3 and v3_af == 1) and ((vwidth == 640 and vheight == 480) or (vwidth == 1296 and vheight == 972) or (vwidth == 1280 and vheight == 960)):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.25),int(pre_height * 0.17),int(pre_width * 0.50),int(pre_height * 0.46)),gw)
-                elif (Pi_Cam == 3 and v3_af == 1) and ((vwidth == 800 and vheight == 600) or (vwidth == 720 and vheight == 540)):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.25),int(pre_height * 0.17),int(pre_width * 0.50),int(pre_height * 0.46)),gw)
-                elif (Pi_Cam == 3 and v3_af == 1) and ((vwidth == 1280 and vheight == 720) or (vwidth == 1536 and vheight == 864)):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.175),int(pre_height * 0.15),int(pre_width * 0.66),int(pre_height * 0.48)),gw)
-                elif (Pi_Cam == 3 and v3_af == 1) and vwidth == 1640 and vheight == 1232:
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.12),0,int(pre_width * 0.75),int(pre_height * 0.75)),gw)
-                elif (Pi_Cam == 3 and v3_af == 1) and vwidth == 1456 and vheight == 1088:
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.12),0,int(pre_width * 0.75),int(pre_height * 0.75)),gw)
-                elif Pi_Cam == 7 and ((vwidth == 1920 and vheight == 1080) or (vwidth == 1280 and vheight == 720)):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(0,int(pre_height * 0.12),int(pre_width),int(pre_height * 0.75)),gw)
-                elif Pi_Cam == 4  and ((vwidth == 1920 and vheight == 1080) or (vwidth == 1536 and vheight == 864) or (vwidth == 1280 and vheight == 720)):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(0,int(pre_height * 0.15),int(pre_width),int(pre_height * 0.705)),gw)
-                elif Pi_Cam == 4  and ((vwidth == 640 and vheight == 480) or (vwidth == 1332 and vheight == 990) or (vwidth == 2028 and vheight == 1080)) and fps > 40:
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.18),int(pre_height * 0.17),int(pre_width * 0.65),int(pre_height * 0.66)),gw)
-            elif rotate == 1 or rotate == 3:
-                if Pi_Cam == 2 and ((vwidth == 1920 and vheight == 1080) or (vwidth == 1280 and vheight == 720) or (vwidth == 1536 and vheight == 864)):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_height * 0.51),int(pre_width * 0.15),int(pre_height * 0.33),int(pre_width * 0.45)),gw)
-                elif Pi_Cam == 2 and ((vwidth == 640 and vheight == 480) or (vwidth == 720 and vheight == 540)):
-                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_height * 0.50),int(pre_width * 0.22),int(pre_height * 0.33),int(pre_width * 0.31)),gw)
+                red  +=1
+                red = min(red ,pmax)
+        text(0,8,3,1,1,str(red/10)[0:3],fv,10)
+        draw_bar(0,8,lgrnColor,'red',red)
+        restart = 1
+    elif awb != 0:
+        # SHARPNESS
+        for f in range(0,len(still_limits)-1,3):
+            if still_limits[f] == 'sharpness':
+                pmin = still_limits[f+1]
+                pmax = still_limits[f+2]
+        if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+            sharpness = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height + (bh)  and mousey < pre_height + (bh) + int(bh/3)) and alt_dis == 1:
+            sharpness = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height * .75 + (bh)  and mousey < pre_height * .75 + (bh) + int(bh/3)) and alt_dis == 2:
+            sharpness = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
+        else:
+            if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                sharpness -=1
+                sharpness = max(sharpness,pmin)
+            else:
+                sharpness +=1
+                sharpness = min(sharpness,pmax)
 
-        pygame.display.update()
+        text(0,8,3,1,1,str(sharpness/10),fv,10)
+        draw_bar(0,8,lgrnColor,'sharpness',sharpness)
+        restart = 1
 
-    if buttonSTR.is_pressed:
-        type = pygame.MOUSEBUTTONUP
-        if str_cap == 2:
-            click_event = pygame.event.Event(type, {"button": 3, "pos": (0,0)})
+def set_extn():
+    # EXTENSION
+    global extn
+    for f in range(0,len(still_limits)-1,3):
+        if still_limits[f] == 'extn':
+            pmin = still_limits[f+1]
+            pmax = still_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        extn = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
+        extn = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
+        extn = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            extn -=1
+            extn  = max(extn ,pmin)
         else:
-            click_event = pygame.event.Event(type, {"button": 1, "pos": (0,0)})
-        pygame.event.post(click_event)
-    
-    #check for any mouse button presses
-    for event in pygame.event.get():
-      #QUIT
-      if event.type == QUIT:
-          os.killpg(p.pid, signal.SIGTERM)
-          pygame.quit()
-          
-      # MOVE HISTAREA or switch to SPOT FOCUS on AF camera (left mouse button)
-      elif event.type == MOUSEBUTTONUP:
-        mousex, mousey = event.pos
-        if mousex < pre_width and ((mousey < pre_height and alt_dis < 2) or (mousey < pre_height *.75 and alt_dis == 2)) and mousex != 0 and mousey != 0 and rotate == 0 and event.button == 1:
-            xx = mousex
-            xx = min(xx,pre_width - histarea)
-            xx = max(xx,histarea)
-            xy = mousey
-            if igw/igh > 1.5 and zoom < 5:
-                xy = min(xy,int(pre_height * .75) - histarea)
+            extn  +=1
+            extn = min(extn ,pmax)
+    text(0,9,3,1,1,extns[extn],fv,10)
+    draw_bar(0,9,lgrnColor,'extn',extn)
+
+def set_quality():
+    # QUALITY
+    global quality,restart
+    for f in range(0,len(still_limits)-1,3):
+        if still_limits[f] == 'quality':
+            pmin = still_limits[f+1]
+            pmax = still_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        quality = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
+        quality = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
+        quality = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            quality -=1
+            quality  = max(quality ,pmin)
+        else:
+            quality  +=1
+            quality = min(quality ,pmax)
+    text(0,10,3,1,1,str(quality)[0:3],fv,10)
+    draw_bar(0,10,lgrnColor,'quality',quality)
+    restart = 1
+
+def set_saturation():
+    # SATURATION
+    global saturation,restart
+    for f in range(0,len(still_limits)-1,3):
+        if still_limits[f] == 'saturation':
+            pmin = still_limits[f+1]
+            pmax = still_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        saturation = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
+        saturation = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
+        saturation = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            saturation -=1
+            saturation  = max(saturation ,pmin)
+        else:
+            saturation  +=1
+            saturation = min(saturation ,pmax)
+    text(0,11,3,1,1,str(saturation/10),fv,10)
+    draw_bar(0,11,lgrnColor,'saturation',saturation)
+    restart = 1
+
+def set_meter():
+    # METER
+    global meter,restart
+    for f in range(0,len(still_limits)-1,3):
+        if still_limits[f] == 'meter':
+            pmin = still_limits[f+1]
+            pmax = still_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        meter = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
+        meter = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
+        meter = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            meter -=1
+            meter  = max(meter ,pmin)
+        else:
+            meter  +=1
+            meter = min(meter ,pmax)
+    text(0,12,3,1,1,meters[meter],fv,10)
+    draw_bar(0,12,lgrnColor,'meter',meter)
+    restart = 1
+
+def set_hdr_timet():
+    # HDR, or still -t time (dependent on camera and Pi)
+    global v3_hdr,restart,timet
+    if Pi_Cam == 3:
+        # PI V3 CAMERA HDR
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            v3_hdr -=1
+            v3_hdr  = max(v3_hdr ,0)
+        else:
+            v3_hdr  +=1
+            v3_hdr = min(v3_hdr ,3)
+
+        text(0,13,5,0,1,"HDR",fv,10)
+        text(0,13,3,1,1,v3_hdrs[v3_hdr],fv,10)
+        restart = 1
+    elif Pi_Cam != 3 and Pi != 5:
+        # CAMERA still -t time (NOT Pi v3 camera)
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            timet -=100
+            timet  = max(timet ,100)
+        else:
+            timet  +=100
+            timet = min(timet ,10000)
+
+        text(0,13,5,0,1,"STILL -t",fv,10)
+        text(0,13,3,1,1,str(timet),fv,10)
+        time.sleep(0.05)
+    elif Pi_Cam != 3 and Pi == 5:
+        # PI5 and NON V3 CAMERA HDR
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            v3_hdr -=1
+            v3_hdr  = max(v3_hdr ,0)
+        else:
+            v3_hdr  +=1
+            v3_hdr = min(v3_hdr ,1)
+
+        text(0,13,5,0,1,"HDR",fv,10)
+        text(0,13,3,1,1,v3_hdrs[v3_hdr],fv,10)
+        restart = 1
+
+def set_histogram():
+    # HISTOGRAM
+    global histogram
+    for f in range(0,len(still_limits)-1,3):
+        if still_limits[f] == 'histogram':
+            pmin = still_limits[f+1]
+            pmax = still_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        histogram = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
+        histogram = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
+        histogram = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            histogram -=1
+            histogram = max(histogram,pmin)
+        else:
+            histogram +=1
+            histogram = min(histogram,pmax)
+    text(0,14,3,1,1,histograms[histogram],fv,7)
+    draw_bar(0,14,greyColor,'histogram',histogram)
+
+def set_cam_option():
+    # camera specific option: Scientific.json, IR filter, timet or V3 FOCUS SPEED
+    global scientific,restart,IRF,timet,v3_f_speed
+    if Pi_Cam == 4 and scientif == 1:
+        # v4 (HQ) CAMERA Scientific.json
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            scientific -=1
+            scientific = max(scientific ,0)
+        else:
+            scientific  +=1
+            scientific = min(scientific ,1)
+
+        text(0,15,5,0,1,"Scientific",fv,10)
+        if scientific == 0:
+            text(0,15,3,1,1,"Off",fv,10)
+        else:
+            text(0,15,3,1,1,"ON ",fv,10)
+        restart = 1
+    elif (Pi_Cam == 9 or Pi_Cam == 16):
+        # Waveshare imx290 / imx415 IR Filter
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            IRF -=1
+            IRF = max(IRF ,0)
+        else:
+            IRF  +=1
+            IRF = min(IRF ,1)
+        if IRF == 0:
+            text(0,15,3,1,1,"Off",fv,10)
+            led_sw_ir.off()
+        else:
+            text(0,15,3,1,1,"ON ",fv,10)
+            led_sw_ir.on()
+        restart = 1
+    elif (Pi_Cam == 10 or Pi_Cam == 8 or Pi_Cam == 15) and Pi == 5:
+        # timet
+        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            timet -=100
+            timet  = max(timet ,100)
+        else:
+            timet  +=100
+            timet = min(timet ,10000)
+        text(0,15,3,1,1,str(timet),fv,10)
+        time.sleep(0.05)
+    elif Pi_Cam == 3 and v3_af == 1:
+        # V3 FOCUS SPEED
+        for f in range(0,len(still_limits)-1,3):
+            if still_limits[f] == 'v3_f_speed':
+                pmin = still_limits[f+1]
+                pmax = still_limits[f+2]
+        if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+            v3_f_speed = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
+            v3_f_speed = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
+            v3_f_speed = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+        else:
+            if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                v3_f_speed-=1
+                v3_f_speed = max(v3_f_speed,pmin)
             else:
-                xy = min(xy,pre_height - histarea)
-            xy = max(xy,histarea)
-            # switch to SPOT focus
-            if ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 or Pi_Cam == 6)) or Pi_Cam == 8) and mousex < pre_width and mousey < pre_height *.75 and zoom == 0 and (v3_f_mode == 0 or v3_f_mode == 2):
-                fxx = (xx - 25)/pre_width
-                xy  = min(xy,int((pre_height - 25) * .75))
-                fxy = ((xy - 20) * 1.3333)/pre_height
-                fxz = 50/pre_width
-                fyz = fxz
-                if fxz != 1:
-                    text(1,7,3,1,1,"Spot",fv,7)
-            # switch out of SPOT focus
-            elif ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 or Pi_Cam ==6)) or Pi_Cam == 8) and zoom == 0:
-                fxx = 0
-                fxy = 0
-                fxz = 1
-                fzy = 1
-                if (v3_f_mode == 0 or v3_f_mode == 2):
-                    text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
-            if ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 or Pi_Cam == 6)) or Pi_Cam == 8) and zoom == 0:
-                restart = 1
-                
-        # goto ZOOM 5 (mouse centre button)
-        if mousex < pre_width and ((mousey < pre_height and alt_dis < 2) or (mousey < pre_height *.75 and alt_dis == 2)) and mousex != 0 and mousey != 0 and rotate == 0 and event.button == 2:
-            if zoom < 5:
-                zoom = 5
+                v3_f_speed +=1
+                v3_f_speed = min(v3_f_speed,pmax)
+        text(0,15,3,1,1,v3_f_speeds[v3_f_speed],fv,7)
+        draw_bar(0,15,greyColor,'v3_f_speed',v3_f_speed)
+        restart = 1
+
+def set_vflip():
+    # VERTICAL FLIP
+    global vflip,restart
+    vflip +=1
+    if vflip > 1:
+        vflip = 0
+    text(0,16,3,1,1,str(vflip),fv,7)
+    restart = 1
+
+def set_v_preview():
+    # VIDEO PREVIEW
+    global vpreview
+    vpreview +=1
+    if vpreview > 1:
+        vpreview = 0
+        text(0,17,3,1,1,"OFF",fv,7)
+    else:
+        text(0,17,3,1,1,"ON",fv,7)
+
+def take_video():
+    # TAKE VIDEO (left mouse button) or STREAM VIDEO (right mouse button)
+    global datastr,vformat,vwidth,vheight,p,event,mousex,mousey,button_column,button_row,button_pos,restart
+    if event.button != 3:
+        # TAKE VIDEO
+        stop_preview()
+        # get RAM free space
+        st = os.statvfs("/run/shm/")
+        freeram = (st.f_bavail * st.f_frsize)/1100000
+        button(1,0,1,3)
+        if Pi == 5:
+            text(1,0,3,0,1,"Video",ft,0)
+        else:
+            text(1,0,3,0,1,"STOP ",ft,0)
+        text(1,0,3,1,1,"Recording",ft,0)
+        text(0,0,0,0,1,"CAPTURE STILL",ft,7)
+        text(1,9,0,0,1,"CAP T/LPSE",ft,7)
+        text(0,0,6,2,1,"Please Wait, taking video ...",int(fv*1.7),1)
+        now = datetime.datetime.now()
+        timestamp = now.strftime("%y%m%d%H%M%S")
+        if save2ram == 1:
+            vname =  "/run/shm/" + str(timestamp) + "." + codecs2[codec]
+        else:
+            vname =  vid_dir + str(timestamp) + "." + codecs2[codec]
+        if codecs2[codec] != 'raw':
+            if lver < 12:
+                datastr = "libcamera-vid"
             else:
-                zoom = 0 
-            if zoom < 2:
-                if zoom == 0:
-                    button(1,8,0,9)
-                    text(1,8,5,0,1,"Zoom",ft,7)
-                    text(1,8,3,1,1,"",fv,7)
-                    draw_Vbar(0,1,8,greyColor,'zoom',zoom)
-                else:
-                    button(1,8,1,9)
-                    text(1,8,2,0,1,"ZOOMED",ft,0)
-                    text(1,8,3,1,1,str(zoom),fv,0)
-                    draw_Vbar(0,1,8,dgryColor,'zoom',zoom)
-                        
-                if foc_man == 0:
-                    button(1,7,0,9)
-                    text(1,7,5,0,1,"FOCUS",ft,7)
-                # determine if camera native format
-                vw = 0
-                x = 0
-                xx = int(pre_width/2)
-                xy = int(pre_height/2)
-                if igw/igh > 1.5:
-                    xy = int(xy * .75)
-                while x < len(vwidths2) and vw == 0:
-                    if vwidth == vwidths2[x]:
-                         if vheight == vheights2[x]:
-                            vw = 1
-                    x += 1
-                if vw == 0:
-                    text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                if vw == 1:
-                    text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                    
+                datastr = "rpicam-vid"
+            datastr += " --camera " + str(camera) + " -t " + str(vlen * 1000) + " -o " + vname
+            if mode != 0:
+                datastr += " --framerate " + str(fps)
             else:
-                button(1,8,1,9)
-                text(1,8,2,0,1,"ZOOMED",ft,0)
-                text(1,8,3,1,1,str(zoom),fv,0)
-                if igw/igh > 1.5:
-                    text(1,3,3,1,1,str(pre_width) + "x" + str(int(pre_height * .75)),fv,11)
-                else:
-                    text(1,3,3,1,1,str(pre_width) + "x" + str(pre_height),fv,11)
-                draw_Vbar(0,1,8,dgryColor,'zoom',zoom)
-            if zoom > 0:
-                fxx = 0
-                fxy = 0
-                fxz = 1
-                fyz = 1
-                if (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0:
-                    text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
-            restart = 1
-            time.sleep(.2) 
-                       
-        # SWITCH CAMERA (right mouse button)
-        if mousex < pre_width and mousey < pre_height and mousex != 0 and mousey != 0 and event.button == 3:
-            camera += 1
-            if camera > max_camera:
-                camera = 0
-            poll = p.poll()
-            if poll == None:
-                os.killpg(p.pid, signal.SIGTERM)
-            focus_mode = 0
-            v3_f_mode = 0 
-            foc_man = 0
-            Camera_Version()
-            read_config()
-            Menu()
-            Menu2()
+                speed7 = sspeed
+                speed7 = max(speed7,int((1/fps)*1000000))
+                datastr += " --framerate " + str(int((1/speed7)*1000000))
+            if codecs[codec] != 'h264' and codecs[codec] != 'mp4':
+                datastr += " --codec " + codecs[codec]
+            elif codecs[codec] != 'mp4':
+                prof = h264profiles[profile].split(" ")
+                #datastr += " --profile " + str(prof[0]) + " --level " + str(prof[1])
+                datastr += " --level " + str(prof[1])
+            elif codecs[codec] == 'mp4' and Pi != 5:
+                datastr += " --codec libav"
+        else:
+            if lver < 12:
+                datastr = "libcamera-raw"
+            else:
+                 datastr = "rpicam-raw"
+            datastr += " --camera " + str(camera) + " -t " + str(vlen * 1000) + " -o " + vname + " --framerate " + str(fps)
+        if vpreview == 0:
+            datastr += " -n "
+        datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
+        if Pi_Cam == 4 and zoom > 1 and PiHQ_ON == 1:  # HQ cropped
+            vformat = crop4_f[zoom]
+            vwidth  = vwidths[vformat]
+            vheight = vheights[vformat]
+            datastr += " --mode 4056:2160:10  --width " + str(vwidth) + " --height " + str(vheight)
+        elif Pi_Cam == 4 and zoom > 1:
+            datastr += " --mode 2028:1520:10  --width " + str(pre_width) + " --height " + str(pre_height)
+        elif zoom > 1:
+            if igw/igh > 1.5:
+                datastr += " --width " + str(pre_width) + " --height " + str(int(pre_height * .75))
+            else:
+                datastr += " --width " + str(pre_width) + " --height " + str(pre_height)
+        elif Pi_Cam == 4 and vwidth == 2028 and vheight == 1520:
+            datastr += " --mode 4056:2160:12"
+        elif Pi_Cam == 3 and vwidth == 2304 and codec == 0:
+            datastr += " --mode 2304:1296:10 --width 2304 --height 1296"
+        elif Pi_Cam == 3 and vwidth == 2028 and codec == 0:
+            datastr += " --mode 2028:1520:10 --width 2028 --height 1520"
+        else:
+            datastr += " --width " + str(vwidth) + " --height " + str(vheight)
+        if mode == 0:
+            datastr += " --shutter " + str(sspeed)
+        else:
+            datastr += " --exposure " + modes[mode]
+        datastr += " --gain " + str(gain)
+        if ev != 0:
+            datastr += " --ev " + str(ev)
+        if awb == 0:
+            datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
+        else:
+            datastr += " --awb " + awbs[awb]
+        datastr += " --metering " + meters[meter]
+        datastr += " --saturation " + str(saturation/10)
+        datastr += " --sharpness " + str(sharpness/10)
+        datastr += " --denoise "    + denoises[denoise]
+        datastr += " --bitrate " + str(bits)
+        if vflip == 1:
+            datastr += " --vflip"
+        if hflip == 1:
+            datastr += " --hflip"
+        if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
+            datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
+        if Pi_Cam == 4 and scientific == 1:
+            if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
+                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json"
+            if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
+                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json"
+        if Pi_Cam == 5 and foc_man == 1 and Pi == 5:
+            if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx519mf.json'):
+                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx519mf.json"
+        elif Pi_Cam == 5  and foc_man == 1 and Pi != 5:
+            if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx519mff.json'):
+                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx519mff.json"
+        if Pi_Cam == 6  and foc_man == 1 and Pi == 5:
+            if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/arducam_64mf.json'):
+                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/arducam_64mf.json"
+        if Pi_Cam == 6  and foc_man == 1 and Pi != 5:
+            if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/arducam_64mff.json'):
+                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/arducam_64mff.json"
+        if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8:
+            if v3_f_mode == 1:
+                if Pi_Cam == 3:
+                    datastr += " --lens-position " + str(v3_focus/100)
+                if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
+                    datastr += " --lens-position " + str(focus/100)
+        if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8) and zoom == 0 and fxx != 0 and v3_f_mode != 1:
+            datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fyz)
+        if (Pi_Cam == 3 and v3_af == 1) and v3_f_speed != 0:
+            datastr += " --autofocus-speed " + v3_f_speeds[v3_f_speed]
+        if (Pi_Cam == 3 and v3_af == 1) and v3_f_range != 0:
+            datastr += " --autofocus-range " + v3_f_ranges[v3_f_range]
+        if Pi_Cam == 3 or Pi == 5:
+            datastr += " --hdr " + v3_hdrs[v3_hdr]
+        datastr += " -p 0,0," + str(pre_width) + "," + str(pre_height)
+        if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
+            zws = vwidths[vformat]
+            zhs = vheights[vformat]
+            zxo = ((igw-zws)/2)/igw
+            zyo = ((2160-zhs)/2)/2160
+            datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
+        elif zoom > 1:
+            zws = (igw * zfs[zoom])
+            zhs = (igh * zfs[zoom])
+            zxo = ((igw-int(zws))/2)/igw
+            zyo = ((igh-int(zhs))/2)/igh
+            datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
+        if show_cmds == 1:
+            print (datastr)
+        p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
+        start_video = time.monotonic()
+        stop = 0
+        while (time.monotonic() - start_video < vlen or vlen == 0) and stop == 0:
+            if vlen != 0:
+                vlength = int(vlen - (time.monotonic()-start_video))
+            else:
+                vlength = int(time.monotonic()-start_video)
+            td = timedelta(seconds=vlength)
+            text(1,1,1,1,1,str(td),fv,11)
+            if save2ram == 1:
+                st = os.statvfs("/run/shm/")
+                freeram = (st.f_bavail * st.f_frsize)/1100000
+                # stop if low RAM whilst recording Video to RAM
+                if freeram < 100:
+                    os.killpg(p.pid, signal.SIGTERM)
+                    stop = 1
+            for event in pygame.event.get():
+                if (event.type == MOUSEBUTTONUP):
+                    mousex, mousey = event.pos
+                    # stop video recording
+                    button_column,button_row,button_pos = cell_at(mousex,mousey)
+                    if button_column == 2 and button_row == 1:
+                       os.killpg(p.pid, signal.SIGTERM)
+                       stop = 1
+        text(0,0,6,2,1,vname,int(fv*1.5),1)
+        time.sleep(1)
+        td = timedelta(seconds=vlen)
+        if rotate != 0:
+            pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,pre_width,pre_height),0)
+        text(1,1,3,1,1,str(td),fv,11)
+        button(1,0,0,3)
+        text(0,0,1,0,1,"CAPTURE STILL",ft,7)
+        text(1,0,1,0,1,"CAPTURE/Stream",ft-2,7)
+        text(1,0,1,1,1,"Video",ft,7)
+        text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
+        text(1,9,1,0,1,"CAP T/LPSE",ft,7)
+        if tinterval > 0:
+            text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
+        else:
+            text(1,9,3,1,1,"",ft,7)
+        if save2ram == 1:
+            shutil.move("/run/shm/" + str(timestamp) + "." + codecs2[codec],vid_dir)
+        restart = 2
+    elif event.button == 3:
+        # STREAM VIDEO
+        stop_preview()
+        button(1,0,1,3)
+        text(1,0,3,0,1,"STOP ",ft,0)
+        text(1,0,3,1,1,"STREAM",ft,0)
+        text(0,0,0,0,1,"CAPTURE STILL",ft,7)
+        text(1,9,0,0,1,"CAP T/LPSE",ft,7)
+        text(0,0,6,2,1,"Streaming Video ...",int(fv*1.7),1)
+        now = datetime.datetime.now()
+        timestamp = now.strftime("%y%m%d%H%M%S")
+        vname =  vid_dir + str(timestamp) + "." + codecs2[codec]
+        if lver < 12:
+            datastr = "libcamera-vid "
+        else:
+            datastr = "rpicam-vid "
+        datastr += "--camera " + str(camera) + " -t " + str(vlen * 1000)
+        if stream_type == 0:
+            datastr += " --inline --listen -o tcp://0.0.0.0:" + str(stream_port)
+        elif stream_type == 1:
+            datastr += " --inline -o udp://" + udp_ip_addr + ":" + str(stream_port)
+        if mode != 0:
+            datastr += " --framerate " + str(fps)
+        else:
+            speed7 = sspeed
+            speed7 = max(speed7,int((1/fps)*1000000))
+            datastr += " --framerate " + str(int((1/speed7)*1000000))
+        prof = h264profiles[profile].split(" ")
+        #datastr += " --profile " + str(prof[0]) + " --level " + str(prof[1])
+        datastr += " --level " + str(prof[1])
+        if vpreview == 0:
+            datastr += " -n "
+        datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
+        if zoom > 0 and Pi_Cam != 4:
+            datastr += " --width " + str(pre_width) + " --height " + str(pre_height)
+        elif Pi_Cam == 4 and zoom > 1:  # HQ cropped
+            vformat = crop4_f[zoom]
+            vwidth  = vwidths[vformat]
+            vheight = vheights[vformat]
+            datastr += " --mode 4056:2160:10  --width " + str(vwidth) + " --height " + str(vheight)
+        elif Pi_Cam == 4 and vwidth == 2028:
+            datastr += " --mode 4056:2160:12"
+        elif Pi_Cam == 3 and vwidth == 2304 and codec == 0:
+            datastr += " --mode 2304:1296:10 --width 2304 --height 1296"
+        elif Pi_Cam == 3 and vwidth == 2028 and codec == 0:
+            datastr += " --mode 2028:1520:10 --width 2028 --height 1520"
+        else:
+            datastr += " --width " + str(vwidth) + " --height " + str(vheight)
+        if mode == 0:
+            datastr += " --shutter " + str(sspeed)
+        else:
+            datastr += " --exposure " + modes[mode]
+        datastr += " --gain " + str(gain)
+        if ev != 0:
+            datastr += " --ev " + str(ev)
+        if awb == 0:
+            datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
+        else:
+            datastr += " --awb " + awbs[awb]
+        datastr += " --metering " + meters[meter]
+        datastr += " --saturation " + str(saturation/10)
+        datastr += " --sharpness " + str(sharpness/10)
+        datastr += " --denoise "    + denoises[denoise]
+        datastr += " --bitrate " + str(bits)
+        if vflip == 1:
+            datastr += " --vflip"
+        if hflip == 1:
+            datastr += " --hflip"
+        if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
+            datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
+        if Pi_Cam == 4 and scientific == 1:
+            if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
+                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json"
+            if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
+                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json"
+        if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6) ) or Pi_Cam == 8:
+            datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode]
+            if v3_f_mode == 1:
+                if Pi_Cam == 3:
+                    datastr += " --lens-position " + str(v3_focus/100)
+                if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
+                    datastr += " --lens-position " + str(focus/100)
+        if ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 or Pi_Cam == 6) ) or Pi_Cam == 8)  and zoom == 0 and fxx != 0 and v3_f_mode != 1:
+            datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fyz)
+        if (Pi_Cam == 3 and v3_af == 1) and v3_f_speed != 0:
+            datastr += " --autofocus-speed " + v3_f_speeds[v3_f_speed]
+        if (Pi_Cam == 3 and v3_af == 1) and v3_f_range != 0:
+            datastr += " --autofocus-range " + v3_f_ranges[v3_f_range]
+        if Pi_Cam == 3 or Pi == 5:
+            datastr += " --hdr " + v3_hdrs[v3_hdr]
+        datastr += " -p 0,0," + str(pre_width) + "," + str(pre_height)
+        if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
+            zws = vwidths[vformat]
+            zhs = vheights[vformat]
+            zxo = ((igw-zws)/2)/igw
+            zyo = ((2160-zhs)/2)/2160
+            datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
+        elif zoom > 1:
+            zws = (igw * zfs[zoom])
+            zhs = (igh * zfs[zoom])
+            zxo = ((igw-int(zws))/2)/igw
+            zyo = ((igh-int(zhs))/2)/igh
+            datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
+        if stream_type == 2:
+            data = "#rtp{sdp=rtsp://:" + str(stream_port) + "/stream1}"
+            datastr += " --inline -o - | cvlc stream:///dev/stdin --sout '" + data + "' :demux=h264"
+        if show_cmds == 1:
+            print (datastr)
+        p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
+        start_video = time.monotonic()
+        stop = 0
+        while (time.monotonic() - start_video < vlen or vlen == 0) and stop == 0:
+            if vlen != 0:
+                vlength = int(vlen - (time.monotonic()-start_video))
+            else:
+                vlength = int(time.monotonic()-start_video)
+            td = timedelta(seconds=vlength)
+            text(1,1,1,1,1,str(td),fv,11)
+            for event in pygame.event.get():
+                if (event.type == MOUSEBUTTONUP):
+                    mousex, mousey = event.pos
+                    # stop video streaming
+                    button_column,button_row,button_pos = cell_at(mousex,mousey)
+                    if button_column == 2 and button_row == 1:
+                       os.killpg(p.pid, signal.SIGTERM)
+                       stop = 1
+        td = timedelta(seconds=vlen)
+        if rotate != 0:
+            pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,pre_width,pre_height),0)
+        text(1,1,3,1,1,str(td),fv,11)
+        button(1,0,0,3)
+        text(0,0,1,0,1,"CAPTURE STILL",ft,7)
+        text(1,0,1,0,1,"CAPTURE/Stream",ft-2,7)
+        text(1,0,1,1,1,"Video",ft,7)
+        text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
+        text(1,9,1,0,1,"CAP T/LPSE",ft,7)
+        if tinterval > 0:
+            text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
+        else:
+            text(1,9,3,1,1,"",ft,7)
+        restart = 2
+
+def take_timelapse():
+    global restart,count,datastr,vformat,vwidth,vheight,p,event,mousex,mousey,button_column,button_row,button_pos,image,tduration,st_scale
+    if event.button == 1:
+            # TAKE TIMELAPSE
+            stop_preview()
             restart = 1
+            button(1,9,1,1)
+            text(1,9,3,0,1,"STOP",ft,0)
+            text(1,9,3,1,1,"Timelapse",ft,0)
+            text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
+            text(1,0,0,0,1,"CAPTURE/Stream",ft-2,7)
+            text(1,0,0,1,1,"Video",ft,7)
+            tcount = 0
 
-        # HISTOGRAM SIZE IF ZOOMED (Mouse Wheel)
-        if mousex < pre_width and mousey < pre_height and mousex != 0 and mousey != 0 and (event.button == 4 or event.button == 5) and zoom > 0:
-            for f in range(0,len(video_limits)-1,3):
-                if video_limits[f] == 'histarea':
-                    pmin = video_limits[f+1]
-                    pmax = video_limits[f+2]
-            if event.button == 5:
-                histarea -=1
-                histarea = max(histarea,pmin)
-            else:
-                histarea +=1
-                histarea = min(histarea,pmax)
-            if xx - histarea < 0 or xy - histarea < 0:
-                histarea = old_histarea
-            if xy + histarea > pre_height or xx + histarea > pre_width:
-                histarea = old_histarea
-            if (Pi_Cam == 3 and v3_af == 1) and (xy + histarea > pre_height * 0.75 or xx + histarea > pre_width):
-                histarea = old_histarea
-            text(1,14,3,1,1,str(histarea),fv,7)
-            draw_Vbar(0,1,14,greyColor,'histarea',histarea)
-            old_histarea = histarea
+            if tinterval > 0 and mode != 0: # normal mode
+                text(1,9,3,0,1,"STOP",ft,0)
+                text(1,9,3,1,1,"Timelapse",ft,0)
+                text(0,0,6,2,1,"Please Wait, taking Timelapse ...",int(fv*1.7),1)
+                now = datetime.datetime.now()
+                timestamp = now.strftime("%y%m%d%H%M%S")
+                count = 0
+                fname =  pic_dir + str(timestamp) + '_%04d.' + extns2[extn]
+                if lver < 12:
+                    datastr = "libcamera-still"
+                else:
+                    datastr = "rpicam-still"
+                if Pi == 5 and extns[extn] == "jpg" and Pi_Cam != 8:
+                    datastr += " --zsl"
+                if extns[extn] != 'raw':
+                    datastr += " --camera " + str(camera) + " -e " + extns[extn] + " -s -t 0 -o " + fname
+                    if fullscreen != 1:
+                        datastr += " -p 0,0,640,480 "
+                else:
+                    datastr += " --camera " + str(camera) + " -r -s -t 0 -o " + fname
+                    if fullscreen != 1:
+                        datastr += " -p 0,0,640,480 "
+                datastr += " -n"
+                datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
+                if mode == 0:
+                    datastr += " --shutter " + str(sspeed)
+                else:
+                    datastr += " --exposure " + modes[mode]
+                if ev != 0:
+                    datastr += " --ev " + str(ev)
+                if sspeed > 1000000 and mode == 0 and (Pi_Cam < 5 or Pi_Cam == 7):
+                    datastr += " --gain " + str(gain) + " --immediate --awbgains " + str(red/10) + "," + str(blue/10)
+                else:
+                    datastr += " --gain " + str(gain)
+                    if awb == 0:
+                        datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
+                    else:
+                        datastr += " --awb " + awbs[awb]
+                datastr += " --metering " + meters[meter]
+                datastr += " --saturation " + str(saturation/10)
+                datastr += " --sharpness " + str(sharpness/10)
+                datastr += " --quality " + str(quality)
+                datastr += " --denoise "    + denoises[denoise]
+                if vflip == 1:
+                    datastr += " --vflip"
+                if hflip == 1:
+                    datastr += " --hflip"
+                if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
+                    datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
+                if Pi_Cam == 4 and scientific == 1:
+                    if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
+                        datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json"
+                    if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
+                        datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json"
+                if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8:
+                    datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode]
+                    if v3_f_mode == 1:
+                        if Pi_Cam == 3 and v3_af == 1:
+                            datastr += " --lens-position " + str(v3_focus/100)
+                        if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
+                            datastr += " --lens-position " + str(focus/100)
+                elif (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0 and fxz == 1:
+                    datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode] + " --autofocus-on-capture"
+                if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8) and zoom == 0:
+                    datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fyz)
+                if Pi_Cam == 3 or Pi == 5:
+                    datastr += " --hdr " + v3_hdrs[v3_hdr]
+                if (Pi_Cam == 6 or Pi_Cam == 8) and mode == 0 and st_scale == 8:
+                    datastr += " --width 4624 --height 3472 " # 16MP superpixel mode for higher light sensitivity 2x2 binning
+                elif (Pi_Cam == 5 or Pi_Cam == 6 or Pi_Cam == 8):
+                    if Pi != 5 and lo_res == 1:
+                        datastr += " --width 4624 --height 3472"
+                    elif Pi_Cam == 6:
+                        datastr += " --width 9152 --height 6944"
+                    elif Pi_Cam == 8:
+                        datastr += " --width 9248 --height 6944"
+                elif Pi_Cam == 4 and zoom > 1:  # HQ cropped
+                    vformat = crop4_f[zoom]
+                    vwidth  = vwidths[vformat]
+                    vheight = vheights[vformat]
+                    datastr += " --mode 4056:2160:10  --width " + str(int(vwidth/st_scale)) + " --height " + str(int(vheight/st_scale))
+                elif Pi_Cam == 4 and st_scale == 8: # HQ 2x2 binning
+                    datastr += " --mode 2028:1520:10  --width 2028 --height 1520"
+                elif st_scale > 1: # image reduced by st_scale
+                    datastr += " --mode " + str(x_sens[Pi_Cam]) + ":" + str(y_sens[Pi_Cam]) + ":10" + " --width " + str(int(x_sens[Pi_Cam]/int(st_scale))) + " --height " + str(int(y_sens[Pi_Cam]/int(st_scale)))
+                if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
+                    zws = vwidths[vformat]
+                    zhs = vheights[vformat]
+                    zxo = ((igw-zws)/2)/igw
+                    zyo = ((2160-zhs)/2)/2160
+                    datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
+                elif zoom > 1:
+                    zws = int(igw * zfs[zoom])
+                    zhs = int(igh * zfs[zoom])
+                    zxo = ((igw-zws)/2)/igw
+                    zyo = ((igh-zhs)/2)/igh
+                    datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
+                p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
+                if show_cmds == 1:
+                    print (datastr)
+                start_timelapse = time.monotonic()
+                start2 = time.monotonic()
+                stop = 0
+                pics3 = []
+                count = 0
+                old_count = 0
+                while count < tshots and stop == 0:
+                    if time.monotonic() - start2 >= tinterval:
+                        if lver < 12:
+                            os.system('pkill -SIGUSR1 libcamera-still')
+                        else:
+                            os.system('pkill -SIGUSR1 rpicam-still')
+                        start2 = time.monotonic()
+                        text(0,0,6,2,1,"Please Wait, taking Timelapse ..."  + " " + str(count+1),int(fv*1.7),1)
+                        show = 0
+                        while count == old_count:
+                            time.sleep(0.1)
+                            pics3 = glob.glob(pic_dir + "*.*")
+                            counts = []
+                            for xu in range(0,len(pics3)):
+                                ww = pics3[xu].split("/")
+                                if ww[4][0:12] == timestamp:
+                                    counts.append(pics3[xu])
+                            count = len(counts)
+                            counts.sort()
+                            for event in pygame.event.get():
+                                if (event.type == MOUSEBUTTONUP):
+                                    mousex, mousey = event.pos
+                                    # stop timelapse
+                                    button_column,button_row,button_pos = cell_at(mousex,mousey)
+                                    if button_column == 2 and button_row == 10:
+                                        os.killpg(p.pid, signal.SIGTERM)
+                                        text(1,12,3,1,1,str(tshots),fv,12)
+                                        stop = 1
+                                        count = tshots
+                        old_count = count
+                        text(1,12,1,1,1,str(tshots - count),fv,12)
+                        tdur = tinterval * (tshots - count)
+                        td = timedelta(seconds=tdur)
+                        text(1,10,1,1,1,str(td),fv,12)
+                    time.sleep(0.1)
+                    if buttonSTR.is_pressed: #
+                        type = pygame.MOUSEBUTTONUP
+                        if str_cap == 2:
+                            click_event = pygame.event.Event(type, {"button": 3, "pos": (0,0)})
+                        else:
+                            click_event = pygame.event.Event(type, {"button": 1, "pos": (0,0)})
+                        pygame.event.post(click_event)
+                    for event in pygame.event.get():
+                        if (event.type == MOUSEBUTTONUP):
+                            mousex, mousey = event.pos
+                            # stop timelapse or capture STILL
+                            button_column,button_row,button_pos = cell_at(mousex,mousey)
+                            if button_column == 2 and button_row == 10:
+                                os.killpg(p.pid, signal.SIGTERM)
+                                text(1,12,3,1,1,str(tshots),fv,12)
+                                stop = 1
+                                count = tshots
+                            if button_column == 1 and button_row == 1:
+                                if lver < 12:
+                                    os.system('pkill -SIGUSR1 libcamera-still')
+                                else:
+                                    os.system('pkill -SIGUSR1 rpicam-still')
+                                text(0,0,3,0,1,"CAPTURE",ft,7)
+                                time.sleep(0.25)
+                                text(0,0,1,0,1,"CAPTURE",ft,7)
+                if lver < 12:
+                    os.system('pkill -SIGUSR2 libcamera-still')
+                else:
+                    os.system('pkill -SIGUSR2 rpicam-still')
 
-        if mousex == 0 and mousey == 0:
-            str_btn = 1
-        # determine button pressed
-        if (mousex > pre_width or (alt_dis ==1 and mousey > pre_height)or (alt_dis ==2 and mousey > pre_height *.75)) or str_btn == 1:
-          # normal layout(buttons on right)
-          if mousex > pre_width and alt_dis == 0:
-              button_column = int((mousex-pre_width)/bw) + 1
-              button_row = int((mousey)/bh) + 1
-              if mousex > pre_width + bw:
-                  if mousex > pre_width + bw + (bw/2):
-                      button_pos = 3
-                  else:
-                      button_pos = 2
-              elif mousex > pre_width + (bw/2):
-                  button_pos = 1
-              else:
-                  button_pos = 0
-          # square layout 1 (buttons below)    
-          elif alt_dis == 1:
-              if mousey - pre_height < bh:
-                  button_column = 1
-                  button_row = int(mousex / bw) + 1
-                  if mousex > ((button_row -1) * bw) + (bw/2):
-                      button_pos = 1
-                  else:
-                      button_pos = 0
-              elif mousey - pre_height < bh * 2:
-                  button_column = 1
-                  button_row = int(mousex / bw) + 9
-                  if mousex > ((button_row - 9) * bw) + (bw/2):
-                      button_pos = 1
-                  else:
-                      button_pos = 0
-              elif mousey - pre_height < bh * 3:
-                  button_column = 2
-                  button_row = int(mousex / bw) + 1
-                  if mousex > ((button_row -1) * bw) + (bw/2):
-                      button_pos = 1
-                  else:
-                      button_pos = 0
-              elif mousey - pre_height < bh * 4:
-                  button_column = 2
-                  button_row = int(mousex / bw) + 9
-                  if mousex > ((button_row - 9) * bw) + (bw/2):
-                      button_pos = 1
-                  else:
-                      button_pos = 0
-          # square layout 2 (buttons below)             
-          elif alt_dis == 2:
-              if mousey - (pre_height * .75) < bh:
-                  button_column = 1
-                  button_row = int(mousex / bw) + 1
-                  if mousex > ((button_row -1) * bw) + (bw/2):
-                      button_pos = 1
-                  else:
-                      button_pos = 0
-              elif mousey - (pre_height * .75) < bh * 2:
-                  button_column = 1
-                  button_row = int(mousex / bw) + 9
-                  if mousex > ((button_row - 9) * bw) + (bw/2):
-                      button_pos = 1
-                  else:
-                      button_pos = 0
-              elif mousey - (pre_height * .75) < bh * 3:
-                  button_column = 2
-                  button_row = int(mousex / bw) + 1
-                  if mousex > ((button_row -1) * bw) + (bw/2):
-                      button_pos = 1
-                  else:
-                      button_pos = 0
-              elif mousey - (pre_height * .75) < bh * 4:
-                  button_column = 2
-                  button_row = int(mousex / bw) + 9
-                  if mousex > ((button_row - 9) * bw) + (bw/2):
-                      button_pos = 1
-                  else:
-                      button_pos = 0
-                      
-          # capture on STR button press
-          if str_btn == 1:
-              if str_cap == 0:
-                  button_column = 1
-                  button_row = 1
-              elif str_cap == 1 or str_cap == 2:
-                  button_column = 2
-                  button_row = 1
-              elif str_cap == 3:
-                  button_column = 2
-                  button_row = 10
-              str_btn = 0
-          
-          if button_column == 1:
-            if button_row == 1 :
-                if event.button == 1:
-                        # TAKE STILL
-                        os.killpg(p.pid, signal.SIGTERM)
-                        button(0,0,1,4)
-                        if os.path.exists("PiLibtext.txt"):
-                             os.remove("PiLibtext.txt")
-                        text(0,0,2,0,1,"CAPTURING",ft,0)
-                        text(0,0,2,1,1,str(st_scales[st_scale]),ft,0)
-                        text(1,0,0,0,1,"CAPTURE/Stream",ft-2,7)
-                        text(1,0,0,1,1,"Video",ft,7)
-                        text(1,9,0,0,1,"CAP T/LPSE",ft,7)
-                        if tinterval > 0:
-                            text(1,9,0,1,1,str(st_scales[st_scale]),ft,7)
+            elif tinterval > 0 and mode == 0: # manual mode
+                text(1,9,3,0,1,"STOP",ft,0)
+                text(1,9,3,1,1,"Timelapse",ft,0)
+                text(0,0,6,2,1,"Please Wait, taking Timelapse ...",int(fv*1.7),1)
+                now = datetime.datetime.now()
+                timestamp = now.strftime("%y%m%d%H%M%S")
+                start2 = time.monotonic()
+                stop = 0
+                pics3 = []
+                count = 0
+                old_count = 0
+                trig = 1
+                while count < tshots and stop == 0:
+                    if time.monotonic() - start2 > tinterval:
+                        start2 = time.monotonic()
+                        if p != None:
+                            poll = p.poll()
+                            while poll == None:
+                                poll = p.poll()
+                                time.sleep(0.1)
+                        fname =  pic_dir + str(timestamp) + "_" + str(count) + "." + extns2[extn]
+                        if lver < 12:
+                            datastr = "libcamera-still"
                         else:
-                            text(1,9,0,1,1,"   ",ft,7)
-                        text(0,0,6,2,1,"Please Wait, taking still ...",int(fv*1.7),1)
-                        now = datetime.datetime.now()
-                        timestamp = now.strftime("%y%m%d%H%M%S")
+                            datastr = "rpicam-still"
+                        if Pi == 5 and extns[extn] == "jpg" and Pi_Cam != 8:
+                            datastr += " --zsl"
                         if extns[extn] != 'raw':
-                            fname =  pic_dir + str(timestamp) + '.' + extns2[extn]
-                            if lver < 12:
-                                datastr = "libcamera-still"
-                            else:
-                                datastr = "rpicam-still"
-                            if Pi == 5 and extns[extn] == "jpg" and Pi_Cam != 8:
-                                datastr += " --zsl"
-                            datastr += " --camera " + str(camera) + " -e " + extns[extn] + " -n "
-                            datastr += "-t " + str(timet) + " -o " + fname
-                        else:
-                            fname =  pic_dir + str(timestamp) + '.' + extns2[extn]
-                            if lver < 12:
-                                datastr = "libcamera-still"
-                            else:
-                                 datastr = "rpicam-still"
-                            datastr += " --camera " + str(camera) + " -r -n -o " + fname
-                        datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100) 
-                        if mode == 0:
-                            datastr += " --shutter " + str(sspeed)
+                            datastr += " --camera " + str(camera) + " -e " + extns[extn] + " -t " + str(timet) + " -o " + fname + " -p 0,0,640,480 "
                         else:
-                            datastr += " --exposure " + str(modes[mode])
+                            datastr += " --camera " + str(camera) + " -r -t 1000 -o " + fname + " -p 0,0,640,480 "
+                        datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
+                        datastr += " --shutter " + str(sspeed)
                         if ev != 0:
                             datastr += " --ev " + str(ev)
                         if sspeed > 1000000 and mode == 0 and (Pi_Cam < 5 or Pi_Cam == 7):
                             datastr += " --gain " + str(gain) + " --immediate --awbgains " + str(red/10) + "," + str(blue/10)
-                        else:    
+                        else:
                             datastr += " --gain " + str(gain)
                             if awb == 0:
                                 datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
                             else:
                                 datastr += " --awb " + awbs[awb]
+                        datastr += " -n"
                         datastr += " --metering " + meters[meter]
                         datastr += " --saturation " + str(saturation/10)
                         datastr += " --sharpness " + str(sharpness/10)
                         datastr += " --quality " + str(quality)
+                        datastr += " --denoise "    + denoises[denoise]
                         if vflip == 1:
                             datastr += " --vflip"
                         if hflip == 1:
                             datastr += " --hflip"
-                        datastr += " --denoise " + denoises[denoise]
                         if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
                             datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
                         if Pi_Cam == 4 and scientific == 1:
@@ -1912,34 +3699,34 @@ while True:
                         if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8:
                             datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode]
                             if v3_f_mode == 1:
-                                if Pi_Cam == 3:
+                                if Pi_Cam == 3 and v3_af == 1:
                                     datastr += " --lens-position " + str(v3_focus/100)
                                 if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
                                     datastr += " --lens-position " + str(focus/100)
                         elif (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0 and fxz == 1:
                             datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode] + " --autofocus-on-capture"
-                        if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1)or Pi_Cam == 6)) or Pi_Cam == 8) and zoom == 0 and fxz != 1:
-                            datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fxz)
-                        if Pi_Cam == 3 or Pi == 5:
+                        if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8)  and zoom == 0:
+                            datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fyz)
+                        if Pi_Cam == 3:
                             datastr += " --hdr " + v3_hdrs[v3_hdr]
-                        if (Pi_Cam == 6 or Pi_Cam == 8) and st_scale == 8:
+                        if (Pi_Cam == 6 or Pi_Cam == 8) and mode == 0 and st_scale == 8:
                             datastr += " --width 4624 --height 3472 " # 16MP superpixel mode for higher light sensitivity
-                        elif Pi_Cam == 4 and zoom > 1 and PiHQ_ON == 1:  # HQ cropped
-                            vformat = crop4_f[zoom]
-                            vwidth  = vwidths[vformat]
-                            vheight = vheights[vformat]
-                            datastr += " --mode 4056:2160:10  --width " + str(int(vwidth/st_scale)) + " --height " + str(int(vheight/st_scale))
-                        elif Pi_Cam == 4 and st_scale == 8: # HQ 2x2 binning
-                            datastr += " --mode 2028:1520:10  --width 2028 --height 1520"
-                        elif st_scale > 1: # image reduced by st_scale
-                            datastr += " --mode " + str(x_sens[Pi_Cam]) + ":" + str(y_sens[Pi_Cam]) + ":10" + " --width " + str(int(x_sens[Pi_Cam]/int(st_scale))) + " --height " + str(int(y_sens[Pi_Cam]/int(st_scale)))
-                        elif Pi_Cam == 6 or Pi_Cam == 8:
+                        elif (Pi_Cam == 5 or Pi_Cam == 6 or Pi_Cam == 8):
                             if Pi != 5 and lo_res == 1:
                                 datastr += " --width 4624 --height 3472"
                             elif Pi_Cam == 6:
                                 datastr += " --width 9152 --height 6944"
                             elif Pi_Cam == 8:
                                 datastr += " --width 9248 --height 6944"
+                        elif Pi_Cam == 4 and zoom > 1:  # HQ cropped
+                            vformat = crop4_f[zoom]
+                            vwidth  = vwidths[vformat]
+                            vheight = vheights[vformat]
+                            datastr += " --mode 4056:2160:10  --width " + str(int(vwidth/st_scale)) + " --height " + str(int(vheight/st_scale))
+                        elif Pi_Cam == 4 and st_scale == 8: # HQ 2x2 binning
+                            datastr += " --mode 2028:1520:10  --width 2028 --height 1520"
+                        elif st_scale > 1: # image reduced by st_scale
+                            datastr += " --mode " + str(x_sens[Pi_Cam]) + ":" + str(y_sens[Pi_Cam]) + ":10" + " --width " + str(int(x_sens[Pi_Cam]/int(st_scale))) + " --height " + str(int(y_sens[Pi_Cam]/int(st_scale)))
                         if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
                             zws = vwidths[vformat]
                             zhs = vheights[vformat]
@@ -1952,2667 +3739,1821 @@ while True:
                             zxo = ((igw-zws)/2)/igw
                             zyo = ((igh-zhs)/2)/igh
                             datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
-                        datastr += " --metadata - --metadata-format txt >> PiLibtext.txt"
                         if show_cmds == 1:
                             print (datastr)
-                        os.system(datastr)
-
-                        while not os.path.exists(fname):
-                            pass
-                        if extns2[extn] == 'jpg' or extns2[extn] == 'bmp' or extns2[extn] == 'png':
-                            image = pygame.image.load(fname)
-                            if rotate != 0:
-                                image = pygame.transform.rotate(image, int(rotate * 90))
-                                pygame.image.save(image,fname[:-4]+"r." + extns2[extn])
-                            if image.get_width()/image.get_height() > 1.333:
-                                if rotate == 0:
-                                    image = pygame.transform.scale(image,(pre_width,int(pre_width * (image.get_height()/image.get_width()))))
-                                else:
-                                    if rotate != 2:
-                                        igwr = image.get_width()
-                                        ighr = image.get_height()
-                                        if alt_dis < 2:
-                                            image = pygame.transform.scale(image, (int(pre_height * (igwr/ighr)),pre_height))
-                                        else:
-                                            image = pygame.transform.scale(image, (int(pre_height * .75 * (igwr/ighr)),pre_height * .75))
-                                    else:
-                                        image = pygame.transform.scale(image, (pre_width,pre_height))
-                            else:
-                                if rotate == 0 or rotate == 2:
-                                    image = pygame.transform.scale(image, (pre_width,pre_height))
+                        p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
+                        text(0,0,6,2,1,"Please Wait, taking Timelapse ..."  + " " + str(count+1),int(fv*1.7),1)
+                        show = 0
+                        while count == old_count:
+                            time.sleep(0.1)
+                            pics3 = glob.glob(pic_dir + "*.*")
+                            counts = []
+                            for xu in range(0,len(pics3)):
+                                ww = pics3[xu].split("/")
+                                if ww[4][0:12] == timestamp:
+                                    counts.append(pics3[xu])
+                            count = len(counts)
+                            counts.sort()
+                            if (extns2[extn] == 'jpg' or extns2[extn] == 'bmp' or extns2[extn] == 'png') and count > 0 and show == 0:
+                                image = pygame.image.load(counts[count-1])
+                                if image.get_width()/image.get_height() > 1.333:
+                                    catSurfacesmall = pygame.transform.scale(image,(pre_width,int(pre_width * (image.get_height()/image.get_width()))))
                                 else:
-                                    if rotate != 2:
-                                        igwr = image.get_width()
-                                        ighr = image.get_height()
-                                        image = pygame.transform.scale(image, (int(pre_height * (igwr/ighr)),pre_height))
-                                    else:
-                                        image = pygame.transform.scale(image, (pre_width,pre_height))
-                            if rotate == 1 or rotate == 3:
-                                windowSurfaceObj.blit(image, (int((pre_width/2) - ((pre_height * (igwr/ighr)))/2),0))
-                            else:
-                                windowSurfaceObj.blit(image, (0,0))
-                        dgain = 0
-                        again = 0
-                        etime = 0
-                        if os.path.exists("PiLibtext.txt"):
-                          with open("PiLibtext.txt", "r") as file:
-                            line = file.readline()
-                            check = line.split("=")
-                            if check[0] == "DigitalGain":
-                                dgain = check[1][:-1]
-                            if check[0] == "AnalogueGain":
-                                again = check[1][:-1]
-                            if check[0] == "ExposureTime":
-                                etime = check[1][:-1]
-                            while line:
-                                line = file.readline()
-                                check = line.split("=")
-                                if check[0] == "DigitalGain":
-                                    dgain = check[1][:-1]
-                                if check[0] == "AnalogueGain":
-                                    again = check[1][:-1]
-                                if check[0] == "ExposureTime":
-                                    etime = check[1][:-1]
-                          if alt_dis < 2:
-                              text(0,26,6,2,1,"Ana Gain: " + str(again) + " Dig Gain: " + str(dgain) + " Exp Time: " + str(etime) +"uS",int(fv*1.5),1)
-                          else:
-                              text(0,19,6,2,1,"Ana Gain: " + str(again) + " Dig Gain: " + str(dgain) + " Exp Time: " + str(etime) +"uS",int(fv*1.5),1)
-                        text(0,0,6,2,1,fname,int(fv*1.5),1)
-                        pygame.display.update()
-                        time.sleep(3)
-                        if rotate != 0 and alt_dis < 2:
-                            pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,pre_width,pre_height),0)
-                        if rotate == 0 and alt_dis < 2:
-                            pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,int(pre_height * .75),pre_width,pre_height /4),0)
-                        button(0,0,0,4)
-                        text(0,0,1,0,1,"CAPTURE STILL",ft,7)
-                        text(1,0,1,0,1,"CAPTURE/Stream",ft-2,7)
-                        text(1,0,1,1,1,"Video",ft,7)
-                        text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
-                        text(1,9,1,0,1,"CAP T/LPSE",ft,7)
-                        if tinterval > 0:
-                            text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
-                        else:
-                            text(1,9,3,1,1,"",ft,7)
-                        restart = 2
-                else:
-                    st_scale = int(st_scale * 2)
-                    if st_scale > 8:
-                        st_scale = 1
-                    if st_scale > 4 and Pi_Cam != 4 and Pi_Cam != 6 and Pi_Cam != 8:
-                        st_scale = 1
-                    text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
-                    if tinterval > 0:
-                        text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
-                    else:
-                        text(1,9,1,1,1,"",ft,7)
-                        
-            if button_row == 2:
-                # MODE
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'mode':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    mode = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
-                    mode = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
-                    mode = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        mode -=1
-                        mode  = max(mode ,pmin)
-                    else:
-                        mode  +=1
-                        mode = min(mode ,pmax)
-                if mode == 0:
-                    text(0,2,5,0,1,"Shutter S",ft,10)
-                    draw_bar(0,2,lgrnColor,'speed',speed)
-                    if shutters[speed] < 0:
-                        text(0,2,3,1,1,"1/" + str(abs(shutters[speed])),fv,10)
-                    else:
-                        text(0,2,3,1,1,str(shutters[speed]),fv,10)
-                    if gain == 0:
-                        gain = 1
-                        text(0,3,5,0,1,"Gain    A/D",ft,10)
-                        if gain <= mag:
-                            text(0,3,3,1,1,str(gain) + " :  " + str(gain) + "/1",fv,10)
-                        else:
-                            text(0,3,3,1,1,str(gain) + " :  " + str(int(mag)) + "/" + str(((gain/mag)*10)/10)[0:3],fv,10)
-                        draw_bar(0,3,lgrnColor,'gain',gain)
-                else:
-                    text(0,2,5,0,1,"eV",ft,10)
-                    text(0,2,3,1,1,str(ev),fv,10)
-                    draw_bar(0,2,lgrnColor,'ev',ev)
-                    gain = 0
-                    text(0,3,5,0,1,"Gain ",ft,10)
-                    text(0,3,3,1,1,"Auto",fv,10)
-                    draw_bar(0,3,lgrnColor,'gain',gain)
-                text(0,1,3,1,1,modes[mode],fv,10)
-                draw_bar(0,1,lgrnColor,'mode',mode)
-                td = timedelta(seconds=tinterval)
-                text(1,11,3,1,1,str(td),fv,12)
-                draw_Vbar(0,1,10,lyelColor,'tinterval',tinterval)
-                if tinterval > 0:
-                    tduration = tinterval * tshots
-                if mode == 0 and tinterval == 0 :
-                    speed = 15
-                    shutter = shutters[speed]
-                    if shutter < 0:
-                        shutter = abs(1/shutter)
-                    sspeed = int(shutter * 1000000)
-                    if (shutter * 1000000) - int(shutter * 1000000) > 0.5:
-                        sspeed +=1
-                    if shutters[speed] < 0:
-                        text(0,2,3,1,1,"1/" + str(abs(shutters[speed])),fv,10)
-                    else:
-                        text(0,2,3,1,1,str(shutters[speed]),fv,10)
-                    draw_bar(0,2,lgrnColor,'speed',speed)
+                                    catSurfacesmall = pygame.transform.scale(image, (pre_width,pre_height))
+                                windowSurfaceObj.blit(catSurfacesmall, (0, 0))
+                                text(0,0,6,2,1,counts[count-1],int(fv*1.5),1)
+                                pygame.display.update()
+                                show == 1
+                            for event in pygame.event.get():
+                                if (event.type == MOUSEBUTTONUP):
+                                    mousex, mousey = event.pos
+                                    # stop timelapse
+                                    button_column,button_row,button_pos = cell_at(mousex,mousey)
+                                    if button_column == 2 and button_row == 10:
+                                        os.killpg(p.pid, signal.SIGTERM)
+                                        text(1,12,3,1,1,str(tshots),fv,12)
+                                        stop = 1
+                                        count = tshots
 
-                time.sleep(.25)
-                restart = 1
+                        old_count = count
+                        text(1,12,1,1,1,str(tshots - count),fv,12)
+                        tdur = tinterval * (tshots - count)
+                        td = timedelta(seconds=tdur)
+                        text(1,10,1,1,1,str(td),fv,12)
+                    time.sleep(0.1)
+                    for event in pygame.event.get():
+                        if (event.type == MOUSEBUTTONUP):
+                            mousex, mousey = event.pos
+                            # stop timelapse
+                            button_column,button_row,button_pos = cell_at(mousex,mousey)
+                            if button_column == 2 and button_row == 10:
+                                os.killpg(p.pid, signal.SIGTERM)
+                                text(1,12,3,1,1,str(tshots),fv,12)
+                                stop = 1
+                                count = tshots
 
-            elif button_row == 3:
-                # SHUTTER SPEED or EV (dependent on MODE set)
-                if mode == 0 :
-                    for f in range(0,len(still_limits)-1,3):
-                        if still_limits[f] == 'speed':
-                            pmin = still_limits[f+1]
-                            pmax = max_speed
-                    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                        speed = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                    elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
-                        speed = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                    elif (mousey > pre_height * .75 and mousey < pre_height * .75  + int(bh/3)) and alt_dis == 2:
-                        speed = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                    else:
-                        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                            speed -=1
-                            speed  = max(speed ,pmin)
-                        else:
-                            speed  +=1
-                            speed = min(speed ,pmax)
-                    shutter = shutters[speed]
-                    if shutter < 0:
-                        shutter = abs(1/shutter)
-                    sspeed = int(shutter * 1000000)
-                    if (shutter * 1000000) - int(shutter * 1000000) > 0.5:
-                        sspeed +=1
-                    if shutters[speed] < 0:
-                        text(0,2,3,1,1,"1/" + str(abs(shutters[speed])),fv,10)
-                    else:
-                        text(0,2,3,1,1,str(shutters[speed]),fv,10)
-                    draw_bar(0,2,lgrnColor,'speed',speed)
-                    if tinterval > 0:
-                        tinterval = int(sspeed/1000000)
-                        tinterval = max(tinterval,1)
-                        td = timedelta(seconds=tinterval)
-                        text(1,11,3,1,1,str(td),fv,12)
-                        draw_Vbar(0,1,11,lyelColor,'tinterval',tinterval)
-                        tduration = tinterval * tshots
-                        td = timedelta(seconds=tduration)
-                        text(1,10,3,1,1,str(td),fv,12)
-                        draw_Vbar(0,1,10,lyelColor,'tduration',tduration)
-                        
-                    time.sleep(.25)
-                    restart = 1
-                else:
-                    # EV
-                    for f in range(0,len(still_limits)-1,3):
-                        if still_limits[f] == 'ev':
-                            pmin = still_limits[f+1]
-                            pmax = still_limits[f+2]
-                    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                        ev = int(((mousex-pre_width) / bw) * (pmax+1-pmin)) + pmin 
-                    elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
-                        ev = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin)) + pmin
-                    elif (mousey > pre_height * .75  and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
-                        ev = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin)) + pmin
-                    else:
-                        if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                            ev -=1
-                            ev  = max(ev ,pmin)
-                        else:
-                            ev  +=1
-                            ev = min(ev ,pmax)
-                    text(0,2,3,1,1,str(ev),fv,10)
-                    draw_bar(0,2,lgrnColor,'ev',ev)
-                    time.sleep(0.25)
-                    restart = 1
-                    
-            elif button_row == 4:
-                # GAIN
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'gain':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    gain = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
-                    gain = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75  and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
-                    gain = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        gain -=1
-                        gain  = max(gain ,pmin)
-                    else:
-                        gain  +=1
-                        gain = min(gain ,pmax)
-                if gain > 0:
-                    text(0,3,5,0,1,"Gain    A/D",ft,10)
-                    if gain <= mag:
-                        text(0,3,3,1,1,str(gain) + " :  " + str(gain) + "/1",fv,10)
+            elif tinterval == 0:
+                if tduration == 0:
+                    tduration = 1
+                text(0,0,6,2,1,"Please Wait, taking Timelapse ...",int(fv*1.7),1)
+                now = datetime.datetime.now()
+                timestamp = now.strftime("%y%m%d%H%M%S")
+                fname =  pic_dir + str(timestamp) + '_%04d.' + extns2[extn]
+                if codecs2[codec] != 'raw':
+                    if lver < 12:
+                        datastr = "libcamera-vid"
                     else:
-                        text(0,3,3,1,1,str(gain) + " :  " + str(int(mag)) + "/" + str(((gain/mag)*10)/10)[0:3],fv,10)
+                        datastr = "rpicam-vid"
+                    datastr += " --camera " + str(camera) + " -n --codec mjpeg -t " + str(tduration*1000) + " --segment 1 -o " + fname
                 else:
-                    if gain == 0:
-                        text(0,3,5,0,1,"Gain ",ft,10)
+                    fname =  pic_dir + str(timestamp) + '_%04d.' + codecs2[codec]
+                    if lver < 12:
+                        datastr = "libcamera-raw"
                     else:
-                        text(0,3,5,0,1,"Gain    A/D",ft,10)
-                    text(0,3,3,1,1,"Auto",fv,10)
-                time.sleep(.25)
-                draw_bar(0,3,lgrnColor,'gain',gain)
-                restart = 1
-                
-            elif button_row == 5:
-                # BRIGHTNESS
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'brightness':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    brightness = int(((mousex-pre_width) / bw) * (pmax+1-pmin)) + pmin 
-                elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
-                    brightness = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin)) + pmin
-                elif (mousey > pre_height * .75  and mousey < pre_height * .75+ int(bh/3)) and alt_dis == 2:
-                    brightness = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin)) + pmin 
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        brightness -=1
-                        brightness  = max(brightness ,pmin)
+                        datastr = "rpicam-raw"
+                    datastr += " --camera " + str(camera) + " -n -t " + str(tduration*1000) + " --segment 1 -o " + fname
+                if Pi_Cam == 4 and zoom > 1:  # HQ cropped
+                    vformat = crop4_f[zoom]
+                    vwidth  = vwidths[vformat]
+                    vheight = vheights[vformat]
+                    datastr += " --mode 4056:2160:10  --width " + str(vwidth) + " --height " + str(vheight)
+                elif zoom == 1:  # RAW FULL sensor
+                    vformat = max_vfs[Pi_Cam]
+                    vwidth  = x_sens[Pi_Cam]
+                    vheight = y_sens[Pi_Cam]
+                    if Pi == 5:
+                        datastr += " --mode " + str(vwidth) + ":" + str(vheight) + ":12:U --width " + str(vwidth) + " --height " + str(vheight)
                     else:
-                        brightness  +=1
-                        brightness = min(brightness ,pmax)
-                text(0,4,3,1,1,str(brightness/100),fv,10)
-                draw_bar(0,4,lgrnColor,'brightness',brightness)
-                time.sleep(0.025)
-                restart = 1
-                
-            elif button_row == 6:
-                # CONTRAST
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'contrast':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    contrast = int(((mousex-pre_width) / bw) * (pmax+1-pmin)) 
-                elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
-                    contrast = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75  and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
-                    contrast = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        contrast -=1
-                        contrast  = max(contrast ,pmin)
+                        datastr += "  --mode " + str(vwidth) + ":" + str(vheight) + ":8 --width " + str(vwidth) + " --height " + str(vheight)
+                elif zoom > 0:
+                    if igw/igh > 1.5:
+                        datastr += " --width " + str(int(pre_width)) + " --height " + str(int(pre_height * .75))
                     else:
-                        contrast  +=1
-                        contrast = min(contrast ,pmax)
-                text(0,5,3,1,1,str(contrast/100)[0:4],fv,10)
-                draw_bar(0,5,lgrnColor,'contrast',contrast)
-                time.sleep(0.025)
-                restart = 1
-                
-            elif button_row == 7:
-                # AWB
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'awb':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    awb = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height and mousey < pre_height + int(bh/3)) and alt_dis == 1:
-                    awb = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
-                    awb = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+                        datastr += " --width " + str(pre_width) + " --height " + str(pre_height)
                 else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        awb -=1
-                        awb  = max(awb ,pmin)
-                    else:
-                        awb  +=1
-                        awb = min(awb ,pmax)
-                text(0,6,3,1,1,awbs[awb],fv,10)
-                draw_bar(0,6,lgrnColor,'awb',awb)
-                if awb == 0:
-                    text(0,7,5,0,1,"Blue",ft,10)
-                    text(0,8,5,0,1,"Red",ft,10)
-                    text(0,8,3,1,1,str(red/10)[0:3],fv,10)
-                    text(0,7,3,1,1,str(blue/10)[0:3],fv,10)
-                    draw_bar(0,7,lgrnColor,'blue',blue)
-                    draw_bar(0,8,lgrnColor,'red',red)
+                    datastr += " --width " + str(vwidth) + " --height " + str(vheight)
+                datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
+                if mode == 0:
+                    datastr += " --shutter " + str(sspeed) #+ " --framerate " + str(1000000/sspeed)
                 else:
-                    text(0,7,5,0,1,"Denoise",fv,10)
-                    text(0,7,3,1,1,denoises[denoise],fv,10)
-                    text(0,8,5,0,1,"Sharpness",fv,10)
-                    text(0,8,3,1,1,str(sharpness/10),fv,10)
-                    draw_bar(0,7,lgrnColor,'denoise',denoise)
-                    draw_bar(0,8,lgrnColor,'sharpness',sharpness)
-                time.sleep(.25)
-                restart = 1
-                
-            elif button_row == 8 and awb == 0:
-                # BLUE
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'blue':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    blue = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
-                    blue = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75  and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
-                    blue = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+                    datastr += " --exposure " + str(modes[mode]) #+ " --framerate " + str(fps)
+                if ev != 0:
+                    datastr += " --ev " + str(ev)
+                if sspeed > 5000000 and mode == 0 and (Pi_Cam < 5 or Pi_Cam == 7):
+                    datastr += " --gain 1 --immediate --awbgains " + str(red/10) + "," + str(blue/10)
                 else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        blue -=1
-                        blue  = max(blue ,pmin)
+                    datastr += " --gain " + str(gain)
+                    if awb == 0:
+                        datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
                     else:
-                        blue  +=1
-                        blue = min(blue ,pmax)
-                text(0,7,3,1,1,str(blue/10)[0:3],fv,10)
-                draw_bar(0,7,lgrnColor,'blue',blue)
-                time.sleep(.25)
-                restart = 1
-
+                        datastr += " --awb " + awbs[awb]
+                datastr += " --metering "   + meters[meter]
+                datastr += " --saturation " + str(saturation/10)
+                datastr += " --sharpness "  + str(sharpness/10)
+                datastr += " --denoise "    + denoises[denoise]
+                datastr += " --bitrate " + str(bits)
+                if vflip == 1:
+                    datastr += " --vflip"
+                if hflip == 1:
+                    datastr += " --hflip"
+                if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
+                    datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
+                if Pi_Cam == 4 and scientific == 1:
+                    if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
+                        datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json"
+                    if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
+                        datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json"
+                if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8:
+                    datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode]
+                    if v3_f_mode == 1:
+                        if Pi_Cam == 3:
+                            datastr += " --lens-position " + str(v3_focus/100)
+                        if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
+                            datastr += " --lens-position " + str(focus/100)
+                if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6) ) or Pi_Cam == 8) and zoom == 0:
+                    datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fyz)
+                if Pi_Cam == 3 or Pi == 5:
+                    datastr += " --hdr " + v3_hdrs[v3_hdr]
+                if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
+                    zws = vwidths[vformat]
+                    zhs = vheights[vformat]
+                    zxo = ((igw-zws)/2)/igw
+                    zyo = ((2160-zhs)/2)/2160
+                    datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
+                elif zoom > 1 and Pi_Cam == 4:
+                    zws = vwidths[vformat]
+                    zhs = vheights[vformat]
+                    zxo = ((igw-int(zws))/2)/igw
+                    zyo = ((igh-int(zhs))/2)/igh
+                    datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
 
-            elif button_row == 8 and awb != 0:
-                # DENOISE
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'denoise':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    denoise = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height  and mousey < pre_height + int(bh/3)) and alt_dis == 1:
-                    denoise = int(((mousex-((button_row -1)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75  and mousey < pre_height * .75 + int(bh/3)) and alt_dis == 2:
-                    denoise = int(((mousex-((button_row -1)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        denoise -=1
-                        denoise = max(denoise,pmin)
-                    else:
-                        denoise +=1
-                        denoise = min(denoise,pmax)
-                text(0,7,3,1,1,denoises[denoise],fv,10)
-                draw_bar(0,7,lgrnColor,'denoise',denoise)
-                time.sleep(.25)
-                restart = 1
+                if show_cmds == 1:
+                    print (datastr)
+                p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
+                start_timelapse = time.monotonic()
+                stop = 0
+                while time.monotonic() - start_timelapse < tduration+1 and stop == 0:
+                    tdur = int(tduration - (time.monotonic() - start_timelapse))
+                    td = timedelta(seconds=tdur)
+                    text(1,10,1,1,1,str(td),fv,12)
 
-            elif button_row == 9 and awb == 0 :
-                # RED
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'red':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    red = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
-                    red = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
-                    red = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        red -=1
-                        red  = max(red ,pmin)
-                    else:
-                        red  +=1
-                        red = min(red ,pmax)
-                text(0,8,3,1,1,str(red/10)[0:3],fv,10)
-                draw_bar(0,8,lgrnColor,'red',red)
-                time.sleep(.25)
-                restart = 1
-                
-            elif button_row == 9 and awb != 0:
-                # SHARPNESS
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'sharpness':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    sharpness = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + (bh)  and mousey < pre_height + (bh) + int(bh/3)) and alt_dis == 1:
-                    sharpness = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + (bh)  and mousey < pre_height * .75 + (bh) + int(bh/3)) and alt_dis == 2:
-                    sharpness = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        sharpness -=1
-                        sharpness = max(sharpness,pmin)
-                    else:
-                        sharpness +=1
-                        sharpness = min(sharpness,pmax)
-                        
-                text(0,8,3,1,1,str(sharpness/10),fv,10)
-                draw_bar(0,8,lgrnColor,'sharpness',sharpness)
-                time.sleep(.25)
-                restart = 1
-                
-            elif button_row == 10:
-                # EXTENSION
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'extn':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    extn = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
-                    extn = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
-                    extn = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        extn -=1
-                        extn  = max(extn ,pmin)
-                    else:
-                        extn  +=1
-                        extn = min(extn ,pmax) 
-                text(0,9,3,1,1,extns[extn],fv,10)
-                draw_bar(0,9,lgrnColor,'extn',extn)
-                time.sleep(.25)
-                
-            elif button_row == 11:
-                # QUALITY
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'quality':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    quality = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
-                    quality = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
-                    quality = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        quality -=1
-                        quality  = max(quality ,pmin)
-                    else:
-                        quality  +=1
-                        quality = min(quality ,pmax)
-                text(0,10,3,1,1,str(quality)[0:3],fv,10)
-                draw_bar(0,10,lgrnColor,'quality',quality)
-                time.sleep(.25)
-                restart = 1
-                
-            elif button_row == 12:
-                # SATURATION
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'saturation':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    saturation = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
-                    saturation = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
-                    saturation = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        saturation -=1
-                        saturation  = max(saturation ,pmin)
-                    else:
-                        saturation  +=1
-                        saturation = min(saturation ,pmax)
-                text(0,11,3,1,1,str(saturation/10),fv,10)
-                draw_bar(0,11,lgrnColor,'saturation',saturation)
-                time.sleep(.25)
-                restart = 1
-                
-            elif button_row == 13:
-                # METER
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'meter':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    meter = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
-                    meter = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
-                    meter = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+            button(1,9,0,2)
+            if tinterval != 0:
+                text(1,12,3,1,1,str(tshots),fv,12)
+            if rotate != 0:
+                if alt_dis < 2:
+                    pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,pre_width,pre_height),0)
                 else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        meter -=1
-                        meter  = max(meter ,pmin)
-                    else:
-                        meter  +=1
-                        meter = min(meter ,pmax)
-                text(0,12,3,1,1,meters[meter],fv,10)
-                draw_bar(0,12,lgrnColor,'meter',meter)
-                time.sleep(.25)
-                restart = 1
+                    pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,pre_width,pre_height * .75),0)
+            td = timedelta(seconds=tduration)
+            text(1,10,3,1,1,str(td),fv,12)
+            text(0,0,1,0,1,"CAPTURE STILL",ft,7)
+            text(1,0,1,0,1,"CAPTURE/Stream",ft-2,7)
+            text(1,0,1,1,1,"Video",ft,7)
+            text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
+            text(1,9,1,0,1,"CAP T/LPSE",ft,7)
+            if tinterval > 0:
+                text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
+            else:
+                text(1,9,3,1,1,"",ft,7)
+            restart = 2
+    elif tinterval > 0:
+        st_scale = int(st_scale * 2)
+        if st_scale > 8:
+            st_scale = 1
+        if st_scale > 4 and Pi_Cam != 4 and Pi_Cam != 6 and Pi_Cam != 8:
+            st_scale = 1
+        text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
+        if tinterval > 0:
+            text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
+        else:
+            text(1,9,1,1,1,"",ft,7)
 
-            elif button_row == 14 and Pi_Cam == 3:
-                # PI V3 CAMERA HDR
-                if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                    v3_hdr -=1
-                    v3_hdr  = max(v3_hdr ,0)
-                else:
-                    v3_hdr  +=1
-                    v3_hdr = min(v3_hdr ,3)
+def set_vlen():
+    # VIDEO LENGTH
+    global vlen
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == 'vlen':
+            pmin = video_limits[f+1]
+            pmax = video_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        vlen = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height  + (bh*2) and mousey < pre_height + (bh*2) + int(bh/3)) and alt_dis == 1:
+        vlen = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75  + (bh*2) and mousey < pre_height * .75 + (bh*2) + int(bh/3)) and alt_dis == 2:
+        vlen = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    elif event.button == 1:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            vlen -=1
+            vlen  = max(vlen ,pmin)
+        else:
+            vlen  +=1
+            vlen = min(vlen ,pmax)
+    elif event.button == 3:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            vlen -=60
+            vlen = max(vlen,pmin)
+        else:
+            vlen +=60
+            vlen = min(vlen,pmax)
+    elif event.button == 4 or event.button == 5:
+        if event.button == 5:
+            vlen -=600
+            vlen = max(vlen,pmin)
+        else:
+            vlen +=600
+            vlen = min(vlen,pmax)
+    td = timedelta(seconds=vlen)
+    text(1,1,3,1,1,str(td),fv,11)
+    draw_Vbar(0,1,1,lpurColor,'vlen',vlen)
 
-                text(0,13,5,0,1,"HDR",fv,10)
-                text(0,13,3,1,1,v3_hdrs[v3_hdr],fv,10)
-                time.sleep(0.25)
-                restart = 1
+def set_fps():
+    # FPS
+    global fps,restart
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == 'fps':
+            pmin = video_limits[f+1]
+            pmax = video_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        fps = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
+        fps = min(fps,vfps)
+        fps = max(fps,pmin)
+    elif (mousey > pre_height  + (bh*2) and mousey < pre_height + (bh*2) + int(bh/3)) and alt_dis == 1:
+        fps = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+        fps = min(fps,vfps)
+        fps = max(fps,pmin)
+    elif (mousey > pre_height * .75  + (bh*2) and mousey < pre_height  * .75 + (bh*2) + int(bh/3)) and alt_dis == 2:
+        fps = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+        fps = min(fps,vfps)
+        fps = max(fps,pmin)
+    else:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            fps -=1
+            fps  = max(fps ,pmin)
+        else:
+            fps  +=1
+            fps = min(fps ,pmax)
 
-            elif button_row == 14 and Pi_Cam != 3 and Pi != 5:
-                # CAMERA still -t time (NOT Pi v3 camera)
-                if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                    timet -=100
-                    timet  = max(timet ,100)
-                else:
-                    timet  +=100
-                    timet = min(timet ,10000)
-
-                text(0,13,5,0,1,"STILL -t",fv,10)
-                text(0,13,3,1,1,str(timet),fv,10)
-                time.sleep(0.05)
-
-            elif button_row == 14 and Pi_Cam != 3 and Pi == 5:
-                # PI5 and NON V3 CAMERA HDR
-                if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                    v3_hdr -=1
-                    v3_hdr  = max(v3_hdr ,0)
-                else:
-                    v3_hdr  +=1
-                    v3_hdr = min(v3_hdr ,1)
+    text(1,2,3,1,1,str(fps),fv,11)
+    draw_Vbar(0,1,2,lpurColor,'fps',fps)
+    restart = 1
 
-                text(0,13,5,0,1,"HDR",fv,10)
-                text(0,13,3,1,1,v3_hdrs[v3_hdr],fv,10)
-                time.sleep(0.25)
-                restart = 1
+def set_vformat():
+    # VFORMAT
+    global vformat,vwidth,vheight,vfps,fps
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == 'vformat':
+            pmin = video_limits[f+1]
+            pmax = video_limits[f+2]
 
-            elif button_row == 15:
-                # HISTOGRAM 
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'histogram':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    histogram = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
-                    histogram = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
-                    histogram = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        # set max video format
+        setmaxvformat()
+        pmax = max_vformat
+        vformat = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height  + (bh*2) and mousey < pre_height + (bh*2) + int(bh/3)) and alt_dis == 1:
+        # set max video format
+        setmaxvformat()
+        pmax = max_vformat
+        vformat = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75  + (bh*2) and mousey < pre_height * .75 + (bh*2) + int(bh/3)) and alt_dis == 2:
+        # set max video format
+        setmaxvformat()
+        pmax = max_vformat
+        vformat = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            vformat -=1
+            # set max video format
+            setmaxvformat()
+            vformat = min(vformat,max_vformat)
+        else:
+            vformat +=1
+            # set max video format
+            setmaxvformat()
+            vformat = min(vformat,max_vformat)
+    draw_Vbar(0,1,3,lpurColor,'vformat',vformat)
+    vwidth  = vwidths[vformat]
+    vheight = vheights[vformat]
+    if Pi_Cam == 3:
+        vfps = v3_max_fps[vformat]
+        if vwidth == 1920 and codec == 0:
+            prof = h264profiles[profile].split(" ")
+            if str(prof[1]) == "4.2":
+                if vpreview == 1:
+                    vfps = 45
                 else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        histogram -=1
-                        histogram = max(histogram,pmin)
-                    else:
-                        histogram +=1
-                        histogram = min(histogram,pmax)
-                text(0,14,3,1,1,histograms[histogram],fv,7)
-                draw_bar(0,14,greyColor,'histogram',histogram)
-                time.sleep(.25)
-                
-            elif button_row == 16 and Pi_Cam == 4 and scientif == 1:
-                # v4 (HQ) CAMERA Scientific.json
-                if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                    scientific -=1
-                    scientific = max(scientific ,0)
+                    vfps = 60
+        elif vwidth == 1536 and codec == 0:
+            prof = h264profiles[profile].split(" ")
+            if str(prof[1]) == "4.2":
+                if vpreview == 1:
+                    vfps = 60
                 else:
-                    scientific  +=1
-                    scientific = min(scientific ,1)
+                    vfps = 90
+    elif Pi_Cam == 9:
+        vfps = v9_max_fps[vformat]
+    elif Pi_Cam == 15:
+        vfps = v15_max_fps[vformat]
+    elif Pi_Cam == 16:
+        vfps = v16_max_fps[vformat]
+    else:
+        vfps = v_max_fps[vformat]
+    fps = min(fps,vfps)
+    video_limits[5] = vfps
+    text(1,2,3,1,1,str(fps),fv,11)
+    draw_Vbar(0,1,2,lpurColor,'fps',fps)
+    # determine if camera native format
+    vw = 0
+    x = 0
+    while x < len(vwidths2) and vw == 0:
+        if vwidth == vwidths2[x]:
+            if vheight == vheights2[x]:
+                vw = 1
+        x += 1
+    if vw == 0:
+        text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+    if vw == 1:
+        text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
 
-                text(0,15,5,0,1,"Scientific",fv,10)
-                if scientific == 0:
-                    text(0,15,3,1,1,"Off",fv,10)
+def set_codec():
+    # CODEC
+    global codec,vformat,vwidth,vheight,vfps,fps
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == 'codec':
+            pmin = video_limits[f+1]
+            pmax = video_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        codec = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height + (bh*2) and mousey < pre_height + (bh*2) + int(bh/3)) and alt_dis == 1:
+        codec = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 + (bh*2) and mousey < pre_height * .75 + (bh*2) + int(bh/3)) and alt_dis == 2:
+        codec = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            codec -=1
+            codec  = max(codec ,pmin)
+        else:
+            codec  +=1
+            codec = min(codec ,pmax)
+    # set max video format
+    setmaxvformat()
+    vformat = min(vformat,max_vformat)
+    text(1,4,3,1,1,codecs[codec],fv,11)
+    draw_Vbar(0,1,4,lpurColor,'codec',codec)
+    draw_Vbar(0,1,3,lpurColor,'vformat',vformat)
+    vwidth  = vwidths[vformat]
+    vheight = vheights[vformat]
+    if Pi_Cam == 3:
+        vfps = v3_max_fps[vformat]
+        if vwidth == 1920 and codec == 0:
+            prof = h264profiles[profile].split(" ")
+            if str(prof[1]) == "4.2":
+                if vpreview == 1:
+                    vfps = 45
                 else:
-                    text(0,15,3,1,1,"ON ",fv,10)
-                time.sleep(0.25)
-                restart = 1
+                    vfps = 60
+        elif vwidth == 1536 and codec == 0:
+            prof = h264profiles[profile].split(" ")
+            if str(prof[1]) == "4.2":
+                if vpreview == 1:
+                    vfps = 60
+                else:
+                    vfps = 90
+    elif Pi_Cam == 9:
+        vfps = v9_max_fps[vformat]
+    elif Pi_Cam == 15:
+        vfps = v15_max_fps[vformat]
+    elif Pi_Cam == 16:
+        vfps = v16_max_fps[vformat]
+    else:
+        vfps = v_max_fps[vformat]
+    fps = min(fps,vfps)
+    video_limits[5] = vfps
+    text(1,2,3,1,1,str(fps),fv,11)
+    draw_Vbar(0,1,2,lpurColor,'fps',fps)
+    # determine if camera native format
+    vw = 0
+    x = 0
+    while x < len(vwidths2) and vw == 0:
+        if vwidth == vwidths2[x]:
+            if vheight == vheights2[x]:
+                vw = 1
+        x += 1
+    if vw == 0:
+        text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+    if vw == 1:
+        text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
 
-            elif button_row == 16 and (Pi_Cam == 9 or Pi_Cam == 16):
-                # Waveshare imx290 / imx415 IR Filter
-                if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                    IRF -=1
-                    IRF = max(IRF ,0)
+def set_profile():
+    # H264 PROFILE
+    global profile,vwidth,vheight,vfps,fps
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == 'profile':
+            pmin = video_limits[f+1]
+            pmax = video_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        profile = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height + (bh*2) and mousey < pre_height + (bh*2) + int(bh/3)) and alt_dis == 1:
+        profile = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 + (bh*2) and mousey < pre_height * .75 + (bh*2) + int(bh/3)) and alt_dis == 2:
+        profile = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            profile -=1
+            profile  = max(profile ,pmin)
+        else:
+            profile  +=1
+            profile = min(profile ,pmax)
+    text(1,5,3,1,1,h264profiles[profile],fv,11)
+    draw_Vbar(0,1,5,lpurColor,'profile',profile)
+    vwidth  = vwidths[vformat]
+    vheight = vheights[vformat]
+    if Pi_Cam == 3:
+        vfps = v3_max_fps[vformat]
+        if vwidth == 1920 and codec == 0:
+            prof = h264profiles[profile].split(" ")
+            if str(prof[1]) == "4.2":
+                if vpreview == 1:
+                    vfps = 45
                 else:
-                    IRF  +=1
-                    IRF = min(IRF ,1)
-                if IRF == 0:
-                    text(0,15,3,1,1,"Off",fv,10)
-                    led_sw_ir.off()
+                    vfps = 60
+        elif vwidth == 1536 and codec == 0:
+            prof = h264profiles[profile].split(" ")
+            if str(prof[1]) == "4.2":
+                if vpreview == 1:
+                    vfps = 60
                 else:
-                    text(0,15,3,1,1,"ON ",fv,10)
-                    led_sw_ir.on()
-                time.sleep(0.25)
-                restart = 1
+                    vfps = 90
+    elif Pi_Cam == 9:
+        vfps = v9_max_fps[vformat]
+    elif Pi_Cam == 15:
+        vfps = v15_max_fps[vformat]
+    elif Pi_Cam == 16:
+        vfps = v16_max_fps[vformat]
+    else:
+        vfps = v_max_fps[vformat]
+    fps = min(fps,vfps)
+    video_limits[5] = vfps
+    text(1,2,3,1,1,str(fps),fv,11)
+    draw_Vbar(0,1,2,lpurColor,'fps',fps)
 
-            elif button_row == 16 and (Pi_Cam == 10 or Pi_Cam == 8 or Pi_Cam == 15) and Pi == 5:
-                # timet
-                if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                    timet -=100
-                    timet  = max(timet ,100)
-                else:
-                    timet  +=100
-                    timet = min(timet ,10000)
-                text(0,15,3,1,1,str(timet),fv,10)
-                time.sleep(0.05)
-
-            elif button_row == 16 and Pi_Cam == 3 and v3_af == 1:
-                # V3 FOCUS SPEED 
-                for f in range(0,len(still_limits)-1,3):
-                    if still_limits[f] == 'v3_f_speed':
-                        pmin = still_limits[f+1]
-                        pmax = still_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    v3_f_speed = int(((mousex-pre_width) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + bh  and mousey < pre_height + bh + int(bh/3)) and alt_dis == 1:
-                    v3_f_speed = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + bh + int(bh/3)) and alt_dis == 2:
-                    v3_f_speed = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+def set_bitrate():
+    # BITRATE
+    global bitrate,bits,restart
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == 'bitrate':
+            pmin = video_limits[f+1]
+            pmax = video_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        bitrate = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
+        bitrate = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
+        bitrate = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    else:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            bitrate -=1
+        else:
+            bitrate +=1
+    bitrate = max(bitrate,pmin)
+    bitrate = min(bitrate,pmax)
+    bits = bitrate * 1000000
+    text(1,6,3,1,1,str(bitrate),fv,11)
+    draw_Vbar(0,1,6,lpurColor,'bitrate',bitrate)
+    restart = 1
+
+def set_focus():
+    # AUTOFOCUS SWEEP (right mouse button) or FOCUS
+    global focus,v3_focus,restart,zoom,focus_mode,vformat,vwidth,vheight,v3_f_mode,foc_man,fxx,fxy,fxz,fyz
+    if event.button == 3 and ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8)):
+        # AUTOFOCUS SWEEP (right mouse button)
+        if af_state == 0:
+            af_begin()
+    else:
+        # FOCUS
+        if (Pi_Cam == 3 and v3_af == 1):
+            for f in range(0,len(video_limits)-1,3):
+                if video_limits[f] == 'v3_focus':
+                    pmin = video_limits[f+1]
+                    pmax = video_limits[f+2]
+        if Pi_Cam == 5 or Pi_Cam == 6 or Pi_Cam == 8:
+            if Pi_Cam == 5:
+              for f in range(0,len(video_limits)-1,3):
+                if video_limits[f] == 'v5_focus':
+                    pmin = video_limits[f+1]
+                    pmax = video_limits[f+2]
+            if Pi_Cam == 6 or Pi_Cam == 8:
+              for f in range(0,len(video_limits)-1,3):
+                if video_limits[f] == 'v6_focus':
+                    pmin = video_limits[f+1]
+                    pmax = video_limits[f+2]
+        # arducam manual focus slider
+        if (mousex > pre_width + bw and mousey < ((button_row-1)*bh) + (bh/3)) and ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and foc_man == 1:
+            focus = int(((mousex-pre_width-bw) / bw) * pmax)
+            if Pi_Cam == 5:
+                draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
+            elif Pi_Cam == 6 or Pi_Cam == 8:
+                draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
+            v3_focus = focus
+            restart = 1
+            text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
+        #arducam manual focus buttons
+        elif mousex > pre_width + bw and mousey > ((button_row-1)*bh) + (bh/3) and mousey < ((button_row-1)*bh) + (bh/1.5) and ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and foc_man == 1:
+            if button_pos == 2:
+                focus -= 10
+                focus = max(focus,pmin)
+            elif button_pos == 3:
+                focus += 10
+                focus = min(focus,pmax)
+            if Pi_Cam == 5:
+                draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
+            elif Pi_Cam == 6 or Pi_Cam == 8:
+                draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
+            v3_focus = focus
+            restart = 1
+            text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
+        # arducam manual focus slider SQUARE FORMAT
+        elif (mousey > pre_height + (bh*2) and mousey < pre_height + (bh*2) + (bh/3)) and ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and foc_man == 1:
+            focus = int(((mousex-((button_row - 8)*bw)) / bw)* pmax)
+            if Pi_Cam == 5:
+                draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
+            if Pi_Cam == 6 or Pi_Cam == 8:
+                draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
+            v3_focus = focus
+            restart = 1
+            text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
+        #arducam manual focus buttons SQUARE FORMAT
+        elif mousey > pre_height + (bh*2) and mousey > pre_height + (bh*2) + (bh/3) and mousey < pre_height + (bh*2) + (bh/1.5) and ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and foc_man == 1:
+            if button_pos == 0:
+                focus -= 10
+            elif button_pos == 1:
+                focus += 10
+            if Pi_Cam == 5:
+                draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
+            if Pi_Cam == 6 or Pi_Cam == 8:
+                draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
+            v3_focus = focus
+            restart = 1
+            text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
+        # Pi v3 manual focus slider
+        elif (mousex > pre_width + bw and mousey < ((button_row-1)*bh) + (bh/3)) and (Pi_Cam == 3 and v3_af == 1) and foc_man == 1:
+            v3_focus = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin)) + pmin
+            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
+            fd = 1/(v3_focus/100)
+            text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+            restart = 1
+        # Pi v3 manual focus buttons
+        elif mousex > pre_width + bw and mousey > ((button_row-1)*bh) + (bh/3) and mousey < ((button_row-1)*bh) + (bh/1.5) and (Pi_Cam == 3 and v3_af == 1)  and foc_man == 1:
+            if button_pos == 2:
+                v3_focus -= 1
+                v3_focus = max(v3_focus,pmin)
+            elif button_pos == 3:
+                v3_focus += 1
+                v3_focus = min(v3_focus,pmax)
+            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
+            fd = 1/(v3_focus/100)
+            text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+            restart = 1
+        # Pi v3 manual focus slider SQUARE FORMAT, alt_dis == 1
+        elif (mousey > pre_height + (bh*2) and mousey < pre_height + (bh*2) + (bh/3)) and (Pi_Cam == 3 and v3_af == 1) and foc_man == 1 and alt_dis == 1:
+            v3_focus = int(((mousex-((button_row - 1)*bw)) / bw)* pmax)
+            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
+            fd = 1/(v3_focus/100)
+            text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+            restart = 1
+        # Pi v3 manual focus slider SQUARE FORMAT, alt_dis == 2
+        elif (mousey > pre_height *.75 + (bh*2) and mousey < pre_height * .75 + (bh*2) + (bh/3)) and (Pi_Cam == 3 and v3_af == 1) and foc_man == 1 and alt_dis == 2:
+            v3_focus = int(((mousex-((button_row - 1)*bw)) / bw)* pmax)
+            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
+            fd = 1/(v3_focus/100)
+            text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+            restart = 1
+        # Pi v3 manual focus buttons SQUARE FORMAT, alt_dis == 1
+        elif mousey > pre_height + (bh*2) and mousey > pre_height + (bh*2) + (bh/3) and mousey < pre_height + (bh*2) + (bh/1.5) and (Pi_Cam == 3 and v3_af == 1) and foc_man == 1 and alt_dis == 1:
+            if button_pos == 0:
+                v3_focus -= 1
+                v3_focus = max(v3_focus,0.0)
+            elif button_pos == 1:
+                v3_focus += 1
+            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
+            fd = 1/(v3_focus/100)
+            text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+            restart = 1
+        # Pi v3 manual focus buttons SQUARE FORMAT, alt_dis == 2
+        elif mousey > pre_height * .75 + (bh*2) and mousey > pre_height * .75 + (bh*2) + (bh/3) and mousey < pre_height * .75 + (bh*2) + (bh/1.5) and (Pi_Cam == 3 and v3_af == 1) and foc_man == 1 and alt_dis == 2:
+            if button_pos == 0:
+                v3_focus -= 1
+                v3_focus = max(v3_focus,0.0)
+            elif button_pos == 1:
+                v3_focus += 1
+            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
+            fd = 1/(v3_focus/100)
+            text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+            restart = 1
+        elif ((alt_dis == 0 and button_pos > 1) or (alt_dis > 0 and button_pos == 0)):
+            # determine if camera native format
+            vw = 0
+            x = 0
+            while x < len(vwidths2) and vw == 0:
+                if vwidth == vwidths2[x]:
+                     if vheight == vheights2[x]:
+                        vw = 1
+                x += 1
+            # FOCUS button NON AF camera
+            if (Pi_Cam != 3 and Pi_Cam != 5 and Pi_Cam != 6 and Pi_Cam != 8)  and focus_mode == 0:
+                zoom = 4
+                focus_mode = 1
+                button(1,7,1,9)
+                text(1,7,3,0,1,"FOCUS",ft,0)
+                if Pi_Cam == 4 and zoom > 1:
+                    vformat = crop4_f[zoom]
+                    vwidth  = vwidths[vformat]
+                    vheight = vheights[vformat]
+                    text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
                 else:
-                    if (alt_dis == 0 and mousex < pre_width + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        v3_f_speed-=1
-                        v3_f_speed = max(v3_f_speed,pmin)
-                    else:
-                        v3_f_speed +=1
-                        v3_f_speed = min(v3_f_speed,pmax)
-                text(0,15,3,1,1,v3_f_speeds[v3_f_speed],fv,7)
-                draw_bar(0,15,greyColor,'v3_f_speed',v3_f_speed)
+                    text(1,3,3,1,1,str(pre_width) + "x" + str(pre_height),fv,11)
+                button(1,8,1,9)
+                text(1,8,2,0,1,"ZOOMED",ft,0)
+                text(1,8,3,1,1,str(zoom),fv,0)
+                draw_Vbar(0,1,8,dgryColor,'zoom',zoom)
                 restart = 1
-                time.sleep(.25)
-
-            if button_row == 17:
-                # VERTICAL FLIP
-                vflip +=1
-                if vflip > 1:
-                    vflip = 0
-                text(0,16,3,1,1,str(vflip),fv,7)
+            # CANCEL FOCUS NON AF camera
+            elif (Pi_Cam != 3 and Pi_Cam != 5 and Pi_Cam != 6 and Pi_Cam != 8) and focus_mode == 1:
+                zoom = 0
+                focus_mode = 0
+                button(1,7,0,9)
+                text(1,7,5,0,1,"FOCUS",ft,7)
+                text(1,7,3,1,1,"",fv,7)
+                if vw == 0:
+                    text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+                if vw == 1:
+                    text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+                button(1,8,0,9)
+                text(1,8,5,0,1,"Zoom",ft,7)
+                text(1,8,3,1,1,"",fv,7)
+                draw_Vbar(0,1,8,greyColor,'zoom',zoom)
                 restart = 1
-                time.sleep(.25)
-                
-               
-            if button_row == 18:
-                # VIDEO PREVIEW
-                vpreview +=1
-                if vpreview > 1:
-                    vpreview = 0
-                    text(0,17,3,1,1,"OFF",fv,7)
+            # Pi V3 manual focus
+            elif (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0:
+                focus_mode = 1
+                v3_f_mode = 1
+                foc_man = 1
+                button(1,7,1,9)
+                restart = 1
+                draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
+                fd = 1/(v3_focus/100)
+                text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+                text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,0)
+            # ARDUCAM manual focus
+            elif ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and v3_f_mode == 0:
+                focus_mode = 1
+                v3_f_mode = 1
+                foc_man = 1
+                button(1,7,1,9)
+                text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
+                if Pi_Cam == 5:
+                    draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
+                if Pi_Cam == 6 or Pi_Cam == 8:
+                    draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
+                text(1,7,3,1,1,"manual",fv,0)
+                restart = 1
+            # ARDUCAM cancel manual focus
+            elif ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and foc_man == 1:
+                focus_mode = 0
+                foc_man = 0
+                if Pi_Cam == 8:
+                    v3_f_mode = 2 # continuous focus
                 else:
-                    text(0,17,3,1,1,"ON",fv,7)
-                #restart = 1
-                time.sleep(.25)
-               
-          elif button_column == 2:
-            if button_row == 1 and event.button != 3:
-                        # TAKE VIDEO
-                        os.killpg(p.pid, signal.SIGTERM)
-                        # get RAM free space
-                        st = os.statvfs("/run/shm/")
-                        freeram = (st.f_bavail * st.f_frsize)/1100000
-                        button(1,0,1,3)
-                        if Pi == 5:
-                            text(1,0,3,0,1,"Video",ft,0)
-                        else:
-                            text(1,0,3,0,1,"STOP ",ft,0)
-                        text(1,0,3,1,1,"Recording",ft,0)
-                        text(0,0,0,0,1,"CAPTURE STILL",ft,7)
-                        text(1,9,0,0,1,"CAP T/LPSE",ft,7)
-                        text(0,0,6,2,1,"Please Wait, taking video ...",int(fv*1.7),1)
-                        now = datetime.datetime.now()
-                        timestamp = now.strftime("%y%m%d%H%M%S")
-                        if save2ram == 1:
-                            vname =  "/run/shm/" + str(timestamp) + "." + codecs2[codec]
-                        else:
-                            vname =  vid_dir + str(timestamp) + "." + codecs2[codec]
-                        if codecs2[codec] != 'raw':
-                            if lver < 12:
-                                datastr = "libcamera-vid"
-                            else:
-                                datastr = "rpicam-vid"
-                            datastr += " --camera " + str(camera) + " -t " + str(vlen * 1000) + " -o " + vname
-                            if mode != 0:
-                                datastr += " --framerate " + str(fps)
-                            else:
-                                speed7 = sspeed
-                                speed7 = max(speed7,int((1/fps)*1000000))
-                                datastr += " --framerate " + str(int((1/speed7)*1000000))
-                            if codecs[codec] != 'h264' and codecs[codec] != 'mp4':
-                                datastr += " --codec " + codecs[codec]
-                            elif codecs[codec] != 'mp4':
-                                prof = h264profiles[profile].split(" ")
-                                #datastr += " --profile " + str(prof[0]) + " --level " + str(prof[1])
-                                datastr += " --level " + str(prof[1])
-                            elif codecs[codec] == 'mp4' and Pi != 5:
-                                datastr += " --codec libav"
-                        else:
-                            if lver < 12:
-                                datastr = "libcamera-raw"
-                            else:
-                                 datastr = "rpicam-raw"
-                            datastr += " --camera " + str(camera) + " -t " + str(vlen * 1000) + " -o " + vname + " --framerate " + str(fps)
-                        if vpreview == 0:
-                            datastr += " -n "
-                        datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
-                        if Pi_Cam == 4 and zoom > 1 and PiHQ_ON == 1:  # HQ cropped
-                            vformat = crop4_f[zoom]
-                            vwidth  = vwidths[vformat]
-                            vheight = vheights[vformat]
-                            datastr += " --mode 4056:2160:10  --width " + str(vwidth) + " --height " + str(vheight)
-                        elif Pi_Cam == 4 and zoom > 1:
-                            datastr += " --mode 2028:1520:10  --width " + str(pre_width) + " --height " + str(pre_height)
-                        elif zoom > 1:
-                            if igw/igh > 1.5:
-                                datastr += " --width " + str(pre_width) + " --height " + str(int(pre_height * .75))
-                            else:
-                                datastr += " --width " + str(pre_width) + " --height " + str(pre_height)
-                        elif Pi_Cam == 4 and vwidth == 2028 and vheight == 1520:
-                            datastr += " --mode 4056:2160:12"
-                        elif Pi_Cam == 3 and vwidth == 2304 and codec == 0:
-                            datastr += " --mode 2304:1296:10 --width 2304 --height 1296"
-                        elif Pi_Cam == 3 and vwidth == 2028 and codec == 0:
-                            datastr += " --mode 2028:1520:10 --width 2028 --height 1520"
-                        else:
-                            datastr += " --width " + str(vwidth) + " --height " + str(vheight)
-                        if mode == 0:
-                            datastr += " --shutter " + str(sspeed)
-                        else:
-                            datastr += " --exposure " + modes[mode]
-                        datastr += " --gain " + str(gain)
-                        if ev != 0:
-                            datastr += " --ev " + str(ev)
-                        if awb == 0:
-                            datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
-                        else:
-                            datastr += " --awb " + awbs[awb]
-                        datastr += " --metering " + meters[meter]
-                        datastr += " --saturation " + str(saturation/10)
-                        datastr += " --sharpness " + str(sharpness/10)
-                        datastr += " --denoise "    + denoises[denoise]
-                        datastr += " --bitrate " + str(bits)
-                        if vflip == 1:
-                            datastr += " --vflip"
-                        if hflip == 1:
-                            datastr += " --hflip"
-                        if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
-                            datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
-                        if Pi_Cam == 4 and scientific == 1:
-                            if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
-                                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json"
-                            if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
-                                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json"
-                        if Pi_Cam == 5 and foc_man == 1 and Pi == 5:
-                            if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx519mf.json'):
-                                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx519mf.json"
-                        elif Pi_Cam == 5  and foc_man == 1 and Pi != 5:
-                            if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx519mff.json'):
-                                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx519mff.json"
-                        if Pi_Cam == 6  and foc_man == 1 and Pi == 5:
-                            if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/arducam_64mf.json'):
-                                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/arducam_64mf.json"
-                        if Pi_Cam == 6  and foc_man == 1 and Pi != 5:
-                            if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/arducam_64mff.json'):
-                                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/arducam_64mff.json"
-                        if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8:
-                            if v3_f_mode == 1:
-                                if Pi_Cam == 3:
-                                    datastr += " --lens-position " + str(v3_focus/100)
-                                if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
-                                    datastr += " --lens-position " + str(focus/100)
-                        if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8) and zoom == 0 and fxx != 0 and v3_f_mode != 1:
-                            datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fxz)
-                        if (Pi_Cam == 3 and v3_af == 1) and v3_f_speed != 0:
-                            datastr += " --autofocus-speed " + v3_f_speeds[v3_f_speed]
-                        if (Pi_Cam == 3 and v3_af == 1) and v3_f_range != 0:
-                            datastr += " --autofocus-range " + v3_f_ranges[v3_f_range]
-                        if Pi_Cam == 3 or Pi == 5:
-                            datastr += " --hdr " + v3_hdrs[v3_hdr]
-                        datastr += " -p 0,0," + str(pre_width) + "," + str(pre_height)
-                        if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
-                            zws = vwidths[vformat]
-                            zhs = vheights[vformat]
-                            zxo = ((igw-zws)/2)/igw
-                            zyo = ((2160-zhs)/2)/2160
-                            datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
-                        elif zoom > 1:
-                            zws = (igw * zfs[zoom])
-                            zhs = (igh * zfs[zoom])
-                            zxo = ((igw-int(zws))/2)/igw
-                            zyo = ((igh-int(zhs))/2)/igh
-                            datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
-                        if show_cmds == 1:
-                            print (datastr)
-                        p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
-                        start_video = time.monotonic()
-                        stop = 0
-                        while (time.monotonic() - start_video < vlen or vlen == 0) and stop == 0:
-                            if vlen != 0:
-                                vlength = int(vlen - (time.monotonic()-start_video))
-                            else:
-                                vlength = int(time.monotonic()-start_video)
-                            td = timedelta(seconds=vlength)
-                            text(1,1,1,1,1,str(td),fv,11)
-                            if save2ram == 1:
-                                st = os.statvfs("/run/shm/")
-                                freeram = (st.f_bavail * st.f_frsize)/1100000
-                                # stop if low RAM whilst recording Video to RAM
-                                if freeram < 100:
-                                    os.killpg(p.pid, signal.SIGTERM)
-                                    stop = 1
-                            for event in pygame.event.get():
-                                if (event.type == MOUSEBUTTONUP):
-                                    mousex, mousey = event.pos
-                                    # stop video recording
-                                    if mousex > pre_width:
-                                        button_column = int((mousex-pre_width)/bw) + 1
-                                        button_row = int((mousey)/bh) + 1
-                                        if mousex > pre_width + bw + (bw/2):
-                                            button_pos = 1
-                                        else:
-                                            button_pos = 0
-                                    else:
-                                        if mousey - pre_height < bh:
-                                            button_column = 1
-                                            button_row = int(mousex / bw) + 1
-                                        elif mousey - pre_height < bh * 2:
-                                            button_column = 1
-                                            button_row = int(mousex / bw) + 7
-                                        elif mousey - pre_height < bh * 3:
-                                            button_column = 2
-                                            button_row = int(mousex / bw) + 1
-                                        elif mousey - pre_height < bh * 4:
-                                            button_column = 2
-                                            button_row = int(mousex / bw) + 7
-                                    if button_column == 2 and button_row == 1:
-                                       os.killpg(p.pid, signal.SIGTERM)
-                                       stop = 1
-                        text(0,0,6,2,1,vname,int(fv*1.5),1)
-                        time.sleep(1)
-                        td = timedelta(seconds=vlen)
-                        if rotate != 0:
-                            pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,pre_width,pre_height),0)
-                        text(1,1,3,1,1,str(td),fv,11)
-                        button(1,0,0,3)
-                        text(0,0,1,0,1,"CAPTURE STILL",ft,7)
-                        text(1,0,1,0,1,"CAPTURE/Stream",ft-2,7)
-                        text(1,0,1,1,1,"Video",ft,7)
-                        text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
-                        text(1,9,1,0,1,"CAP T/LPSE",ft,7)
-                        if tinterval > 0:
-                            text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
-                        else:
-                            text(1,9,3,1,1,"",ft,7)
-                        if save2ram == 1:
-                            shutil.move("/run/shm/" + str(timestamp) + "." + codecs2[codec],vid_dir)
-                        restart = 2
-                                       
-            elif button_row == 1 and event.button == 3:
-                        # STREAM VIDEO
-                        os.killpg(p.pid, signal.SIGTERM)
-                        button(1,0,1,3)
-                        text(1,0,3,0,1,"STOP ",ft,0)
-                        text(1,0,3,1,1,"STREAM",ft,0)
-                        text(0,0,0,0,1,"CAPTURE STILL",ft,7)
-                        text(1,9,0,0,1,"CAP T/LPSE",ft,7)
-                        text(0,0,6,2,1,"Streaming Video ...",int(fv*1.7),1)
-                        now = datetime.datetime.now()
-                        timestamp = now.strftime("%y%m%d%H%M%S")
-                        vname =  vid_dir + str(timestamp) + "." + codecs2[codec]
-                        if lver < 12:
-                            datastr = "libcamera-vid "
-                        else:
-                            datastr = "rpicam-vid "
-                        datastr += "--camera " + str(camera) + " -t " + str(vlen * 1000)
-                        if stream_type == 0:
-                            datastr += " --inline --listen -o tcp://0.0.0.0:" + str(stream_port)
-                        elif stream_type == 1:
-                            datastr += " --inline -o udp://" + udp_ip_addr + ":" + str(stream_port)
-                        if mode != 0:
-                            datastr += " --framerate " + str(fps)
-                        else:
-                            speed7 = sspeed
-                            speed7 = max(speed7,int((1/fps)*1000000))
-                            datastr += " --framerate " + str(int((1/speed7)*1000000))
-                        prof = h264profiles[profile].split(" ")
-                        #datastr += " --profile " + str(prof[0]) + " --level " + str(prof[1])
-                        datastr += " --level " + str(prof[1])
-                        if vpreview == 0:
-                            datastr += " -n "
-                        datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
-                        if zoom > 0 and Pi_Cam != 4:
-                            datastr += " --width " + str(pre_width) + " --height " + str(pre_height)
-                        elif Pi_Cam == 4 and zoom > 1:  # HQ cropped
-                            vformat = crop4_f[zoom]
-                            vwidth  = vwidths[vformat]
-                            vheight = vheights[vformat]
-                            datastr += " --mode 4056:2160:10  --width " + str(vwidth) + " --height " + str(vheight)
-                        elif Pi_Cam == 4 and vwidth == 2028:
-                            datastr += " --mode 4056:2160:12"
-                        elif Pi_Cam == 3 and vwidth == 2304 and codec == 0:
-                            datastr += " --mode 2304:1296:10 --width 2304 --height 1296"
-                        elif Pi_Cam == 3 and vwidth == 2028 and codec == 0:
-                            datastr += " --mode 2028:1520:10 --width 2028 --height 1520"
-                        else:
-                            datastr += " --width " + str(vwidth) + " --height " + str(vheight)
-                        if mode == 0:
-                            datastr += " --shutter " + str(sspeed)
-                        else:
-                            datastr += " --exposure " + modes[mode]
-                        datastr += " --gain " + str(gain)
-                        if ev != 0:
-                            datastr += " --ev " + str(ev)
-                        if awb == 0:
-                            datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
-                        else:
-                            datastr += " --awb " + awbs[awb]
-                        datastr += " --metering " + meters[meter]
-                        datastr += " --saturation " + str(saturation/10)
-                        datastr += " --sharpness " + str(sharpness/10)
-                        datastr += " --denoise "    + denoises[denoise]
-                        datastr += " --bitrate " + str(bits)
-                        if vflip == 1:
-                            datastr += " --vflip"
-                        if hflip == 1:
-                            datastr += " --hflip"
-                        if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
-                            datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
-                        if Pi_Cam == 4 and scientific == 1:
-                            if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
-                                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json"
-                            if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
-                                datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json"
-                        if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6) ) or Pi_Cam == 8:
-                            datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode]
-                            if v3_f_mode == 1:
-                                if Pi_Cam == 3:
-                                    datastr += " --lens-position " + str(v3_focus/100)
-                                if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
-                                    datastr += " --lens-position " + str(focus/100)
-                        if ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 or Pi_Cam == 6) ) or Pi_Cam == 8)  and zoom == 0 and fxx != 0 and v3_f_mode != 1:
-                            datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fxz)
-                        if (Pi_Cam == 3 and v3_af == 1) and v3_f_speed != 0:
-                            datastr += " --autofocus-speed " + v3_f_speeds[v3_f_speed]
-                        if (Pi_Cam == 3 and v3_af == 1) and v3_f_range != 0:
-                            datastr += " --autofocus-range " + v3_f_ranges[v3_f_range]
-                        if Pi_Cam == 3 or Pi == 5:
-                            datastr += " --hdr " + v3_hdrs[v3_hdr]
-                        datastr += " -p 0,0," + str(pre_width) + "," + str(pre_height)
-                        if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
-                            zws = vwidths[vformat]
-                            zhs = vheights[vformat]
-                            zxo = ((igw-zws)/2)/igw
-                            zyo = ((2160-zhs)/2)/2160
-                            datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
-                        elif zoom > 1:
-                            zws = (igw * zfs[zoom])
-                            zhs = (igh * zfs[zoom])
-                            zxo = ((igw-int(zws))/2)/igw
-                            zyo = ((igh-int(zhs))/2)/igh
-                            datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
-                        if stream_type == 2:
-                            data = "#rtp{sdp=rtsp://:" + str(stream_port) + "/stream1}"
-                            datastr += " --inline -o - | cvlc stream:///dev/stdin --sout '" + data + "' :demux=h264"
-                        if show_cmds == 1:
-                            print (datastr)
-                        p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
-                        start_video = time.monotonic()
-                        stop = 0
-                        while (time.monotonic() - start_video < vlen or vlen == 0) and stop == 0:
-                            if vlen != 0:
-                                vlength = int(vlen - (time.monotonic()-start_video))
-                            else:
-                                vlength = int(time.monotonic()-start_video)
-                            td = timedelta(seconds=vlength)
-                            text(1,1,1,1,1,str(td),fv,11)
-                            for event in pygame.event.get():
-                                if (event.type == MOUSEBUTTONUP):
-                                    mousex, mousey = event.pos
-                                    # stop video streaming
-                                    if mousex > pre_width:
-                                        button_column = int((mousex-pre_width)/bw) + 1
-                                        button_row = int((mousey)/bh) + 1
-                                        if mousex > pre_width + bw + (bw/2):
-                                            button_pos = 1
-                                        else:
-                                            button_pos = 0
-                                    else:
-                                        if mousey - pre_height < bh:
-                                            button_column = 1
-                                            button_row = int(mousex / bw) + 1
-                                        elif mousey - pre_height < bh * 2:
-                                            button_column = 1
-                                            button_row = int(mousex / bw) + 7
-                                        elif mousey - pre_height < bh * 3:
-                                            button_column = 2
-                                            button_row = int(mousex / bw) + 1
-                                        elif mousey - pre_height < bh * 4:
-                                            button_column = 2
-                                            button_row = int(mousex / bw) + 7
-                                    if button_column == 2 and button_row == 1:
-                                       os.killpg(p.pid, signal.SIGTERM)
-                                       stop = 1
-                        td = timedelta(seconds=vlen)
-                        if rotate != 0:
-                            pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,pre_width,pre_height),0)
-                        text(1,1,3,1,1,str(td),fv,11)
-                        button(1,0,0,3)
-                        text(0,0,1,0,1,"CAPTURE STILL",ft,7)
-                        text(1,0,1,0,1,"CAPTURE/Stream",ft-2,7)
-                        text(1,0,1,1,1,"Video",ft,7)
-                        text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
-                        text(1,9,1,0,1,"CAP T/LPSE",ft,7)
-                        if tinterval > 0:
-                            text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
-                        else:
-                            text(1,9,3,1,1,"",ft,7)
-                        restart = 2
-                        
-            elif button_row == 10:
-                if event.button == 1:
-                        # TAKE TIMELAPSE
-                        os.killpg(p.pid, signal.SIGTERM)
-                        restart = 1
-                        button(1,9,1,1)
-                        text(1,9,3,0,1,"STOP",ft,0)
-                        text(1,9,3,1,1,"Timelapse",ft,0)
-                        text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
-                        text(1,0,0,0,1,"CAPTURE/Stream",ft-2,7)
-                        text(1,0,0,1,1,"Video",ft,7)
-                        tcount = 0
-                        
-                        if tinterval > 0 and mode != 0: # normal mode
-                            text(1,9,3,0,1,"STOP",ft,0)
-                            text(1,9,3,1,1,"Timelapse",ft,0)
-                            text(0,0,6,2,1,"Please Wait, taking Timelapse ...",int(fv*1.7),1)
-                            now = datetime.datetime.now()
-                            timestamp = now.strftime("%y%m%d%H%M%S")
-                            count = 0
-                            fname =  pic_dir + str(timestamp) + '_%04d.' + extns2[extn]
-                            if lver < 12:
-                                datastr = "libcamera-still"
-                            else:
-                                datastr = "rpicam-still"
-                            if Pi == 5 and extns[extn] == "jpg" and Pi_Cam != 8:
-                                datastr += " --zsl"
-                            if extns[extn] != 'raw':
-                                datastr += " --camera " + str(camera) + " -e " + extns[extn] + " -s -t 0 -o " + fname
-                                if fullscreen != 1:
-                                    datastr += " -p 0,0,640,480 "
-                            else:
-                                datastr += " --camera " + str(camera) + " -r -s -t 0 -o " + fname 
-                                if fullscreen != 1:
-                                    datastr += " -p 0,0,640,480 "
-                            datastr += " -n"
-                            datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
-                            if mode == 0:
-                                datastr += " --shutter " + str(sspeed)
-                            else:
-                                datastr += " --exposure " + modes[mode]
-                            if ev != 0:
-                                datastr += " --ev " + str(ev)
-                            if sspeed > 1000000 and mode == 0 and (Pi_Cam < 5 or Pi_Cam == 7):
-                                datastr += " --gain " + str(gain) + " --immediate --awbgains " + str(red/10) + "," + str(blue/10)
-                            else:
-                                datastr += " --gain " + str(gain)
-                                if awb == 0:
-                                    datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
-                                else:
-                                    datastr += " --awb " + awbs[awb]
-                            datastr += " --metering " + meters[meter]
-                            datastr += " --saturation " + str(saturation/10)
-                            datastr += " --sharpness " + str(sharpness/10)
-                            datastr += " --quality " + str(quality)
-                            datastr += " --denoise "    + denoises[denoise]
-                            if vflip == 1:
-                                datastr += " --vflip"
-                            if hflip == 1:
-                                datastr += " --hflip"
-                            if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
-                                datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
-                            if Pi_Cam == 4 and scientific == 1:
-                                if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
-                                    datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json"
-                                if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
-                                    datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json"
-                            if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8:
-                                datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode]
-                                if v3_f_mode == 1:
-                                    if Pi_Cam == 3 and v3_af == 1:
-                                        datastr += " --lens-position " + str(v3_focus/100)
-                                    if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
-                                        datastr += " --lens-position " + str(focus/100)
-                            elif (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0 and fxz == 1:
-                                datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode] + " --autofocus-on-capture"
-                            if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8) and zoom == 0:
-                                datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fxz)
-                            if Pi_Cam == 3 or Pi == 5:
-                                datastr += " --hdr " + v3_hdrs[v3_hdr]
-                            if (Pi_Cam == 6 or Pi_Cam == 8) and mode == 0 and st_scale == 8:
-                                datastr += " --width 4624 --height 3472 " # 16MP superpixel mode for higher light sensitivity 2x2 binning
-                            elif (Pi_Cam == 5 or Pi_Cam == 6 or Pi_Cam == 8):
-                                if Pi != 5 and lo_res == 1:
-                                    datastr += " --width 4624 --height 3472"
-                                elif Pi_Cam == 6:
-                                    datastr += " --width 9152 --height 6944"
-                                elif Pi_Cam == 8:
-                                    datastr += " --width 9248 --height 6944"
-                            elif Pi_Cam == 4 and zoom > 1:  # HQ cropped
-                                vformat = crop4_f[zoom]
-                                vwidth  = vwidths[vformat]
-                                vheight = vheights[vformat]
-                                datastr += " --mode 4056:2160:10  --width " + str(int(vwidth/st_scale)) + " --height " + str(int(vheight/st_scale))
-                            elif Pi_Cam == 4 and st_scale == 8: # HQ 2x2 binning
-                                datastr += " --mode 2028:1520:10  --width 2028 --height 1520"
-                            elif st_scale > 1: # image reduced by st_scale
-                                datastr += " --mode " + str(x_sens[Pi_Cam]) + ":" + str(y_sens[Pi_Cam]) + ":10" + " --width " + str(int(x_sens[Pi_Cam]/int(st_scale))) + " --height " + str(int(y_sens[Pi_Cam]/int(st_scale)))
-                            if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
-                                zws = vwidths[vformat]
-                                zhs = vheights[vformat]
-                                zxo = ((igw-zws)/2)/igw
-                                zyo = ((2160-zhs)/2)/2160
-                                datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
-                            elif zoom > 1:
-                                zws = int(igw * zfs[zoom])
-                                zhs = int(igh * zfs[zoom])
-                                zxo = ((igw-zws)/2)/igw
-                                zyo = ((igh-zhs)/2)/igh
-                                datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
-                            p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
-                            if show_cmds == 1:
-                                print (datastr)
-                            start_timelapse = time.monotonic()
-                            start2 = time.monotonic()
-                            stop = 0
-                            pics3 = []
-                            count = 0
-                            old_count = 0
-                            while count < tshots and stop == 0:
-                                if time.monotonic() - start2 >= tinterval:
-                                    if lver < 12:
-                                        os.system('pkill -SIGUSR1 libcamera-still')
-                                    else:
-                                        os.system('pkill -SIGUSR1 rpicam-still')
-                                    start2 = time.monotonic()
-                                    text(0,0,6,2,1,"Please Wait, taking Timelapse ..."  + " " + str(count+1),int(fv*1.7),1)
-                                    show = 0
-                                    while count == old_count:
-                                        time.sleep(0.1)
-                                        pics3 = glob.glob(pic_dir + "*.*")
-                                        counts = []
-                                        for xu in range(0,len(pics3)):
-                                            ww = pics3[xu].split("/")
-                                            if ww[4][0:12] == timestamp:
-                                                counts.append(pics3[xu])
-                                        count = len(counts)
-                                        counts.sort()
-                                        for event in pygame.event.get():
-                                            if (event.type == MOUSEBUTTONUP):
-                                                mousex, mousey = event.pos
-                                                # stop timelapse
-                                                if mousex > pre_width:
-                                                    button_column = int((mousex-pre_width)/bw) + 1
-                                                    button_row = int((mousey)/bh) + 1
-                                                else:
-                                                    if mousey - pre_height < bh:
-                                                        button_column = 1
-                                                        button_row = int(mousex / bw) + 1
-                                                    elif mousey - pre_height < bh * 2:
-                                                        button_column = 1
-                                                        button_row = int(mousex / bw) + 7
-                                                    elif mousey - pre_height < bh * 3:
-                                                        button_column = 2
-                                                        button_row = int(mousex / bw) + 1
-                                                    elif mousey - pre_height < bh * 4:
-                                                        button_column = 2
-                                                        button_row = int(mousex / bw) + 8
-                                                if button_column == 2 and button_row == 10:
-                                                    os.killpg(p.pid, signal.SIGTERM)
-                                                    text(1,12,3,1,1,str(tshots),fv,12)
-                                                    stop = 1
-                                                    count = tshots
-                                    old_count = count
-                                    text(1,12,1,1,1,str(tshots - count),fv,12)
-                                    tdur = tinterval * (tshots - count)
-                                    td = timedelta(seconds=tdur)
-                                    text(1,10,1,1,1,str(td),fv,12)
-                                time.sleep(0.1)
-                                if buttonSTR.is_pressed: # 
-                                    type = pygame.MOUSEBUTTONUP
-                                    if str_cap == 2:
-                                        click_event = pygame.event.Event(type, {"button": 3, "pos": (0,0)})
-                                    else:
-                                        click_event = pygame.event.Event(type, {"button": 1, "pos": (0,0)})
-                                    pygame.event.post(click_event)
-                                for event in pygame.event.get():
-                                    if (event.type == MOUSEBUTTONUP):
-                                        mousex, mousey = event.pos
-                                        # stop timelapse or capture STILL 
-                                        if mousex > pre_width:
-                                            button_column = int((mousex-pre_width)/bw) + 1
-                                            button_row = int((mousey)/bh) + 1
-                                        else:
-                                            if mousey - pre_height < bh:
-                                                button_column = 1
-                                                button_row = int(mousex / bw) + 1
-                                            elif mousey - pre_height < bh * 2:
-                                                button_column = 1
-                                                button_row = int(mousex / bw) + 7
-                                            elif mousey - pre_height < bh * 3:
-                                                button_column = 2
-                                                button_row = int(mousex / bw) + 1
-                                            elif mousey - pre_height < bh * 4:
-                                                button_column = 2
-                                                button_row = int(mousex / bw) + 8
-                                        if button_column == 2 and button_row == 10:
-                                            os.killpg(p.pid, signal.SIGTERM)
-                                            text(1,12,3,1,1,str(tshots),fv,12)
-                                            stop = 1
-                                            count = tshots
-                                        if button_column == 1 and button_row == 1:
-                                            if lver < 12:
-                                                os.system('pkill -SIGUSR1 libcamera-still')
-                                            else:
-                                                os.system('pkill -SIGUSR1 rpicam-still')
-                                            text(0,0,3,0,1,"CAPTURE",ft,7)
-                                            time.sleep(0.25)
-                                            text(0,0,1,0,1,"CAPTURE",ft,7)
-                            if lver < 12:
-                                os.system('pkill -SIGUSR2 libcamera-still')
-                            else:
-                                os.system('pkill -SIGUSR2 rpicam-still')
-                                
-                        elif tinterval > 0 and mode == 0: # manual mode
-                            text(1,9,3,0,1,"STOP",ft,0)
-                            text(1,9,3,1,1,"Timelapse",ft,0)
-                            text(0,0,6,2,1,"Please Wait, taking Timelapse ...",int(fv*1.7),1)
-                            now = datetime.datetime.now()
-                            timestamp = now.strftime("%y%m%d%H%M%S")
-                            start2 = time.monotonic()
-                            stop = 0
-                            pics3 = []
-                            count = 0
-                            old_count = 0
-                            trig = 1
-                            while count < tshots and stop == 0:
-                                if time.monotonic() - start2 > tinterval:
-                                    start2 = time.monotonic()
-                                    poll = p.poll()
-                                    while poll == None:
-                                        poll = p.poll()
-                                        time.sleep(0.1)
-                                    fname =  pic_dir + str(timestamp) + "_" + str(count) + "." + extns2[extn]
-                                    if lver < 12:
-                                        datastr = "libcamera-still"
-                                    else:
-                                        datastr = "rpicam-still"
-                                    if Pi == 5 and extns[extn] == "jpg" and Pi_Cam != 8:
-                                        datastr += " --zsl"
-                                    if extns[extn] != 'raw':
-                                        datastr += " --camera " + str(camera) + " -e " + extns[extn] + " -t " + str(timet) + " -o " + fname + " -p 0,0,640,480 "
-                                    else:
-                                        datastr += " --camera " + str(camera) + " -r -t 1000 -o " + fname + " -p 0,0,640,480 " 
-                                    datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
-                                    datastr += " --shutter " + str(sspeed)
-                                    if ev != 0:
-                                        datastr += " --ev " + str(ev)
-                                    if sspeed > 1000000 and mode == 0 and (Pi_Cam < 5 or Pi_Cam == 7):
-                                        datastr += " --gain " + str(gain) + " --immediate --awbgains " + str(red/10) + "," + str(blue/10)
-                                    else:
-                                        datastr += " --gain " + str(gain)
-                                        if awb == 0:
-                                            datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
-                                        else:
-                                            datastr += " --awb " + awbs[awb]
-                                    datastr += " -n"
-                                    datastr += " --metering " + meters[meter]
-                                    datastr += " --saturation " + str(saturation/10)
-                                    datastr += " --sharpness " + str(sharpness/10)
-                                    datastr += " --quality " + str(quality)
-                                    datastr += " --denoise "    + denoises[denoise]
-                                    if vflip == 1:
-                                        datastr += " --vflip"
-                                    if hflip == 1:
-                                        datastr += " --hflip"
-                                    if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
-                                        datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
-                                    if Pi_Cam == 4 and scientific == 1:
-                                        if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
-                                            datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json"
-                                        if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
-                                            datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json"
-                                    if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8:
-                                        datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode]
-                                        if v3_f_mode == 1:
-                                            if Pi_Cam == 3 and v3_af == 1:
-                                                datastr += " --lens-position " + str(v3_focus/100)
-                                            if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
-                                                datastr += " --lens-position " + str(focus/100)
-                                    elif (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0 and fxz == 1:
-                                        datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode] + " --autofocus-on-capture"
-                                    if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8)  and zoom == 0:
-                                        datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fxz)
-                                    if Pi_Cam == 3:
-                                        datastr += " --hdr " + v3_hdrs[v3_hdr]
-                                    if (Pi_Cam == 6 or Pi_Cam == 8) and mode == 0 and st_scale == 8:
-                                        datastr += " --width 4624 --height 3472 " # 16MP superpixel mode for higher light sensitivity
-                                    elif (Pi_Cam == 5 or Pi_Cam == 6 or Pi_Cam == 8):
-                                        if Pi != 5 and lo_res == 1:
-                                            datastr += " --width 4624 --height 3472"
-                                        elif Pi_Cam == 6:
-                                            datastr += " --width 9152 --height 6944"
-                                        elif Pi_Cam == 8:
-                                            datastr += " --width 9248 --height 6944"
-                                    elif Pi_Cam == 4 and zoom > 1:  # HQ cropped
-                                        vformat = crop4_f[zoom]
-                                        vwidth  = vwidths[vformat]
-                                        vheight = vheights[vformat]
-                                        datastr += " --mode 4056:2160:10  --width " + str(int(vwidth/st_scale)) + " --height " + str(int(vheight/st_scale))
-                                    elif Pi_Cam == 4 and st_scale == 8: # HQ 2x2 binning
-                                        datastr += " --mode 2028:1520:10  --width 2028 --height 1520"
-                                    elif st_scale > 1: # image reduced by st_scale
-                                        datastr += " --mode " + str(x_sens[Pi_Cam]) + ":" + str(y_sens[Pi_Cam]) + ":10" + " --width " + str(int(x_sens[Pi_Cam]/int(st_scale))) + " --height " + str(int(y_sens[Pi_Cam]/int(st_scale)))
-                                    if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
-                                        zws = vwidths[vformat]
-                                        zhs = vheights[vformat]
-                                        zxo = ((igw-zws)/2)/igw
-                                        zyo = ((2160-zhs)/2)/2160
-                                        datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
-                                    elif zoom > 1:
-                                        zws = int(igw * zfs[zoom])
-                                        zhs = int(igh * zfs[zoom])
-                                        zxo = ((igw-zws)/2)/igw
-                                        zyo = ((igh-zhs)/2)/igh
-                                        datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
-                                    if show_cmds == 1:
-                                        print (datastr)
-                                    p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
-                                    text(0,0,6,2,1,"Please Wait, taking Timelapse ..."  + " " + str(count+1),int(fv*1.7),1)
-                                    show = 0
-                                    while count == old_count:
-                                        time.sleep(0.1)
-                                        pics3 = glob.glob(pic_dir + "*.*")
-                                        counts = []
-                                        for xu in range(0,len(pics3)):
-                                            ww = pics3[xu].split("/")
-                                            if ww[4][0:12] == timestamp:
-                                                counts.append(pics3[xu])
-                                        count = len(counts)
-                                        counts.sort()
-                                        if (extns2[extn] == 'jpg' or extns2[extn] == 'bmp' or extns2[extn] == 'png') and count > 0 and show == 0:
-                                            image = pygame.image.load(counts[count-1])
-                                            if image.get_width()/image.get_height() > 1.333:
-                                                catSurfacesmall = pygame.transform.scale(image,(pre_width,int(pre_width * (image.get_height()/image.get_width()))))
-                                            else:
-                                                catSurfacesmall = pygame.transform.scale(image, (pre_width,pre_height))
-                                            windowSurfaceObj.blit(catSurfacesmall, (0, 0))
-                                            text(0,0,6,2,1,counts[count-1],int(fv*1.5),1)
-                                            pygame.display.update()
-                                            show == 1
-                                        for event in pygame.event.get():
-                                            if (event.type == MOUSEBUTTONUP):
-                                                mousex, mousey = event.pos
-                                                # stop timelapse
-                                                if mousex > pre_width:
-                                                    button_column = int((mousex-pre_width)/bw) + 1
-                                                    button_row = int((mousey)/bh) + 1
-                                                else:
-                                                    if mousey - pre_height < bh:
-                                                        button_column = 1
-                                                        button_row = int(mousex / bw) + 1
-                                                    elif mousey - pre_height < bh * 2:
-                                                        button_column = 1
-                                                        button_row = int(mousex / bw) + 7
-                                                    elif mousey - pre_height < bh * 3:
-                                                        button_column = 2
-                                                        button_row = int(mousex / bw) + 1
-                                                    elif mousey - pre_height < bh * 4:
-                                                        button_column = 2
-                                                        button_row = int(mousex / bw) + 8
-                                                if button_column == 2 and button_row == 10:
-                                                    os.killpg(p.pid, signal.SIGTERM)
-                                                    text(1,12,3,1,1,str(tshots),fv,12)
-                                                    stop = 1
-                                                    count = tshots
-                                        
-                                    old_count = count
-                                    text(1,12,1,1,1,str(tshots - count),fv,12)
-                                    tdur = tinterval * (tshots - count)
-                                    td = timedelta(seconds=tdur)
-                                    text(1,10,1,1,1,str(td),fv,12)
-                                time.sleep(0.1)
-                                for event in pygame.event.get():
-                                    if (event.type == MOUSEBUTTONUP):
-                                        mousex, mousey = event.pos
-                                        # stop timelapse
-                                        if mousex > pre_width:
-                                            button_column = int((mousex-pre_width)/bw) + 1
-                                            button_row = int((mousey)/bh) + 1
-                                        else:
-                                            if mousey - pre_height < bh:
-                                                button_column = 1
-                                                button_row = int(mousex / bw) + 1
-                                            elif mousey - pre_height < bh * 2:
-                                                button_column = 1
-                                                button_row = int(mousex / bw) + 7
-                                            elif mousey - pre_height < bh * 3:
-                                                button_column = 2
-                                                button_row = int(mousex / bw) + 1
-                                            elif mousey - pre_height < bh * 4:
-                                                button_column = 2
-                                                button_row = int(mousex / bw) + 8
-                                        if button_column == 2 and button_row == 10:
-                                            os.killpg(p.pid, signal.SIGTERM)
-                                            text(1,12,3,1,1,str(tshots),fv,12)
-                                            stop = 1
-                                            count = tshots
-
-                        elif tinterval == 0:
-                            if tduration == 0:
-                                tduration = 1
-                            text(0,0,6,2,1,"Please Wait, taking Timelapse ...",int(fv*1.7),1)
-                            now = datetime.datetime.now()
-                            timestamp = now.strftime("%y%m%d%H%M%S")
-                            fname =  pic_dir + str(timestamp) + '_%04d.' + extns2[extn]
-                            if codecs2[codec] != 'raw':
-                                if lver < 12:
-                                    datastr = "libcamera-vid"
-                                else:
-                                    datastr = "rpicam-vid"
-                                datastr += " --camera " + str(camera) + " -n --codec mjpeg -t " + str(tduration*1000) + " --segment 1 -o " + fname
-                            else:
-                                fname =  pic_dir + str(timestamp) + '_%04d.' + codecs2[codec]
-                                if lver < 12:
-                                    datastr = "libcamera-raw"
-                                else:
-                                    datastr = "rpicam-raw"
-                                datastr += " --camera " + str(camera) + " -n -t " + str(tduration*1000) + " --segment 1 -o " + fname  
-                            if Pi_Cam == 4 and zoom > 1:  # HQ cropped
-                                vformat = crop4_f[zoom]
-                                vwidth  = vwidths[vformat]
-                                vheight = vheights[vformat]
-                                datastr += " --mode 4056:2160:10  --width " + str(vwidth) + " --height " + str(vheight)
-                            elif zoom == 1:  # RAW FULL sensor
-                                vformat = max_vfs[Pi_Cam]
-                                vwidth  = x_sens[Pi_Cam]
-                                vheight = y_sens[Pi_Cam]
-                                if Pi == 5:
-                                    datastr += " --mode " + str(vwidth) + ":" + str(vheight) + ":12:U --width " + str(vwidth) + " --height " + str(vheight)
-                                else:
-                                    datastr += "  --mode " + str(vwidth) + ":" + str(vheight) + ":8 --width " + str(vwidth) + " --height " + str(vheight)
-                            elif zoom > 0:
-                                if igw/igh > 1.5:
-                                    datastr += " --width " + str(int(pre_width)) + " --height " + str(int(pre_height * .75))
-                                else:
-                                    datastr += " --width " + str(pre_width) + " --height " + str(pre_height)
-                            else:
-                                datastr += " --width " + str(vwidth) + " --height " + str(vheight)
-                            datastr += " --brightness " + str(brightness/100) + " --contrast " + str(contrast/100)
-                            if mode == 0:
-                                datastr += " --shutter " + str(sspeed) #+ " --framerate " + str(1000000/sspeed)
-                            else:
-                                datastr += " --exposure " + str(modes[mode]) #+ " --framerate " + str(fps)
-                            if ev != 0:
-                                datastr += " --ev " + str(ev)
-                            if sspeed > 5000000 and mode == 0 and (Pi_Cam < 5 or Pi_Cam == 7):
-                                datastr += " --gain 1 --immediate --awbgains " + str(red/10) + "," + str(blue/10)
-                            else:
-                                datastr += " --gain " + str(gain)
-                                if awb == 0:
-                                    datastr += " --awbgains " + str(red/10) + "," + str(blue/10)
-                                else:
-                                    datastr += " --awb " + awbs[awb]
-                            datastr += " --metering "   + meters[meter]
-                            datastr += " --saturation " + str(saturation/10)
-                            datastr += " --sharpness "  + str(sharpness/10)
-                            datastr += " --denoise "    + denoises[denoise]
-                            datastr += " --bitrate " + str(bits)
-                            if vflip == 1:
-                                datastr += " --vflip"
-                            if hflip == 1:
-                                datastr += " --hflip"
-                            if Pi_Cam == 9 and os.path.exists("/home/" + Home_Files[0] + "/imx290a.json") and Pi == 5:
-                                datastr += " --tuning-file /home/" + Home_Files[0] + "/imx290a.json"
-                            if Pi_Cam == 4 and scientific == 1:
-                                if os.path.exists('/usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json') and Pi == 4:
-                                    datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/vc4/imx477_scientific.json"
-                                if os.path.exists('/usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json') and Pi == 5:
-                                    datastr += " --tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_scientific.json"
-                            if ((Pi_Cam == 3 and v3_af == 1) and v3_f_mode > 0 and fxx == 0) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6)) or Pi_Cam == 8:
-                                datastr += " --autofocus-mode " + v3_f_modes[v3_f_mode]
-                                if v3_f_mode == 1:
-                                    if Pi_Cam == 3:
-                                        datastr += " --lens-position " + str(v3_focus/100)
-                                    if Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
-                                        datastr += " --lens-position " + str(focus/100)
-                            if ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6) ) or Pi_Cam == 8) and zoom == 0:
-                                datastr += " --autofocus-window " + str(fxx) + "," + str(fxy) + "," + str(fxz) + "," + str(fxz)
-                            if Pi_Cam == 3 or Pi == 5:
-                                datastr += " --hdr " + v3_hdrs[v3_hdr]
-                            if zoom > 1 and Pi_Cam == 4 and PiHQ_ON == 1:
-                                zws = vwidths[vformat]
-                                zhs = vheights[vformat]
-                                zxo = ((igw-zws)/2)/igw
-                                zyo = ((2160-zhs)/2)/2160
-                                datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str((zhs/2160))
-                            elif zoom > 1 and Pi_Cam == 4:
-                                zws = vwidths[vformat]
-                                zhs = vheights[vformat]
-                                zxo = ((igw-int(zws))/2)/igw
-                                zyo = ((igh-int(zhs))/2)/igh
-                                datastr += " --roi " + str(zxo) + "," + str(zyo) + "," + str(zws/igw) + "," + str(zhs/igh)
-
-                            if show_cmds == 1:
-                                print (datastr)
-                            p = subprocess.Popen(datastr, shell=True, preexec_fn=os.setsid)
-                            start_timelapse = time.monotonic()
-                            stop = 0
-                            while time.monotonic() - start_timelapse < tduration+1 and stop == 0:
-                                tdur = int(tduration - (time.monotonic() - start_timelapse))
-                                td = timedelta(seconds=tdur)
-                                text(1,10,1,1,1,str(td),fv,12)
-
-                        button(1,9,0,2)
-                        if tinterval != 0:
-                            text(1,12,3,1,1,str(tshots),fv,12)
-                        if rotate != 0:
-                            if alt_dis < 2:
-                                pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,pre_width,pre_height),0)
-                            else:
-                                pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,pre_width,pre_height * .75),0)
-                        td = timedelta(seconds=tduration)
-                        text(1,10,3,1,1,str(td),fv,12)
-                        text(0,0,1,0,1,"CAPTURE STILL",ft,7)
-                        text(1,0,1,0,1,"CAPTURE/Stream",ft-2,7)
-                        text(1,0,1,1,1,"Video",ft,7)
-                        text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
-                        text(1,9,1,0,1,"CAP T/LPSE",ft,7)
-                        if tinterval > 0:
-                            text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
-                        else:
-                            text(1,9,3,1,1,"",ft,7)
-                        restart = 2
-                elif tinterval > 0:
-                    st_scale = int(st_scale * 2)
-                    if st_scale > 8:
-                        st_scale = 1
-                    if st_scale > 4 and Pi_Cam != 4 and Pi_Cam != 6 and Pi_Cam != 8:
-                        st_scale = 1
-                    text(0,0,3,1,1,str(st_scales[st_scale]),ft,7)
-                    if tinterval > 0:
-                        text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
-                    else:
-                        text(1,9,1,1,1,"",ft,7)
-					
-            if button_row == 2:
-                # VIDEO LENGTH
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'vlen':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    vlen = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height  + (bh*2) and mousey < pre_height + (bh*2) + int(bh/3)) and alt_dis == 1:
-                    vlen = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75  + (bh*2) and mousey < pre_height * .75 + (bh*2) + int(bh/3)) and alt_dis == 2:
-                    vlen = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                elif event.button == 1:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        vlen -=1
-                        vlen  = max(vlen ,pmin)
-                    else:
-                        vlen  +=1
-                        vlen = min(vlen ,pmax)
-                elif event.button == 3:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        vlen -=60
-                        vlen = max(vlen,pmin)
+                    v3_f_mode = 0
+                zoom = 0
+                fxx = 0
+                fxy = 0
+                fxz = 1
+                fyz = 0.75
+                button(1,7,0,9)
+                text(1,7,5,0,1,"FOCUS",ft,7)
+                text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
+                button(1,8,0,9)
+                text(1,8,5,0,1,"Zoom",ft,7)
+                text(1,8,3,1,1,"",fv,7)
+                if vw == 0:
+                    text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+                if vw == 1:
+                    text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+                restart = 1
+            # Pi V3 cancel manual focus
+            elif (Pi_Cam == 3 and v3_af == 1)  and v3_f_mode == 1:
+                focus_mode = 0
+                v3_f_mode = 2 # continuous focus
+                foc_man = 0
+                zoom = 0
+                fxx = 0
+                fxy = 0
+                fxz = 1
+                fyz = 0.75
+                if alt_dis < 2:
+                    pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,0,pre_width,pre_height))
+                button(1,7,0,9)
+                text(1,7,5,0,1,"FOCUS",ft,7)
+                text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
+                button(1,8,0,9)
+                text(1,8,5,0,1,"Zoom",ft,7)
+                text(1,8,3,1,1,"",fv,7)
+                if vw == 0:
+                    text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+                if vw == 1:
+                    text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+                restart = 1
+            # AF camera to AUTO
+            elif ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8))) and v3_f_mode == 2:
+                focus_mode = 0
+                v3_f_mode = 0 # auto focus
+                foc_man = 0
+                zoom = 0
+                fxx = 0
+                fxy = 0
+                fxz = 1
+                fyz = 0.75
+                if alt_dis < 2:
+                    pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,0,pre_width,pre_height))
+                button(1,7,0,9)
+                text(1,7,5,0,1,"FOCUS",ft,7)
+                text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
+                button(1,8,0,9)
+                text(1,8,5,0,1,"Zoom",ft,7)
+                text(1,8,3,1,1,"",fv,7)
+                if vw == 0:
+                    text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+                if vw == 1:
+                    text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+                restart = 1
+
+def set_zoom():
+    # ZOOM
+    global zoom,xx,xy,vformat,vwidth,vheight,fxx,fxy,fxz,fyz,restart
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == 'zoom':
+            pmin = video_limits[f+1]
+            pmax = video_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        zoom = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
+        if zoom != 5 and igw/igh > 1.5 and alt_dis == 0:
+            pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,int(pre_height * .75),pre_width,pre_height))
+    elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
+        zoom = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
+        if igw/igh > 1.5:
+            pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,int(pre_height * .75),pre_width,pre_height/4))
+    elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
+        zoom = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
+    elif ((alt_dis == 0 and mousex > pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 1)):
+        zoom +=1
+        zoom = min(zoom,pmax)
+    elif ((alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0)) and zoom > 0:
+        zoom -=1
+        if zoom != 5 and igw/igh > 1.5 and alt_dis == 0:
+            pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,int(pre_height * .75),pre_width,pre_height))
+    if zoom < 2:
+        if zoom == 0:
+            button(1,8,0,9)
+            text(1,8,5,0,1,"Zoom",ft,7)
+            text(1,8,3,1,1,"",fv,7)
+            draw_Vbar(0,1,8,greyColor,'zoom',zoom)
+        else:
+            button(1,8,1,9)
+            text(1,8,2,0,1,"ZOOMED",ft,0)
+            text(1,8,3,1,1,str(zoom),fv,0)
+            draw_Vbar(0,1,8,dgryColor,'zoom',zoom)
+
+        if foc_man == 0:
+            button(1,7,0,9)
+            text(1,7,5,0,1,"FOCUS",ft,7)
+        # determine if camera native format
+        vw = 0
+        x = 0
+        xx = int(pre_width/2)
+        xy = int(pre_height/2)
+        if igw/igh > 1.5:
+            xy = int(xy * .75)
+        while x < len(vwidths2) and vw == 0:
+            if vwidth == vwidths2[x]:
+                 if vheight == vheights2[x]:
+                    vw = 1
+            x += 1
+        if vw == 0:
+            text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+        else:
+            text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
+
+    else:
+        button(1,8,1,9)
+        text(1,8,2,0,1,"ZOOMED",ft,0)
+        text(1,8,3,1,1,str(zoom),fv,0)
+        if Pi_Cam == 4 and zoom > 1 and PiHQ_ON == 1:
+             vformat = crop4_f[zoom]
+             vwidth  = vwidths[vformat]
+             vheight = vheights[vformat]
+             text(1,3,3,1,1,str(vwidth) + "x" + str(vheight) + " " + crop4_t[zoom],fv,11)
+        elif igw/igh > 1.5:
+            text(1,3,3,1,1,str(pre_width) + "x" + str(int(pre_height * .75)),fv,11)
+        else:
+            text(1,3,3,1,1,str(pre_width) + "x" + str(pre_height),fv,11)
+        draw_Vbar(0,1,8,dgryColor,'zoom',zoom)
+        draw_Vbar(0,1,3,lpurColor,'vformat',vformat)
+    if zoom > 0:
+        fxx = 0
+        fxy = 0
+        fxz = 1
+        fyz = 1
+        if (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0:
+            text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
+    restart = 1
+    time.sleep(.2)
+
+def set_tduration():
+    # TIMELAPSE DURATION
+    global tduration,tshots
+    bpos1 = 0
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == 'tduration':
+            pmin = video_limits[f+1]
+            pmax = video_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        bpos1 = (mousex-pre_width-bw) / bw
+        bpos4 = pow(bpos1,3)
+        tduration = int(bpos4 * (pmax+1-pmin)) + 1
+    elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
+        tduration = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
+        tduration = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    elif event.button == 1:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            tduration -=1
+            tduration = max(tduration,pmin)
+        else:
+            tduration +=1
+            tduration = min(tduration,pmax)
+        bpos1 = pow(tduration/(pmax-pmin),.333)
+    elif event.button == 3:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            tduration -=60
+            tduration = max(tduration,pmin)
+        else:
+            tduration +=60
+            tduration = min(tduration,pmax)
+        bpos1 = pow(tduration/(pmax-pmin),.333)
+    elif event.button == 4 or event.button == 5:
+        if event.button == 5:
+            tduration -=600
+            tduration = max(tduration,pmin)
+        else:
+            tduration +=600
+            tduration = min(tduration,pmax)
+        bpos1 = pow(tduration/(pmax-pmin),.333)
+    td = timedelta(seconds=tduration)
+    text(1,10,3,1,1,str(td),fv,12)
+    draw_Vbar(bpos1,1,10,lyelColor,'tduration',tduration)
+    if tinterval > 0:
+        tshots = int(tduration / tinterval)
+        text(1,12,3,1,1,str(tshots),fv,12)
+    else:
+        text(1,12,3,1,1," ",fv,12)
+    if alt_dis == 0:
+        for f in range(0,len(video_limits)-1,3):
+            if video_limits[f] == 'tshots':
+                pmin = video_limits[f+1]
+                pmax = video_limits[f+2]
+        bpos3 = pow(tshots/(pmax-pmin),.333)
+    else:
+        bpos3 = 0
+    draw_Vbar(bpos3,1,12,lyelColor,'tshots',tshots)
+
+def set_tinterval():
+    # TIMELAPSE INTERVAL
+    global tinterval,tduration,speed,shutter,sspeed,restart
+    bpos2 = 0
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == 'tinterval':
+            pmin = video_limits[f+1]
+            pmax = video_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        bpos2 = (mousex-pre_width-bw) / bw
+        bpos4 = pow(bpos2,3)
+        tinterval = int(bpos4 * (pmax+1-pmin))
+    elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
+        tinterval = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
+        tinterval = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+    elif event.button == 1:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            tinterval -=1
+            tinterval = max(tinterval,pmin)
+        else:
+            tinterval +=1
+            tinterval = min(tinterval,pmax)
+        bpos2 = pow(tinterval/(pmax-pmin),.333)
+    elif event.button == 3:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            tinterval -=60
+            tinterval = max(tinterval,pmin)
+        else:
+            tinterval +=60
+            tinterval = min(tinterval,pmax)
+        bpos2 = pow(tinterval/(pmax-pmin),.333)
+    elif event.button == 4 or event.button == 5:
+        if event.button == 5:
+            tinterval -=600
+            tinterval = max(tinterval,pmin)
+        else:
+            tinterval +=600
+            tinterval = min(tinterval,pmax)
+        bpos2 = pow(tinterval/(pmax-pmin),.333)
+    text(1,9,1,0,1,"CAP T/LPSE",ft,7)
+    if tinterval == 0:
+        text(1,9,1,1,1," ",ft,7)
+    else:
+        text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
+    td = timedelta(seconds=tinterval)
+    text(1,11,3,1,1,str(td),fv,12)
+    draw_Vbar(bpos2,1,11,lyelColor,'tinterval',tinterval)
+    if tinterval != 0:
+        tduration = tinterval * tshots
+        td = timedelta(seconds=tduration)
+        text(1,10,3,1,1,str(td),fv,12)
+        if alt_dis == 0:
+            for f in range(0,len(video_limits)-1,3):
+                if video_limits[f] == 'tduration':
+                    pmin = video_limits[f+1]
+                    pmax = video_limits[f+2]
+            bpos1 = pow(tduration/(pmax-pmin),.333)
+        else:
+            bpos1 = 0
+        draw_Vbar(bpos1,1,10,lyelColor,'tduration',tduration)
+    if tinterval == 0:
+        text(1,12,3,1,1," ",fv,12)
+        if mode == 0:
+            speed = 15
+            shutter = shutters[speed]
+            if shutter < 0:
+                shutter = abs(1/shutter)
+            sspeed = int(shutter * 1000000)
+            if (shutter * 1000000) - int(shutter * 1000000) > 0.5:
+                sspeed +=1
+            if shutters[speed] < 0:
+                text(0,2,3,1,1,"1/" + str(abs(shutters[speed])),fv,10)
+            else:
+                text(0,2,3,1,1,str(shutters[speed]),fv,10)
+            draw_bar(0,2,lgrnColor,'speed',speed)
+            restart = 1
+    else:
+        text(1,12,3,1,1,str(tshots),fv,12)
+
+def set_tshots():
+    global tshots,tduration
+    if tinterval > 0:
+        # TIMELAPSE SHOTS
+        for f in range(0,len(video_limits)-1,3):
+            if video_limits[f] == 'tshots':
+                pmin = video_limits[f+1]
+                pmax = video_limits[f+2]
+        bpos3 = 0
+        if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+            bpos3 = (mousex-pre_width-bw) / bw
+            bpos4 = pow(bpos3,3)
+            tshots = int(bpos4 * (pmax+1-pmin)) + 1
+        elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
+            tshots = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
+            tshots = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
+        elif event.button == 1:
+            if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                tshots -=1
+                tshots = max(tshots,pmin)
+            else:
+                tshots +=1
+                tshots = min(tshots,pmax)
+            bpos3 = pow(tshots/(pmax-pmin),.333)
+        elif event.button == 3:
+            if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                tshots -=20
+                tshots = max(tshots,pmin)
+            else:
+                tshots +=20
+                tshots = min(tshots,pmax)
+            bpos3 = pow(tshots/(pmax-pmin),.333)
+        elif event.button == 4 or event.button == 5:
+            if event.button == 5:
+                tshots -=100
+                tshots = max(tshots,pmin)
+            else:
+                tshots +=100
+                tshots = min(tshots,pmax)
+            bpos3 = pow(tshots/(pmax-pmin),.333)
+        text(1,12,3,1,1,str(tshots),fv,12)
+        draw_Vbar(bpos3,1,12,lyelColor,'tshots',tshots)
+        if tduration > 0:
+            tduration = tinterval * tshots
+        if tduration == 0:
+            tduration = 1
+        td = timedelta(seconds=tduration)
+        text(1,10,3,1,1,str(td),fv,12)
+        if alt_dis == 0:
+            for f in range(0,len(video_limits)-1,3):
+                if video_limits[f] == 'tduration':
+                    pmin = video_limits[f+1]
+                    pmax = video_limits[f+2]
+            bpos1 = pow(tduration/(pmax-pmin),.333)
+        else:
+            bpos1 = 0
+        draw_Vbar(bpos1,1,10,lyelColor,'tduration',tduration)
+
+def set_histarea():
+    # HISTOGRAM SIZE
+    global histarea,old_histarea
+    for f in range(0,len(video_limits)-1,3):
+        if video_limits[f] == 'histarea':
+            pmin = video_limits[f+1]
+            pmax = video_limits[f+2]
+    if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+        histarea = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
+        histarea = max(histarea,pmin)
+    elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
+        histarea = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
+        histarea = max(histarea,pmin)
+    elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
+        histarea = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
+        histarea = max(histarea,pmin)
+    else:
+        if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+            histarea -=1
+            histarea = max(histarea,pmin)
+        else:
+            histarea +=1
+            histarea = min(histarea,pmax)
+    if xx - histarea < 0 or xy - histarea < 0:
+        histarea = old_histarea
+    if xy + histarea > pre_height or xx + histarea > pre_width:
+        histarea = old_histarea
+    if (Pi_Cam == 3 and v3_af == 1) and (xy + histarea > pre_height * 0.75 or xx + histarea > pre_width):
+        histarea = old_histarea
+    text(1,14,3,1,1,str(histarea),fv,7)
+    draw_Vbar(0,1,14,greyColor,'histarea',histarea)
+    old_histarea = histarea
+
+def set_f_range_str_cap():
+    # V3 FOCUS RANGE, or EXT TRIGGER (NOT v3 camera)
+    global v3_f_range,restart,str_cap
+    if (Pi_Cam == 3 and v3_af == 1):
+        # V3 FOCUS RANGE
+        for f in range(0,len(video_limits)-1,3):
+            if video_limits[f] == 'v3_f_range':
+                pmin = video_limits[f+1]
+                pmax = video_limits[f+2]
+        if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+            v3_f_range = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height + bh  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
+            v3_f_range = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
+            v3_f_range = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+        else:
+            if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                v3_f_range-=1
+                v3_f_range = max(v3_f_range,pmin)
+            else:
+                v3_f_range +=1
+                v3_f_range = min(v3_f_range,pmax)
+        text(1,15,3,1,1,v3_f_ranges[v3_f_range],fv,7)
+        draw_Vbar(0,1,15,greyColor,'v3_f_range',v3_f_range)
+        restart = 1
+    elif Pi_Cam != 3:
+        # EXT TRIGGER (NOT v3 camera)
+        for f in range(0,len(video_limits)-1,3):
+            if video_limits[f] == 'str_cap':
+                pmin = video_limits[f+1]
+                pmax = video_limits[f+2]
+        if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
+            str_cap = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height + bh  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
+            str_cap = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+        elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
+            str_cap = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
+        else:
+            if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
+                str_cap -=1
+                str_cap = max(str_cap,pmin)
+            else:
+                str_cap +=1
+                str_cap = min(str_cap,pmax)
+        text(1,15,3,1,1,strs[str_cap],fv,7)
+        draw_Vbar(0,1,15,greyColor,'str_cap',str_cap)
+        restart = 1
+
+def set_hflip():
+    # HORIZONTAL FLIP
+    global hflip,restart
+    hflip += 1
+    if hflip > 1:
+        hflip = 0
+    text(1,16,3,1,1,str(hflip),fv,7)
+    restart = 1
+
+def set_save2ram():
+    # SAVE VIDEO TO RAM
+    global save2ram
+    save2ram +=1
+    if save2ram > 1:
+        save2ram = 0
+        text(1,17,3,1,1,"OFF",fv,7)
+    else:
+        text(1,17,3,1,1,"ON",fv,7)
+    #restart = 1
+
+def save_settings():
+    global config,mode,speed,gain,brightness,contrast,red,blue,ev,vlen,fps,vformat,codec,tinterval,tshots,extn,zx,zy,zoom,saturation,meter,awb
+    global sharpness,denoise,quality,profile,level,histogram,histarea,v3_f_speed,v3_f_range,rotate,IRF,str_cap,v3_hdr,timet,vflip,hflip,bitrate
+    global st_scale,bits,tduration
+    if ((alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0)) and event.button != 3:
+       # SAVE CONFIG
+       text(1,13,3,1,1,"Config",fv,7)
+       config[0] = mode
+       config[1] = speed
+       config[2] = gain
+       config[3] = int(brightness)
+       config[4] = int(contrast)
+       config[5] = frame
+       config[6] = int(red)
+       config[7] = int(blue)
+       config[8] = ev
+       config[9] = vlen
+       config[10] = fps
+       config[11] = vformat
+       config[12] = codec
+       config[13] = tinterval
+       config[14] = tshots
+       config[15] = extn
+       config[16] = zx
+       config[17] = zy
+       config[18] = zoom
+       config[19] = int(saturation)
+       config[20] = meter
+       config[21] = awb
+       config[22] = sharpness
+       config[23] = int(denoise)
+       config[24] = quality
+       config[25] = profile
+       config[26] = level
+       config[27] = histogram
+       config[28] = histarea
+       config[29] = v3_f_speed
+       config[30] = v3_f_range
+       config[31] = rotate
+       config[32] = IRF
+       config[33] = str_cap
+       config[34] = v3_hdr
+       config[35] = timet
+       config[36] = vflip
+       config[37] = hflip
+       config[38] = bitrate
+       config[39] = st_scale
+       with open(config_file + str(camera) + ".txt", 'w') as f:
+          for item in range(0,len(titles)):
+              f.write(titles[item] + " : " + str(config[item]) + "\n")
+       time.sleep(1)
+       text(1,13,2,1,1,"Config",fv,7)
+
+    # read config_file
+    elif ((alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0)) and event.button == 3:
+        text(1,13,3,0,1,"Load      EXIT",fv +2,7)
+        text(1,13,3,1,1,"Config",fv,7)
+        if os.path.exists(config_file + str(camera) + ".txt"):
+            config = []
+            with open(config_file + str(camera) + ".txt", "r") as file:
+               line = file.readline()
+               while line:
+                   line = line.strip()
+                   item = line.split(" : ")
+                   config.append(item[1])
+                   line = file.readline()
+            config = list(map(int,config))
+
+            mode        = config[0]
+            speed       = config[1]
+            gain        = config[2]
+            brightness  = config[3]
+            contrast    = config[4]
+            red         = config[6]
+            blue        = config[7]
+            ev          = config[8]
+            vlen        = config[9]
+            fps         = config[10]
+            vformat     = config[11]
+            codec       = config[12]
+            tinterval   = config[13]
+            tshots      = config[14]
+            extn        = config[15]
+            zx          = config[16]
+            zy          = config[17]
+            zoom        = 0
+            saturation  = config[19]
+            meter       = config[20]
+            awb         = config[21]
+            sharpness   = config[22]
+            denoise     = config[23]
+            quality     = config[24]
+            profile     = config[25]
+            level       = config[26]
+            histogram   = config[27]
+            histarea    = config[28]
+            v3_f_speed  = config[29]
+            v3_f_range  = config[30]
+            rotate      = config[31]
+            IRF         = config[32]
+            str_cap     = config[33]
+            v3_hdr      = config[34]
+            timet       = config[35]
+            vflip       = config[36]
+            hflip       = config[37]
+            bitrate     = config[38]
+            st_scale    = config[39]
+            if Pi_Cam != 4 and Pi_Cam != 6 and Pi_Cam != 8 and st_scale == 8:
+                st_scale = 4
+            bits        = bitrate * 1000000
+            if tinterval > 0:
+                tduration = tinterval * tshots
+            else:
+                tduration = 5
+            time.sleep(1)
+            text(1,13,2,0,1,"Save      EXIT",fv +2,7)
+            text(1,13,2,1,1,"Config",fv,7)
+            Menu()
+            Menu2()
+            stop_preview()
+            preview()
+    else:
+       stop_preview()
+       pygame.display.quit()
+       sys.exit()
+
+# every button is handled by a callable, (button_column,button_row) : handler
+button_keys = {(1,1):take_still, (1,2):set_mode, (1,3):set_speed, (1,4):set_gain, (1,5):set_brightness, (1,6):set_contrast,
+               (1,7):set_awb, (1,8):set_blue_denoise, (1,9):set_red_sharpness, (1,10):set_extn, (1,11):set_quality,
+               (1,12):set_saturation, (1,13):set_meter, (1,14):set_hdr_timet, (1,15):set_histogram, (1,16):set_cam_option,
+               (1,17):set_vflip, (1,18):set_v_preview, (2,1):take_video, (2,2):set_vlen, (2,3):set_fps, (2,4):set_vformat,
+               (2,5):set_codec, (2,6):set_profile, (2,7):set_bitrate, (2,8):set_focus, (2,9):set_zoom, (2,10):take_timelapse,
+               (2,11):set_tduration, (2,12):set_tinterval, (2,13):set_tshots, (2,14):save_settings, (2,15):set_histarea,
+               (2,16):set_f_range_str_cap, (2,17):set_hflip, (2,18):set_save2ram}
+
+text(0,0,6,2,1,"Please Wait, checking camera",int(fv* 1.7),1)
+text(0,0,6,2,1,"Found " + str(cameras[Pi_Cam]),int(fv*1.7),1)
+
+Menu()
+Menu2()
+
+time.sleep(1)
+pygame.display.update()
+
+# determine max speed for camera
+max_speed = 0
+while max_shutter > shutters[max_speed]:
+    max_speed +=1
+if speed > max_speed:
+    speed = max_speed
+    shutter = shutters[speed]
+    if shutter < 0:
+        shutter = abs(1/shutter)
+    sspeed = int(shutter * 1000000)
+    if mode == 0:
+        if shutters[speed] < 0:
+            text(0,2,3,1,1,"1/" + str(abs(shutters[speed])),fv,10)
+        else:
+            text(0,2,3,1,1,str(shutters[speed]),fv,10)
+    else:
+        if shutters[speed] < 0:
+            text(0,2,0,1,1,"1/" + str(abs(shutters[speed])),fv,10)
+        else:
+            text(0,2,0,1,1,str(shutters[speed]),fv,10)
+if mode == 0:
+    draw_bar(0,2,lgrnColor,'speed',speed)
+pygame.display.update()
+time.sleep(.25)
+
+xx = int(pre_width/2)
+xy = int(pre_height/2)
+
+fxx = 0
+fxy = 0
+fxz = 1
+fyz = 1
+old_histarea = histarea
+
+if preview_backend == 1 and Picamera2 == None:
+    print("Picamera2 not found, using rpicam-vid for preview")
+    preview_backend = 0
+
+# start preview
+if rotate == 0:
+    text(0,0,6,2,1,"Please Wait for preview...",int(fv*1.7),1)
+preview()
+if preview_worker == 1:
+    threading.Thread(target=frame_worker, daemon=True).start()
+ncount = 0
+nvalues = [0] * 20
+# main loop
+while True:
+    if touch_time > 0:
+        touch_ms.append((time.monotonic() - touch_time) * 1000)
+        touch_time = 0
+    if press_held != None:
+        press_again()
+    if not buttonFUP.is_pressed and not buttonFDN.is_pressed:
+        gpio_key = None
+    time.sleep(0.01)
+    # both focus buttons, autofocus sweep
+    if (Pi_Cam == 3 and v3_af == 1) or Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
+      if buttonFUP.is_pressed and buttonFDN.is_pressed and af_state == 0:
+        af_begin()
+    # focus UP button
+    if (Pi_Cam == 3 and v3_af == 1) or Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
+      if buttonFUP.is_pressed and not buttonFDN.is_pressed and af_state == 0 and press_gpio('FUP') == 1:
+        if v3_f_mode != 1:
+            focus_mode = 1
+            v3_f_mode = 1 # manual focus
+            foc_man = 1 
+            button(1,7,1,9)
+            text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,0)
+        v3_focus += 10
+        for f in range(0,len(video_limits)-1,3):
+          if video_limits[f] == 'v3_focus':
+            v3_pmin = video_limits[f+1]
+            v3_pmax = video_limits[f+2]
+        v3_focus = min(v3_focus,v3_pmax)
+        focus = v3_focus
+        if Pi_Cam == 3:
+            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus * 4)
+            fd = 1/(v3_focus/100)
+            text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+        else:
+            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus)
+            text(1,7,3,0,1,'<<< ' + str(v3_focus) + ' >>>',fv,0)
+        update_preview(0)
+
+    # focus DOWN button
+    if (Pi_Cam == 3 and v3_af == 1) or Pi_Cam == 8 or ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6):
+      if buttonFDN.is_pressed and not buttonFUP.is_pressed and af_state == 0 and press_gpio('FDN') == 1:
+        if v3_f_mode != 1:
+            focus_mode = 1
+            v3_f_mode = 1 # manual focus
+            foc_man = 1 
+            button(1,7,1,9)
+            text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,0)
+        v3_focus -= 10
+        for f in range(0,len(video_limits)-1,3):
+          if video_limits[f] == 'v3_focus':
+            v3_pmin = video_limits[f+1]
+            v3_pmax = video_limits[f+2]
+        v3_focus = max(v3_focus,v3_pmin)
+        focus = v3_focus
+        if Pi_Cam == 3:
+            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus * 4)
+            fd = 1/(v3_focus/100)
+            text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
+        else:
+            draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus)
+            text(1,7,3,0,1,'<<< ' + str(v3_focus) + ' >>>',fv,0)
+        update_preview(0)
+
+       
+    new_frame = 0
+    yuv_y = None
+    if work_held is not None:
+        work_free.append(work_held)
+        work_held = None
+    if preview_worker == 1:
+        with work_lock:
+            wr = work_ready
+            work_ready = None
+        if wr != None:
+            work_held = wr[6]
+        if wr != None and wr[0] == pipe_gen:
+            # frame decoded, scaled and rotated by frame_worker, time spent waiting for the main loop counts as wait
+            trec = wr[1]
+            tlast = time.time()
+            trec["wait"] += (tlast - wr[2]) * 1000
+            image = pygame.image.frombuffer(wr[3],(wr[3].shape[1],wr[3].shape[0]),"RGB")
+            image_pos = wr[4]
+            yuv_y = wr[5]
+            new_frame = 1
+    elif sess_type > 0:
+        frm = pipe_latest()
+        if frm is not None:
+            time_start(frame_time)
+            image = pygame.image.frombuffer(frm.tobytes(),(frm.shape[1],frm.shape[0]),"RGB")
+            frame_stats['decoded'] += 1
+            new_frame = 1
+            time_stage('decode')
+    elif preview_pipe == 2:
+        frm = pipe_latest()
+        if frm is not None:
+            time_start(frame_time)
+            image = yuv_surface(frm)
+            frame_stats['decoded'] += 1
+            new_frame = 1
+            time_stage('decode')
+    else:
+        if preview_pipe == 1:
+            jpg = pipe_latest()
+        else:
+            jpg = file_latest()
+        if jpg != None:
+            time_start(frame_time)
+            try:
+                if fast_decode == 1:
+                    image = decode_jpeg(jpg)
+                else:
+                    image = pygame.image.load(io.BytesIO(jpg),"preview.jpg")
+                if image != None:
+                    frame_stats['decoded'] += 1
+                    new_frame = 1
+            except pygame.error:
+                pass
+            time_stage('decode')
+    if new_frame == 1:
+        batch_start()
+        if preview_worker == 0:
+            image,image_pos = scale_surface(image)
+        elif Pi_Cam == 4 and zoom > 1 and zoom < 6:
+            pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,int(pre_height * 0.75),int(pre_width),int(pre_height/4)),0)
+        time_stage('scale')
+        windowSurfaceObj.blit(image, image_pos)
+        time_stage('blit')
+        ana_begin()
+        if peaking == 1:
+            windowSurfaceObj.blit(peak_map(image),image_pos)
+        if zebra == 1:
+            windowSurfaceObj.blit(zebra_map(image),image_pos)
+        if tile_map == 1 and rotate == 0:
+            if tile_focus(image,image_pos) == 1:
+                update_preview(0)
+        if (zoom > 0 or foc_man == 1) and rotate == 0:
+            image2 = pygame.surfarray.pixels3d(image)
+            crop2 = image2[xx-histarea:xx+histarea,xy-histarea:xy+histarea]
+            if yuv_y is not None and yuv_y.shape == (image.get_height(),image.get_width()):
+                # raw yuv420 preview, use the Y plane
+                gray = yuv_y[xy-histarea:xy+histarea,xx-histarea:xx+histarea].T
+                gray3 = yuv_y[xy-ns:xy+ns,xx-ns:xx+ns].T
+            else:
+                gray = cv2.cvtColor(crop2,cv2.COLOR_RGB2GRAY)
+                crop3 = image2[xx-ns:xx+ns,xy-ns:xy+ns]
+                gray3 = cv2.cvtColor(crop3,cv2.COLOR_RGB2GRAY)
+            if zoom > 0 and histogram > 0:
+                if ana_due('hist',hist_every,(histogram,xx,xy,histarea)) == 1:
+                    counts = hist_counts(crop2,gray,gray3)
+                    lume   = counts[0]
+                    rede   = counts[1]
+                    greene = counts[2]
+                    bluee  = counts[3]
+                    lume4  = counts[4]
+                    rav,gav,bav = rgb_level(counts[1:4])
+                    lume   = hist_log(lume)
+                    rede   = hist_log(rede)
+                    greene = hist_log(greene)
+                    bluee  = hist_log(bluee)
+                    # noise is the spread of levels in the noise area
+                    levels = np.flatnonzero(lume4)
+                    if len(levels) > 0:
+                        min_val = int(levels[0])
+                        max_val = int(levels[-1])
                     else:
-                        vlen +=60
-                        vlen = min(vlen,pmax)
-                elif event.button == 4 or event.button == 5:
-                    if event.button == 5:
-                        vlen -=600
-                        vlen = max(vlen,pmin)
+                        min_val = -1
+                        max_val = -1
+                    nvalues.append(max_val-min_val)
+                    del nvalues[0]
+                    nave = int(sum(nvalues)/20) 
+                    if histogram > 5:
+                        graph = scope_draw(image)
                     else:
-                        vlen +=600
-                        vlen = min(vlen,pmax)
-                td = timedelta(seconds=vlen)
-                text(1,1,3,1,1,str(td),fv,11)
-                draw_Vbar(0,1,1,lpurColor,'vlen',vlen)
-                time.sleep(.25)
- 
-            elif button_row == 3:
-                # FPS
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'fps':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    fps = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
-                    fps = min(fps,vfps)
-                    fps = max(fps,pmin)
-                elif (mousey > pre_height  + (bh*2) and mousey < pre_height + (bh*2) + int(bh/3)) and alt_dis == 1:
-                    fps = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                    fps = min(fps,vfps)
-                    fps = max(fps,pmin)
-                elif (mousey > pre_height * .75  + (bh*2) and mousey < pre_height  * .75 + (bh*2) + int(bh/3)) and alt_dis == 2:
-                    fps = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                    fps = min(fps,vfps)
-                    fps = max(fps,pmin)
+                        graph = hist_draw(lume,rede,greene,bluee)
+                    ana_done('hist',(histogram,xx,xy,histarea),(rav,gav,bav,min_val,nave,graph))
+                if noise_mode == 1 and ana_due('noise',noise_every,(xx,xy)) == 1:
+                    ana_done('noise',(xx,xy),noise_stats(crop2))
+                # show the latest results
+                rav,gav,bav,min_val,nave,graph = ana_res['hist']
+                if noise_mode == 1:
+                    nsig,nsnr = ana_res['noise']
+                text(30,3,3,2,0,"RGB: " + str(rav) + ":" + str(gav) + ":" + str(bav),fv*2,0)
+                if alt_dis < 2:
+                    pygame.draw.rect(windowSurfaceObj,dgryColor,Rect(min_val + 10,pre_height-111,int(nave),102),0)
+                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(9,pre_height-111,64,102),1)
+                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(73,pre_height-111,64,102),1)
+                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(137,pre_height-111,64,102),1)
+                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(201,pre_height-111,66,102),1)
+                    windowSurfaceObj.blit(graph, (10,pre_height-110))
+                elif alt_dis == 2:
+                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(9,(pre_height * .75)-111,64,102),1)
+                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(73,(pre_height * .75)-111,64,102),1)
+                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(137,(pre_height * .75)-111,64,102),1)
+                    pygame.draw.rect(windowSurfaceObj,greyColor,Rect(201,(pre_height * .75)-111,66,102),1)
+                    windowSurfaceObj.blit(graph, (10,(pre_height * .75)-110))
+            if rotate != 0:
+                pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,int(pre_width/4.5),int(pre_height/8)),0)
+            if ana_due('focus',focus_every,(xx,xy,histarea)) == 1 or af_state == 1:
+                ana_done('focus',(xx,xy,histarea),cv2.Laplacian(gray, cv2.CV_64F).var())
+            foc = ana_res['focus']
+            if af_state == 1:
+                af_sweep(foc)
+            text(20,1,3,2,0,"Focus: " + str(int(foc)),fv* 2,0)
+            if zoom > 0 and histogram > 0 and noise_mode == 1:
+                text(20,2,3,2,0,"Noise: " + str(round(nsig[0],1)) + ":" + str(round(nsig[1],1)) + ":" + str(round(nsig[2],1)),fv* 2,0)
+                text(20,4,3,2,0,"SNR: " + str(int(nsnr[0])) + ":" + str(int(nsnr[1])) + ":" + str(int(nsnr[2])) + " dB",fv* 2,0)
+            elif zoom > 0 and histogram > 0:
+                text(20,2,3,2,0,"Noise: " + str(int(nave)),fv* 2,0)
+            pygame.draw.rect(windowSurfaceObj,redColor,Rect(xx-ns,xy-ns,ns*2,ns*2),1)
+            pygame.draw.rect(windowSurfaceObj,redColor,Rect(xx-histarea,xy-histarea,histarea*2,histarea*2),1)
+            pygame.draw.line(windowSurfaceObj,(255,255,255),(xx-int(histarea/2),xy),(xx+int(histarea/2),xy),1)
+            pygame.draw.line(windowSurfaceObj,(255,255,255),(xx,xy-int(histarea/2)),(xx,xy+int(histarea/2)),1)
+        if zoom == 0:
+            if rotate != 0:
+                pygame.draw.rect(windowSurfaceObj,blackColor,Rect(0,0,int(pre_width/4.5),int(pre_height/8)),0)
+            text(0,0,6,2,0,"Preview",fv* 2,0)
+            zxp = (zx -((pre_width/2) / (igw/pre_width)))
+            zyp = (zy -((pre_height/2) / (igh/pre_height)))
+            zxq = (zx - zxp) * 2
+            zyq = (zy - zyp) * 2
+            if zxp + zxq > pre_width:
+                zx = pre_width - int(zxq/2)
+                zxp = (zx -((pre_width/2) / (igw/pre_width)))
+                zxq = (zx - zxp) * 2
+            if zyp + zyq > pre_height:
+                zy = pre_height - int(zyq/2)
+                zyp = (zy -((pre_height/2) / (igh/pre_height)))
+                zyq = (zy - zyp) * 2
+            if zxp < 0:
+                zx = int(zxq/2) + 1
+                zxp = 0
+                zxq = (zx - zxp) * 2
+            if zyp < 0:
+                zy = int(zyq/2) + 1
+                zyp = 0
+                zyq = (zy - zyp) * 2
+            if pre_width < 800:
+                gw = 2
+            else:
+                gw = 1
+            if ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 or Pi_Cam == 6)) or Pi_Cam == 8) and fxz != 1 and zoom == 0 and rotate == 0:
+                if tile_map == 1 and tile_area.width > 0:
+                    # spot window picked on the focus tile grid, drawn on the same grid
+                    pygame.draw.rect(windowSurfaceObj,(200,0,0),Rect(tile_area.x + int(fxx*tile_area.width),tile_area.y + int(fxy*tile_area.height),int(fxz*tile_area.width),int(fyz*tile_area.height)),1)
                 else:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        fps -=1
-                        fps  = max(fps ,pmin)
-                    else:
-                        fps  +=1
-                        fps = min(fps ,pmax)
-                
-                text(1,2,3,1,1,str(fps),fv,11)
-                draw_Vbar(0,1,2,lpurColor,'fps',fps)
-                time.sleep(.25)
+                    pygame.draw.rect(windowSurfaceObj,(200,0,0),Rect(int(fxx*pre_width),int(fxy*pre_height*.75),int(fxz*pre_width),int(fyz*pre_height)),1)
+            if (Pi_Cam == 5 or Pi_Cam == 6) and (rotate == 0 or rotate == 2):
+                if vwidth == 1280 and vheight == 960:
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.20),int(pre_height * 0.22),int(pre_width * 0.62),int(pre_height * 0.57)),gw)
+                elif vwidth == 1280 and vheight == 720:
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.22),int(pre_height * 0.30),int(pre_width * 0.56),int(pre_height * 0.41)),gw)
+                elif (vwidth == 1296 and vheight == 972) or (vwidth == 2592 and vheight == 1944) or (vwidth == 1332 and vheight == 990) or (vwidth == 1456 and vheight == 1088):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.19),int(pre_height * 0.18),int(pre_width * 0.62),int(pre_height * 0.64)),gw)
+                elif (vwidth == 640 and vheight == 480) or (vwidth == 720 and vheight == 540) or (vwidth == 800 and vheight == 600):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.30),int(pre_height * 0.30),int(pre_width * 0.41),int(pre_height * 0.41)),gw)
+                elif (vwidth == 1920 and vheight == 1080) or (vwidth == 3840 and vheight == 2160) or (vwidth == 1536 and vheight == 864) or (vwidth == 4608 and vheight == 2592):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.09),int(pre_height * 0.20),int(pre_width * 0.82),int(pre_height * 0.62)),gw)
+            elif Pi_Cam == 8 and (rotate == 0 or rotate == 2):
+                if (vwidth == 1920 and vheight == 1080) or (vwidth == 3840 and vheight == 2160) or (vwidth == 1280 and vheight == 720) or (vwidth == 4608 and vheight == 2592) or (vwidth == 4624 and vheight == 3472) or (vwidth == 2304 and vheight == 1296) or (vwidth == 2028 and vheight == 1080):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.09),int(pre_height * 0.20),int(pre_width * 0.82),int(pre_height * 0.62)),gw)
+                elif vwidth == 1280 and vheight == 960:
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.20),int(pre_height * 0.22),int(pre_width * 0.62),int(pre_height * 0.57)),gw)
+                elif vwidth == 1296 and vheight == 972:
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.19),int(pre_height * 0.16),int(pre_width * 0.62),int(pre_height * 0.64)),gw)
+            elif Pi_Cam == 9:
+                if (vwidth == 800 and vheight == 600) or (vwidth == 640 and vheight == 480) or (vwidth == 720 and vheight == 540):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.25),int(pre_height * 0.13),int(pre_width * 0.50),int(pre_height * 0.49)),gw)
+                elif (vwidth == 1280 and vheight == 720):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.17),int(pre_height * 0.12),int(pre_width * 0.67),int(pre_height * 0.48)),gw)
+            elif rotate == 0 or rotate == 2:
+                if Pi_Cam == 1 and ((vwidth == 1920 and vheight == 1080) or (vwidth == 1280 and vheight == 720) or (vwidth == 1536 and vheight == 864)):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.13),int(pre_height * 0.22),int(pre_width * 0.74),int(pre_height * 0.57)),gw)
+                elif Pi_Cam == 2 and ((vwidth == 1920 and vheight == 1080) or (vwidth == 1280 and vheight == 720) or (vwidth == 1536 and vheight == 864)):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.2),int(pre_height * 0.28),int(pre_width * 0.60),int(pre_height * 0.45)),gw)
+                elif Pi_Cam == 2 and ((vwidth == 640 and vheight == 480) or (vwidth == 720 and vheight == 540)):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.30),int(pre_height * 0.30),int(pre_width * 0.41),int(pre_height * 0.41)),gw)
+                elif (Pi_Cam == 3 and v3_af == 1) and ((vwidth == 640 and vheight == 480) or (vwidth == 1296 and vheight == 972) or (vwidth == 1280 and vheight == 960)):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.25),int(pre_height * 0.17),int(pre_width * 0.50),int(pre_height * 0.46)),gw)
+                elif (Pi_Cam == 3 and v3_af == 1) and ((vwidth == 800 and vheight == 600) or (vwidth == 720 and vheight == 540)):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.25),int(pre_height * 0.17),int(pre_width * 0.50),int(pre_height * 0.46)),gw)
+                elif (Pi_Cam == 3 and v3_af == 1) and ((vwidth == 1280 and vheight == 720) or (vwidth == 1536 and vheight == 864)):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.175),int(pre_height * 0.15),int(pre_width * 0.66),int(pre_height * 0.48)),gw)
+                elif (Pi_Cam == 3 and v3_af == 1) and vwidth == 1640 and vheight == 1232:
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.12),0,int(pre_width * 0.75),int(pre_height * 0.75)),gw)
+                elif (Pi_Cam == 3 and v3_af == 1) and vwidth == 1456 and vheight == 1088:
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.12),0,int(pre_width * 0.75),int(pre_height * 0.75)),gw)
+                elif Pi_Cam == 7 and ((vwidth == 1920 and vheight == 1080) or (vwidth == 1280 and vheight == 720)):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(0,int(pre_height * 0.12),int(pre_width),int(pre_height * 0.75)),gw)
+                elif Pi_Cam == 4  and ((vwidth == 1920 and vheight == 1080) or (vwidth == 1536 and vheight == 864) or (vwidth == 1280 and vheight == 720)):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(0,int(pre_height * 0.15),int(pre_width),int(pre_height * 0.705)),gw)
+                elif Pi_Cam == 4  and ((vwidth == 640 and vheight == 480) or (vwidth == 1332 and vheight == 990) or (vwidth == 2028 and vheight == 1080)) and fps > 40:
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_width * 0.18),int(pre_height * 0.17),int(pre_width * 0.65),int(pre_height * 0.66)),gw)
+            elif rotate == 1 or rotate == 3:
+                if Pi_Cam == 2 and ((vwidth == 1920 and vheight == 1080) or (vwidth == 1280 and vheight == 720) or (vwidth == 1536 and vheight == 864)):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_height * 0.51),int(pre_width * 0.15),int(pre_height * 0.33),int(pre_width * 0.45)),gw)
+                elif Pi_Cam == 2 and ((vwidth == 640 and vheight == 480) or (vwidth == 720 and vheight == 540)):
+                    pygame.draw.rect(windowSurfaceObj,(155,0,150),Rect(int(pre_height * 0.50),int(pre_width * 0.22),int(pre_height * 0.33),int(pre_width * 0.31)),gw)
+
+        if show_times == 1:
+            time_overlay()
+        time_stage('analysis')
+        show_rect(Rect(0,0,pre_width,pre_height))
+        batch_end()
+        time_stage('update')
+        time_end()
+        if auto_fps == 1 and mode != 0 and fps_governor() == 1:
+            update_preview(0)
+        frame_stats['displayed'] += 1
+    if show_fstats == 1:
+        frame_stats_report()
+
+    if buttonSTR.is_pressed:
+        type = pygame.MOUSEBUTTONUP
+        if str_cap == 2:
+            click_event = pygame.event.Event(type, {"button": 3, "pos": (0,0)})
+        else:
+            click_event = pygame.event.Event(type, {"button": 1, "pos": (0,0)})
+        pygame.event.post(click_event)
+    
+    #check for any mouse button presses
+    for event in pygame.event.get():
+      #QUIT
+      if event.type == QUIT:
+          stop_preview()
+          pygame.quit()
+          
+      # MOVE HISTAREA or switch to SPOT FOCUS on AF camera (left mouse button)
+      elif event.type == MOUSEBUTTONDOWN:
+        press_down(event.pos,event.button)
+      elif event.type == MOUSEBUTTONUP:
+        if press_up(event) == 0:
+            continue
+        mousex, mousey = event.pos
+        touch_time = time.monotonic()
+        if mousex < pre_width and ((mousey < pre_height and alt_dis < 2) or (mousey < pre_height *.75 and alt_dis == 2)) and mousex != 0 and mousey != 0 and rotate == 0 and event.button == 1:
+            xx = mousex
+            xx = min(xx,pre_width - histarea)
+            xx = max(xx,histarea)
+            xy = mousey
+            if igw/igh > 1.5 and zoom < 5:
+                xy = min(xy,int(pre_height * .75) - histarea)
+            else:
+                xy = min(xy,pre_height - histarea)
+            xy = max(xy,histarea)
+            # switch to SPOT focus
+            if ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 or Pi_Cam == 6)) or Pi_Cam == 8) and mousex < pre_width and (mousey < pre_height *.75 or (tile_map == 1 and tile_area.collidepoint(mousex,mousey))) and zoom == 0 and (v3_f_mode == 0 or v3_f_mode == 2):
+                fxx = (xx - 25)/pre_width
+                xy  = min(xy,int((pre_height - 25) * .75))
+                fxy = ((xy - 20) * 1.3333)/pre_height
+                fxz = 50/pre_width
+                fyz = fxz
+                if tile_map == 1:
+                    # snap the spot window to the clicked tile of the focus map
+                    if tile_area.collidepoint(mousex,mousey):
+                        spot_tile(int((mousex - tile_area.x) * tile_cols / tile_area.width),int((mousey - tile_area.y) * tile_rows / tile_area.height))
+                if fxz != 1:
+                    text(1,7,3,1,1,"Spot",fv,7)
+            # switch out of SPOT focus
+            elif ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 or Pi_Cam ==6)) or Pi_Cam == 8) and zoom == 0:
+                fxx = 0
+                fxy = 0
+                fxz = 1
+                fzy = 1
+                if (v3_f_mode == 0 or v3_f_mode == 2):
+                    text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
+            if ((Pi_Cam == 3 and v3_af == 1) or ((Pi_Cam == 5 or Pi_Cam == 6)) or Pi_Cam == 8) and zoom == 0:
                 restart = 1
-                   
-            elif button_row == 4:
-                # VFORMAT
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'vformat':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
                 
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    # set max video format
-                    setmaxvformat()
-                    pmax = max_vformat
-                    vformat = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height  + (bh*2) and mousey < pre_height + (bh*2) + int(bh/3)) and alt_dis == 1:
-                    # set max video format    
-                    setmaxvformat()
-                    pmax = max_vformat
-                    vformat = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75  + (bh*2) and mousey < pre_height * .75 + (bh*2) + int(bh/3)) and alt_dis == 2:
-                    # set max video format    
-                    setmaxvformat()
-                    pmax = max_vformat
-                    vformat = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        vformat -=1
-                        # set max video format    
-                        setmaxvformat()
-                        vformat = min(vformat,max_vformat)
-                    else:
-                        vformat +=1
-                        # set max video format
-                        setmaxvformat()
-                        vformat = min(vformat,max_vformat)
-                draw_Vbar(0,1,3,lpurColor,'vformat',vformat)
-                vwidth  = vwidths[vformat]
-                vheight = vheights[vformat]
-                if Pi_Cam == 3:
-                    vfps = v3_max_fps[vformat]
-                    if vwidth == 1920 and codec == 0:
-                        prof = h264profiles[profile].split(" ")
-                        if str(prof[1]) == "4.2":
-                            if vpreview == 1:
-                                vfps = 45
-                            else:
-                                vfps = 60
-                    elif vwidth == 1536 and codec == 0:
-                        prof = h264profiles[profile].split(" ")
-                        if str(prof[1]) == "4.2":
-                            if vpreview == 1:
-                                vfps = 60
-                            else:
-                                vfps = 90
-                elif Pi_Cam == 9:
-                    vfps = v9_max_fps[vformat]
-                elif Pi_Cam == 15:
-                    vfps = v15_max_fps[vformat]
-                elif Pi_Cam == 16:
-                    vfps = v16_max_fps[vformat]
-                else:
-                    vfps = v_max_fps[vformat]
-                fps = min(fps,vfps)
-                video_limits[5] = vfps
-                text(1,2,3,1,1,str(fps),fv,11)
-                draw_Vbar(0,1,2,lpurColor,'fps',fps)
-                # determine if camera native format
-                vw = 0
-                x = 0
-                while x < len(vwidths2) and vw == 0:
-                    if vwidth == vwidths2[x]:
-                        if vheight == vheights2[x]:
-                            vw = 1
-                    x += 1
-                if vw == 0:
-                    text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                if vw == 1:
-                    text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                time.sleep(.25)
-
-            elif button_row == 5:
-                # CODEC
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'codec':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    codec = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + (bh*2) and mousey < pre_height + (bh*2) + int(bh/3)) and alt_dis == 1:
-                    codec = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + (bh*2) and mousey < pre_height * .75 + (bh*2) + int(bh/3)) and alt_dis == 2:
-                    codec = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        codec -=1
-                        codec  = max(codec ,pmin)
-                    else:
-                        codec  +=1
-                        codec = min(codec ,pmax)
-                # set max video format
-                setmaxvformat()
-                vformat = min(vformat,max_vformat)
-                text(1,4,3,1,1,codecs[codec],fv,11)
-                draw_Vbar(0,1,4,lpurColor,'codec',codec)
-                draw_Vbar(0,1,3,lpurColor,'vformat',vformat)
-                vwidth  = vwidths[vformat]
-                vheight = vheights[vformat]
-                if Pi_Cam == 3:
-                    vfps = v3_max_fps[vformat]
-                    if vwidth == 1920 and codec == 0:
-                        prof = h264profiles[profile].split(" ")
-                        if str(prof[1]) == "4.2":
-                            if vpreview == 1:
-                                vfps = 45
-                            else:
-                                vfps = 60
-                    elif vwidth == 1536 and codec == 0:
-                        prof = h264profiles[profile].split(" ")
-                        if str(prof[1]) == "4.2":
-                            if vpreview == 1:
-                                vfps = 60
-                            else:
-                                vfps = 90
-                elif Pi_Cam == 9:
-                    vfps = v9_max_fps[vformat]
-                elif Pi_Cam == 15:
-                    vfps = v15_max_fps[vformat]
-                elif Pi_Cam == 16:
-                    vfps = v16_max_fps[vformat]
+        # goto ZOOM 5 (mouse centre button)
+        if mousex < pre_width and ((mousey < pre_height and alt_dis < 2) or (mousey < pre_height *.75 and alt_dis == 2)) and mousex != 0 and mousey != 0 and rotate == 0 and event.button == 2:
+            if zoom < 5:
+                zoom = 5
+            else:
+                zoom = 0 
+            if zoom < 2:
+                if zoom == 0:
+                    button(1,8,0,9)
+                    text(1,8,5,0,1,"Zoom",ft,7)
+                    text(1,8,3,1,1,"",fv,7)
+                    draw_Vbar(0,1,8,greyColor,'zoom',zoom)
                 else:
-                    vfps = v_max_fps[vformat]
-                fps = min(fps,vfps)
-                video_limits[5] = vfps
-                text(1,2,3,1,1,str(fps),fv,11)
-                draw_Vbar(0,1,2,lpurColor,'fps',fps)
+                    button(1,8,1,9)
+                    text(1,8,2,0,1,"ZOOMED",ft,0)
+                    text(1,8,3,1,1,str(zoom),fv,0)
+                    draw_Vbar(0,1,8,dgryColor,'zoom',zoom)
+                        
+                if foc_man == 0:
+                    button(1,7,0,9)
+                    text(1,7,5,0,1,"FOCUS",ft,7)
                 # determine if camera native format
                 vw = 0
                 x = 0
+                xx = int(pre_width/2)
+                xy = int(pre_height/2)
+                if igw/igh > 1.5:
+                    xy = int(xy * .75)
                 while x < len(vwidths2) and vw == 0:
                     if vwidth == vwidths2[x]:
-                        if vheight == vheights2[x]:
+                         if vheight == vheights2[x]:
                             vw = 1
                     x += 1
                 if vw == 0:
                     text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
                 if vw == 1:
                     text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                time.sleep(.25)
-
-            elif button_row == 6:
-                # H264 PROFILE
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'profile':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    profile = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + (bh*2) and mousey < pre_height + (bh*2) + int(bh/3)) and alt_dis == 1:
-                    profile = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + (bh*2) and mousey < pre_height * .75 + (bh*2) + int(bh/3)) and alt_dis == 2:
-                    profile = int(((mousex-((button_row - 1)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        profile -=1
-                        profile  = max(profile ,pmin)
-                    else:
-                        profile  +=1
-                        profile = min(profile ,pmax)
-                text(1,5,3,1,1,h264profiles[profile],fv,11)
-                draw_Vbar(0,1,5,lpurColor,'profile',profile)
-                vwidth  = vwidths[vformat]
-                vheight = vheights[vformat]
-                if Pi_Cam == 3:
-                    vfps = v3_max_fps[vformat]
-                    if vwidth == 1920 and codec == 0:
-                        prof = h264profiles[profile].split(" ")
-                        if str(prof[1]) == "4.2":
-                            if vpreview == 1:
-                                vfps = 45
-                            else:
-                                vfps = 60
-                    elif vwidth == 1536 and codec == 0:
-                        prof = h264profiles[profile].split(" ")
-                        if str(prof[1]) == "4.2":
-                            if vpreview == 1:
-                                vfps = 60
-                            else:
-                                vfps = 90
-                elif Pi_Cam == 9:
-                    vfps = v9_max_fps[vformat]
-                elif Pi_Cam == 15:
-                    vfps = v15_max_fps[vformat]
-                elif Pi_Cam == 16:
-                    vfps = v16_max_fps[vformat]
-                else:
-                    vfps = v_max_fps[vformat]
-                fps = min(fps,vfps)
-                video_limits[5] = vfps
-                text(1,2,3,1,1,str(fps),fv,11)
-                draw_Vbar(0,1,2,lpurColor,'fps',fps)
-                time.sleep(.25)
-
-            elif button_row == 7:
-				# BITRATE
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'bitrate':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    bitrate = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
-                    bitrate = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
-                    bitrate = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        bitrate -=1
-                    else:
-                        bitrate +=1
-                bitrate = max(bitrate,pmin)
-                bitrate = min(bitrate,pmax)
-                bits = bitrate * 1000000
-                text(1,6,3,1,1,str(bitrate),fv,11)
-                draw_Vbar(0,1,6,lpurColor,'bitrate',bitrate)
-                restart = 1
-
-            elif button_row == 8:
-                # FOCUS
-                if (Pi_Cam == 3 and v3_af == 1):
-                    for f in range(0,len(video_limits)-1,3):
-                        if video_limits[f] == 'v3_focus':
-                            pmin = video_limits[f+1]
-                            pmax = video_limits[f+2]
-                if Pi_Cam == 5 or Pi_Cam == 6 or Pi_Cam == 8:
-                    if Pi_Cam == 5:
-                      for f in range(0,len(video_limits)-1,3):
-                        if video_limits[f] == 'v5_focus':
-                            pmin = video_limits[f+1]
-                            pmax = video_limits[f+2]
-                    if Pi_Cam == 6 or Pi_Cam == 8:
-                      for f in range(0,len(video_limits)-1,3):
-                        if video_limits[f] == 'v6_focus':
-                            pmin = video_limits[f+1]
-                            pmax = video_limits[f+2]
-                # arducam manual focus slider
-                if (mousex > pre_width + bw and mousey < ((button_row-1)*bh) + (bh/3)) and ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and foc_man == 1:
-                    focus = int(((mousex-pre_width-bw) / bw) * pmax)
-                    if Pi_Cam == 5:
-                        draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
-                    elif Pi_Cam == 6 or Pi_Cam == 8:
-                        draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
-                    v3_focus = focus
-                    restart = 1
-                    text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
-                #arducam manual focus buttons    
-                elif mousex > pre_width + bw and mousey > ((button_row-1)*bh) + (bh/3) and mousey < ((button_row-1)*bh) + (bh/1.5) and ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and foc_man == 1:
-                    if button_pos == 2:
-                        focus -= 10
-                        focus = max(focus,pmin)
-                    elif button_pos == 3:
-                        focus += 10
-                        focus = min(focus,pmax)
-                    if Pi_Cam == 5:
-                        draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
-                    elif Pi_Cam == 6 or Pi_Cam == 8:
-                        draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
-                    v3_focus = focus
-                    restart = 1
-                    text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
-                # arducam manual focus slider SQUARE FORMAT
-                elif (mousey > pre_height + (bh*2) and mousey < pre_height + (bh*2) + (bh/3)) and ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and foc_man == 1:
-                    focus = int(((mousex-((button_row - 8)*bw)) / bw)* pmax)
-                    if Pi_Cam == 5:
-                        draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
-                    if Pi_Cam == 6 or Pi_Cam == 8:
-                        draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
-                    v3_focus = focus
-                    restart = 1
-                    text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
-                #arducam manual focus buttons SQUARE FORMAT
-                elif mousey > pre_height + (bh*2) and mousey > pre_height + (bh*2) + (bh/3) and mousey < pre_height + (bh*2) + (bh/1.5) and ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and foc_man == 1:
-                    if button_pos == 0:
-                        focus -= 10
-                    elif button_pos == 1:
-                        focus += 10
-                    if Pi_Cam == 5:
-                        draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
-                    if Pi_Cam == 6 or Pi_Cam == 8:
-                        draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
-                    v3_focus = focus
-                    restart = 1
-                    text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
-                # Pi v3 manual focus slider
-                elif (mousex > pre_width + bw and mousey < ((button_row-1)*bh) + (bh/3)) and (Pi_Cam == 3 and v3_af == 1) and foc_man == 1:
-                    v3_focus = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin)) + pmin
-                    draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
-                    fd = 1/(v3_focus/100)
-                    text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
-                    restart = 1
-                # Pi v3 manual focus buttons
-                elif mousex > pre_width + bw and mousey > ((button_row-1)*bh) + (bh/3) and mousey < ((button_row-1)*bh) + (bh/1.5) and (Pi_Cam == 3 and v3_af == 1)  and foc_man == 1:
-                    if button_pos == 2:
-                        v3_focus -= 1
-                        v3_focus = max(v3_focus,pmin)
-                    elif button_pos == 3:
-                        v3_focus += 1
-                        v3_focus = min(v3_focus,pmax)
-                    draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
-                    fd = 1/(v3_focus/100)
-                    text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
-                    restart = 1
-                # Pi v3 manual focus slider SQUARE FORMAT, alt_dis == 1
-                elif (mousey > pre_height + (bh*2) and mousey < pre_height + (bh*2) + (bh/3)) and (Pi_Cam == 3 and v3_af == 1) and foc_man == 1 and alt_dis == 1:
-                    v3_focus = int(((mousex-((button_row - 1)*bw)) / bw)* pmax)
-                    draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
-                    fd = 1/(v3_focus/100)
-                    text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
-                    restart = 1
-                # Pi v3 manual focus slider SQUARE FORMAT, alt_dis == 2
-                elif (mousey > pre_height *.75 + (bh*2) and mousey < pre_height * .75 + (bh*2) + (bh/3)) and (Pi_Cam == 3 and v3_af == 1) and foc_man == 1 and alt_dis == 2:
-                    v3_focus = int(((mousex-((button_row - 1)*bw)) / bw)* pmax)
-                    draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
-                    fd = 1/(v3_focus/100)
-                    text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
-                    restart = 1
-                # Pi v3 manual focus buttons SQUARE FORMAT, alt_dis == 1
-                elif mousey > pre_height + (bh*2) and mousey > pre_height + (bh*2) + (bh/3) and mousey < pre_height + (bh*2) + (bh/1.5) and (Pi_Cam == 3 and v3_af == 1) and foc_man == 1 and alt_dis == 1:
-                    if button_pos == 0:
-                        v3_focus -= 1
-                        v3_focus = max(v3_focus,0.0)
-                    elif button_pos == 1:
-                        v3_focus += 1
-                    draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
-                    fd = 1/(v3_focus/100)
-                    text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
-                    restart = 1
-                # Pi v3 manual focus buttons SQUARE FORMAT, alt_dis == 2
-                elif mousey > pre_height * .75 + (bh*2) and mousey > pre_height * .75 + (bh*2) + (bh/3) and mousey < pre_height * .75 + (bh*2) + (bh/1.5) and (Pi_Cam == 3 and v3_af == 1) and foc_man == 1 and alt_dis == 2:
-                    if button_pos == 0:
-                        v3_focus -= 1
-                        v3_focus = max(v3_focus,0.0)
-                    elif button_pos == 1:
-                        v3_focus += 1
-                    draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
-                    fd = 1/(v3_focus/100)
-                    text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
-                    restart = 1
-                elif ((alt_dis == 0 and button_pos > 1) or (alt_dis > 0 and button_pos == 0)):
-                    # determine if camera native format
-                    vw = 0
-                    x = 0
-                    while x < len(vwidths2) and vw == 0:
-                        if vwidth == vwidths2[x]:
-                             if vheight == vheights2[x]:
-                                vw = 1
-                        x += 1
-                    # FOCUS button NON AF camera
-                    if (Pi_Cam != 3 and Pi_Cam != 5 and Pi_Cam != 6 and Pi_Cam != 8)  and focus_mode == 0:
-                        zoom = 4
-                        focus_mode = 1
-                        button(1,7,1,9)
-                        text(1,7,3,0,1,"FOCUS",ft,0)
-                        if Pi_Cam == 4 and zoom > 1:
-                            vformat = crop4_f[zoom]
-                            vwidth  = vwidths[vformat]
-                            vheight = vheights[vformat]
-                            text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                        else:
-                            text(1,3,3,1,1,str(pre_width) + "x" + str(pre_height),fv,11)
-                        button(1,8,1,9)
-                        text(1,8,2,0,1,"ZOOMED",ft,0)
-                        text(1,8,3,1,1,str(zoom),fv,0)
-                        draw_Vbar(0,1,8,dgryColor,'zoom',zoom)
-                        time.sleep(0.25)
-                        restart = 1
-                    # CANCEL FOCUS NON AF camera
-                    elif (Pi_Cam != 3 and Pi_Cam != 5 and Pi_Cam != 6 and Pi_Cam != 8) and focus_mode == 1:
-                        zoom = 0
-                        focus_mode = 0
-                        button(1,7,0,9)
-                        text(1,7,5,0,1,"FOCUS",ft,7)
-                        text(1,7,3,1,1,"",fv,7)
-                        if vw == 0:
-                            text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                        if vw == 1:
-                            text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                        button(1,8,0,9)
-                        text(1,8,5,0,1,"Zoom",ft,7)
-                        text(1,8,3,1,1,"",fv,7)
-                        draw_Vbar(0,1,8,greyColor,'zoom',zoom)
-                        restart = 1
-                    # Pi V3 manual focus    
-                    elif (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0:
-                        focus_mode = 1
-                        v3_f_mode = 1 
-                        foc_man = 1 
-                        button(1,7,1,9)
-                        restart = 1
-                        time.sleep(0.25)
-                        draw_Vbar(0,1,7,dgryColor,'v3_focus',v3_focus-pmin)
-                        fd = 1/(v3_focus/100)
-                        text(1,7,3,0,1,'<<< ' + str(fd)[0:5] + "m" + ' >>>',fv,0)
-                        text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,0)
-                        time.sleep(0.25)
-                    # ARDUCAM manual focus
-                    elif ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and v3_f_mode == 0:
-                        focus_mode = 1
-                        v3_f_mode = 1
-                        foc_man = 1 
-                        button(1,7,1,9)
-                        text(1,7,3,0,1,'<<< ' + str(focus) + ' >>>',fv,0)
-                        if Pi_Cam == 5:
-                            draw_Vbar(0,1,7,dgryColor,'v5_focus',focus)
-                        if Pi_Cam == 6 or Pi_Cam == 8:
-                            draw_Vbar(0,1,7,dgryColor,'v6_focus',focus)
-                        text(1,7,3,1,1,"manual",fv,0)
-                        time.sleep(0.25)
-                        restart = 1
-                    # ARDUCAM cancel manual focus
-                    elif ((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8) and foc_man == 1:
-                        focus_mode = 0
-                        foc_man = 0 
-                        if Pi_Cam == 8:
-                            v3_f_mode = 2 # continuous focus
-                        else:
-                            v3_f_mode = 0
-                        zoom = 0
-                        fxx = 0
-                        fxy = 0
-                        fxz = 1
-                        fyz = 0.75
-                        button(1,7,0,9)
-                        text(1,7,5,0,1,"FOCUS",ft,7)
-                        text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
-                        button(1,8,0,9)
-                        text(1,8,5,0,1,"Zoom",ft,7)
-                        text(1,8,3,1,1,"",fv,7)
-                        if vw == 0:
-                            text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                        if vw == 1:
-                            text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                        time.sleep(0.25)
-                        restart = 1
-                    # Pi V3 cancel manual focus
-                    elif (Pi_Cam == 3 and v3_af == 1)  and v3_f_mode == 1:
-                        focus_mode = 0
-                        v3_f_mode = 2 # continuous focus
-                        foc_man = 0
-                        zoom = 0
-                        fxx = 0
-                        fxy = 0
-                        fxz = 1
-                        fyz = 0.75
-                        if alt_dis < 2:
-                            pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,0,pre_width,pre_height))
-                        button(1,7,0,9)
-                        text(1,7,5,0,1,"FOCUS",ft,7)
-                        text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
-                        button(1,8,0,9)
-                        text(1,8,5,0,1,"Zoom",ft,7)
-                        text(1,8,3,1,1,"",fv,7)
-                        if vw == 0:
-                            text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                        if vw == 1:
-                            text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                        time.sleep(0.25)
-                        restart = 1
-                    # AF camera to AUTO
-                    elif ((Pi_Cam == 3 and v3_af == 1) or (((Pi_Cam == 5 and v5_af == 1) or Pi_Cam == 6 or Pi_Cam == 8))) and v3_f_mode == 2:
-                        focus_mode = 0
-                        v3_f_mode = 0 # auto focus
-                        foc_man = 0
-                        zoom = 0
-                        fxx = 0
-                        fxy = 0
-                        fxz = 1
-                        fyz = 0.75
-                        if alt_dis < 2:
-                            pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,0,pre_width,pre_height))
-                        button(1,7,0,9)
-                        text(1,7,5,0,1,"FOCUS",ft,7)
-                        text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
-                        button(1,8,0,9)
-                        text(1,8,5,0,1,"Zoom",ft,7)
-                        text(1,8,3,1,1,"",fv,7)
-                        if vw == 0:
-                            text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                        if vw == 1:
-                            text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                        time.sleep(0.25)
-                        restart = 1
-                time.sleep(.25)
-                
-            elif button_row == 9:
-                # ZOOM
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'zoom':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    zoom = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
-                    if zoom != 5 and igw/igh > 1.5 and alt_dis == 0:
-                        pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,int(pre_height * .75),pre_width,pre_height))
-                elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
-                    zoom = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
-                    if igw/igh > 1.5:
-                        pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,int(pre_height * .75),pre_width,pre_height/4))
-                elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
-                    zoom = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
-                elif ((alt_dis == 0 and mousex > pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 1)):
-                    zoom +=1
-                    zoom = min(zoom,pmax)
-                elif ((alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0)) and zoom > 0:
-                    zoom -=1
-                    if zoom != 5 and igw/igh > 1.5 and alt_dis == 0:
-                        pygame.draw.rect(windowSurfaceObj,(0,0,0),Rect(0,int(pre_height * .75),pre_width,pre_height))
-                if zoom < 2:
-                    if zoom == 0:
-                        button(1,8,0,9)
-                        text(1,8,5,0,1,"Zoom",ft,7)
-                        text(1,8,3,1,1,"",fv,7)
-                        draw_Vbar(0,1,8,greyColor,'zoom',zoom)
-                    else:
-                        button(1,8,1,9)
-                        text(1,8,2,0,1,"ZOOMED",ft,0)
-                        text(1,8,3,1,1,str(zoom),fv,0)
-                        draw_Vbar(0,1,8,dgryColor,'zoom',zoom)
-                        
-                    if foc_man == 0:
-                        button(1,7,0,9)
-                        text(1,7,5,0,1,"FOCUS",ft,7)
-                    # determine if camera native format
-                    vw = 0
-                    x = 0
-                    xx = int(pre_width/2)
-                    xy = int(pre_height/2)
-                    if igw/igh > 1.5:
-                        xy = int(xy * .75)
-                    while x < len(vwidths2) and vw == 0:
-                        if vwidth == vwidths2[x]:
-                             if vheight == vheights2[x]:
-                                vw = 1
-                        x += 1
-                    if vw == 0:
-                        text(1,3,3,1,1,str(vwidth) + "x" + str(vheight),fv,11)
-                    else:
-                        text(1,3,1,1,1,str(vwidth) + "x" + str(vheight),fv,11)
                     
+            else:
+                button(1,8,1,9)
+                text(1,8,2,0,1,"ZOOMED",ft,0)
+                text(1,8,3,1,1,str(zoom),fv,0)
+                if igw/igh > 1.5:
+                    text(1,3,3,1,1,str(pre_width) + "x" + str(int(pre_height * .75)),fv,11)
                 else:
-                    button(1,8,1,9)
-                    text(1,8,2,0,1,"ZOOMED",ft,0)
-                    text(1,8,3,1,1,str(zoom),fv,0)
-                    if Pi_Cam == 4 and zoom > 1 and PiHQ_ON == 1:
-                         vformat = crop4_f[zoom]
-                         vwidth  = vwidths[vformat]
-                         vheight = vheights[vformat]
-                         text(1,3,3,1,1,str(vwidth) + "x" + str(vheight) + " " + crop4_t[zoom],fv,11)
-                    elif igw/igh > 1.5:
-                        text(1,3,3,1,1,str(pre_width) + "x" + str(int(pre_height * .75)),fv,11)
-                    else:
-                        text(1,3,3,1,1,str(pre_width) + "x" + str(pre_height),fv,11)
-                    draw_Vbar(0,1,8,dgryColor,'zoom',zoom)
-                    draw_Vbar(0,1,3,lpurColor,'vformat',vformat)
-                if zoom > 0:
-                    fxx = 0
-                    fxy = 0
-                    fxz = 1
-                    fyz = 1
-                    if (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0:
-                        text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
-                restart = 1
-                time.sleep(.2)
-
-            elif button_row == 11:
-                # TIMELAPSE DURATION
-                bpos1 = 0
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'tduration':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    bpos1 = (mousex-pre_width-bw) / bw
-                    bpos4 = pow(bpos1,3)
-                    tduration = int(bpos4 * (pmax+1-pmin)) + 1
-                elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
-                    tduration = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
-                    tduration = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif event.button == 1:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        tduration -=1
-                        tduration = max(tduration,pmin)
-                    else:
-                        tduration +=1
-                        tduration = min(tduration,pmax)
-                    bpos1 = pow(tduration/(pmax-pmin),.333)
-                elif event.button == 3:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        tduration -=60
-                        tduration = max(tduration,pmin)
-                    else:
-                        tduration +=60
-                        tduration = min(tduration,pmax)
-                    bpos1 = pow(tduration/(pmax-pmin),.333)
-                elif event.button == 4 or event.button == 5:
-                    if event.button == 5:
-                        tduration -=600
-                        tduration = max(tduration,pmin)
-                    else:
-                        tduration +=600
-                        tduration = min(tduration,pmax)
-                    bpos1 = pow(tduration/(pmax-pmin),.333)
-                td = timedelta(seconds=tduration)
-                text(1,10,3,1,1,str(td),fv,12)
-                draw_Vbar(bpos1,1,10,lyelColor,'tduration',tduration)
-                if tinterval > 0:
-                    tshots = int(tduration / tinterval)
-                    text(1,12,3,1,1,str(tshots),fv,12)
-                else:
-                    text(1,12,3,1,1," ",fv,12)
-                if alt_dis == 0:
-                    for f in range(0,len(video_limits)-1,3):
-                        if video_limits[f] == 'tshots':
-                            pmin = video_limits[f+1]
-                            pmax = video_limits[f+2]
-                    bpos3 = pow(tshots/(pmax-pmin),.333)
-                else:
-                    bpos3 = 0
-                draw_Vbar(bpos3,1,12,lyelColor,'tshots',tshots)
-
-            elif button_row == 12:
-                # TIMELAPSE INTERVAL
-                bpos2 = 0
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'tinterval':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    bpos2 = (mousex-pre_width-bw) / bw
-                    bpos4 = pow(bpos2,3)
-                    tinterval = int(bpos4 * (pmax+1-pmin))
-                elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
-                    tinterval = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
-                    tinterval = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif event.button == 1:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        tinterval -=1
-                        tinterval = max(tinterval,pmin)
-                    else:
-                        tinterval +=1
-                        tinterval = min(tinterval,pmax)
-                    bpos2 = pow(tinterval/(pmax-pmin),.333)
-                elif event.button == 3:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        tinterval -=60
-                        tinterval = max(tinterval,pmin)
-                    else:
-                        tinterval +=60
-                        tinterval = min(tinterval,pmax)
-                    bpos2 = pow(tinterval/(pmax-pmin),.333)
-                elif event.button == 4 or event.button == 5:
-                    if event.button == 5:
-                        tinterval -=600
-                        tinterval = max(tinterval,pmin)
-                    else:
-                        tinterval +=600
-                        tinterval = min(tinterval,pmax)
-                    bpos2 = pow(tinterval/(pmax-pmin),.333)
-                text(1,9,1,0,1,"CAP T/LPSE",ft,7)
-                if tinterval == 0:
-                    text(1,9,1,1,1," ",ft,7)
-                else:
-                    text(1,9,3,1,1,str(st_scales[st_scale]),ft,7)
-                td = timedelta(seconds=tinterval)
-                text(1,11,3,1,1,str(td),fv,12)
-                draw_Vbar(bpos2,1,11,lyelColor,'tinterval',tinterval)
-                if tinterval != 0:
-                    tduration = tinterval * tshots
-                    td = timedelta(seconds=tduration)
-                    text(1,10,3,1,1,str(td),fv,12)
-                    if alt_dis == 0:
-                        for f in range(0,len(video_limits)-1,3):
-                            if video_limits[f] == 'tduration':
-                                pmin = video_limits[f+1]
-                                pmax = video_limits[f+2]
-                        bpos1 = pow(tduration/(pmax-pmin),.333)
-                    else:
-                        bpos1 = 0
-                    draw_Vbar(bpos1,1,10,lyelColor,'tduration',tduration)
-                if tinterval == 0:
-                    text(1,12,3,1,1," ",fv,12)
-                    if mode == 0:
-                        speed = 15
-                        shutter = shutters[speed]
-                        if shutter < 0:
-                            shutter = abs(1/shutter)
-                        sspeed = int(shutter * 1000000)
-                        if (shutter * 1000000) - int(shutter * 1000000) > 0.5:
-                            sspeed +=1
-                        if shutters[speed] < 0:
-                            text(0,2,3,1,1,"1/" + str(abs(shutters[speed])),fv,10)
-                        else:
-                            text(0,2,3,1,1,str(shutters[speed]),fv,10)
-                        draw_bar(0,2,lgrnColor,'speed',speed)
-                        restart = 1
-                else:
-                    text(1,12,3,1,1,str(tshots),fv,12)
-                
-            elif button_row == 13 and tinterval > 0:
-                # TIMELAPSE SHOTS
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'tshots':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                bpos3 = 0
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    bpos3 = (mousex-pre_width-bw) / bw
-                    bpos4 = pow(bpos3,3)
-                    tshots = int(bpos4 * (pmax+1-pmin)) + 1
-                elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
-                    tshots = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
-                    tshots = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
-                elif event.button == 1:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        tshots -=1
-                        tshots = max(tshots,pmin)
-                    else:
-                        tshots +=1
-                        tshots = min(tshots,pmax)
-                    bpos3 = pow(tshots/(pmax-pmin),.333)
-                elif event.button == 3:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        tshots -=20
-                        tshots = max(tshots,pmin)
-                    else:
-                        tshots +=20
-                        tshots = min(tshots,pmax)
-                    bpos3 = pow(tshots/(pmax-pmin),.333)
-                elif event.button == 4 or event.button == 5:
-                    if event.button == 5:
-                        tshots -=100
-                        tshots = max(tshots,pmin)
-                    else:
-                        tshots +=100
-                        tshots = min(tshots,pmax)
-                    bpos3 = pow(tshots/(pmax-pmin),.333)
-                text(1,12,3,1,1,str(tshots),fv,12)
-                draw_Vbar(bpos3,1,12,lyelColor,'tshots',tshots)
-                if tduration > 0:
-                    tduration = tinterval * tshots
-                if tduration == 0:
-                    tduration = 1
-                td = timedelta(seconds=tduration)
-                text(1,10,3,1,1,str(td),fv,12)
-                if alt_dis == 0:
-                    for f in range(0,len(video_limits)-1,3):
-                        if video_limits[f] == 'tduration':
-                            pmin = video_limits[f+1]
-                            pmax = video_limits[f+2]
-                    bpos1 = pow(tduration/(pmax-pmin),.333)
-                else:
-                    bpos1 = 0
-                draw_Vbar(bpos1,1,10,lyelColor,'tduration',tduration)
-
-
-            elif button_row == 15:
-                # HISTOGRAM SIZE
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'histarea':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    histarea = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
-                    histarea = max(histarea,pmin)
-                elif (mousey > pre_height + (bh*3)  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
-                    histarea = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
-                    histarea = max(histarea,pmin)
-                elif (mousey > pre_height * .75 + (bh*3)  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
-                    histarea = int(((mousex-((button_row -9)*bw)) / bw) * (pmax+1-pmin))
-                    histarea = max(histarea,pmin)
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        histarea -=1
-                        histarea = max(histarea,pmin)
-                    else:
-                        histarea +=1
-                        histarea = min(histarea,pmax)
-                if xx - histarea < 0 or xy - histarea < 0:
-                    histarea = old_histarea
-                if xy + histarea > pre_height or xx + histarea > pre_width:
-                    histarea = old_histarea
-                if (Pi_Cam == 3 and v3_af == 1) and (xy + histarea > pre_height * 0.75 or xx + histarea > pre_width):
-                    histarea = old_histarea
-                text(1,14,3,1,1,str(histarea),fv,7)
-                draw_Vbar(0,1,14,greyColor,'histarea',histarea)
-                old_histarea = histarea
-                time.sleep(.25)
-
-            elif button_row == 16 and (Pi_Cam == 3 and v3_af == 1):
-                # V3 FOCUS RANGE 
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'v3_f_range':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    v3_f_range = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + bh  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
-                    v3_f_range = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
-                    v3_f_range = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        v3_f_range-=1
-                        v3_f_range = max(v3_f_range,pmin)
-                    else:
-                        v3_f_range +=1
-                        v3_f_range = min(v3_f_range,pmax)
-                text(1,15,3,1,1,v3_f_ranges[v3_f_range],fv,7)
-                draw_Vbar(0,1,15,greyColor,'v3_f_range',v3_f_range)
-                restart = 1
-                time.sleep(.25)
-
-            elif button_row == 16 and Pi_Cam != 3:
-                # EXT TRIGGER (NOT v3 camera)
-                for f in range(0,len(video_limits)-1,3):
-                    if video_limits[f] == 'str_cap':
-                        pmin = video_limits[f+1]
-                        pmax = video_limits[f+2]
-                if (mousex > pre_width and mousey < ((button_row-1)*bh) + int(bh/3)):
-                    str_cap = int(((mousex-pre_width-bw) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height + bh  and mousey < pre_height + (bh*3) + int(bh/3)) and alt_dis == 1:
-                    str_cap = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                elif (mousey > pre_height * .75 + bh  and mousey < pre_height * .75 + (bh*3) + int(bh/3)) and alt_dis == 2:
-                    str_cap = int(((mousex-((button_row - 9)*bw)) / bw) * (pmax+1-pmin))
-                else:
-                    if (alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0):
-                        str_cap -=1
-                        str_cap = max(str_cap,pmin)
-                    else:
-                        str_cap +=1
-                        str_cap = min(str_cap,pmax)
-                text(1,15,3,1,1,strs[str_cap],fv,7)
-                draw_Vbar(0,1,15,greyColor,'str_cap',str_cap)
-                restart = 1
-                time.sleep(.25)
-
-            elif button_row == 17:
-                # HORIZONTAL FLIP
-                hflip += 1
-                if hflip > 1:
-                    hflip = 0
-                text(1,16,3,1,1,str(hflip),fv,7)
-                restart = 1
-                time.sleep(.25)
-                
-            if button_row == 18:
-                # SAVE VIDEO TO RAM
-                save2ram +=1
-                if save2ram > 1:
-                    save2ram = 0
-                    text(1,17,3,1,1,"OFF",fv,7)
-                else:
-                    text(1,17,3,1,1,"ON",fv,7)
-                #restart = 1
-                time.sleep(.25)
-                
-            elif button_row == 14:
-                if ((alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0)) and event.button != 3:
-                   # SAVE CONFIG
-                   text(1,13,3,1,1,"Config",fv,7)
-                   config[0] = mode
-                   config[1] = speed
-                   config[2] = gain
-                   config[3] = int(brightness)
-                   config[4] = int(contrast)
-                   config[5] = frame
-                   config[6] = int(red)
-                   config[7] = int(blue)
-                   config[8] = ev
-                   config[9] = vlen
-                   config[10] = fps
-                   config[11] = vformat
-                   config[12] = codec
-                   config[13] = tinterval
-                   config[14] = tshots
-                   config[15] = extn
-                   config[16] = zx
-                   config[17] = zy
-                   config[18] = zoom
-                   config[19] = int(saturation)
-                   config[20] = meter
-                   config[21] = awb
-                   config[22] = sharpness
-                   config[23] = int(denoise)
-                   config[24] = quality
-                   config[25] = profile
-                   config[26] = level
-                   config[27] = histogram
-                   config[28] = histarea
-                   config[29] = v3_f_speed
-                   config[30] = v3_f_range
-                   config[31] = rotate
-                   config[32] = IRF
-                   config[33] = str_cap
-                   config[34] = v3_hdr
-                   config[35] = timet
-                   config[36] = vflip
-                   config[37] = hflip
-                   config[38] = bitrate
-                   config[39] = st_scale
-                   with open(config_file + str(camera) + ".txt", 'w') as f:
-                      for item in range(0,len(titles)):
-                          f.write(titles[item] + " : " + str(config[item]) + "\n")
-                   time.sleep(1)
-                   text(1,13,2,1,1,"Config",fv,7)
-                   
-                # read config_file
-                elif ((alt_dis == 0 and mousex < pre_width + bw + (bw/2)) or (alt_dis > 0 and button_pos == 0)) and event.button == 3:
-                    text(1,13,3,0,1,"Load      EXIT",fv +2,7)
-                    text(1,13,3,1,1,"Config",fv,7)
-                    if os.path.exists(config_file + str(camera) + ".txt"):
-                        config = []
-                        with open(config_file + str(camera) + ".txt", "r") as file:
-                           line = file.readline()
-                           while line:
-                               line = line.strip()
-                               item = line.split(" : ")
-                               config.append(item[1])
-                               line = file.readline()
-                        config = list(map(int,config))
-
-                        mode        = config[0]
-                        speed       = config[1]
-                        gain        = config[2]
-                        brightness  = config[3]
-                        contrast    = config[4]
-                        red         = config[6]
-                        blue        = config[7]
-                        ev          = config[8]
-                        vlen        = config[9]
-                        fps         = config[10]
-                        vformat     = config[11]
-                        codec       = config[12]
-                        tinterval   = config[13]
-                        tshots      = config[14]
-                        extn        = config[15]
-                        zx          = config[16]
-                        zy          = config[17]
-                        zoom        = 0
-                        saturation  = config[19]
-                        meter       = config[20]
-                        awb         = config[21]
-                        sharpness   = config[22]
-                        denoise     = config[23]
-                        quality     = config[24]
-                        profile     = config[25]
-                        level       = config[26]
-                        histogram   = config[27]
-                        histarea    = config[28]
-                        v3_f_speed  = config[29]
-                        v3_f_range  = config[30]
-                        rotate      = config[31]
-                        IRF         = config[32]
-                        str_cap     = config[33]
-                        v3_hdr      = config[34]
-                        timet       = config[35]
-                        vflip       = config[36]
-                        hflip       = config[37]
-                        bitrate     = config[38]
-                        st_scale    = config[39]
-                        if Pi_Cam != 4 and Pi_Cam != 6 and Pi_Cam != 8 and st_scale == 8:
-                            st_scale = 4
-                        bits        = bitrate * 1000000
-                        if tinterval > 0:
-                            tduration = tinterval * tshots
-                        else:
-                            tduration = 5
-                        time.sleep(1)
-                        text(1,13,2,0,1,"Save      EXIT",fv +2,7)
-                        text(1,13,2,1,1,"Config",fv,7)
-                        Menu()
-                        Menu2()
-                        os.killpg(p.pid, signal.SIGTERM)
-                        preview()
-                else:
-                   os.killpg(p.pid, signal.SIGTERM)
-                   pygame.display.quit()
-                   sys.exit()
+                    text(1,3,3,1,1,str(pre_width) + "x" + str(pre_height),fv,11)
+                draw_Vbar(0,1,8,dgryColor,'zoom',zoom)
+            if zoom > 0:
+                fxx = 0
+                fxy = 0
+                fxz = 1
+                fyz = 1
+                if (Pi_Cam == 3 and v3_af == 1) and v3_f_mode == 0:
+                    text(1,7,3,1,1,str(v3_f_modes[v3_f_mode]),fv,7)
+            restart = 1
+            time.sleep(.2) 
+                       
+        # SWITCH CAMERA (right mouse button)
+        if mousex < pre_width and mousey < pre_height and mousex != 0 and mousey != 0 and event.button == 3:
+            camera += 1
+            if camera > max_camera:
+                camera = 0
+            stop_preview()
+            focus_mode = 0
+            v3_f_mode = 0 
+            foc_man = 0
+            Camera_Version()
+            read_config()
+            Menu()
+            Menu2()
+            restart = 1
+
+        # HISTOGRAM SIZE IF ZOOMED (Mouse Wheel)
+        if mousex < pre_width and mousey < pre_height and mousex != 0 and mousey != 0 and (event.button == 4 or event.button == 5) and zoom > 0:
+            for f in range(0,len(video_limits)-1,3):
+                if video_limits[f] == 'histarea':
+                    pmin = video_limits[f+1]
+                    pmax = video_limits[f+2]
+            if event.button == 5:
+                histarea -=1
+                histarea = max(histarea,pmin)
+            else:
+                histarea +=1
+                histarea = min(histarea,pmax)
+            if xx - histarea < 0 or xy - histarea < 0:
+                histarea = old_histarea
+            if xy + histarea > pre_height or xx + histarea > pre_width:
+                histarea = old_histarea
+            if (Pi_Cam == 3 and v3_af == 1) and (xy + histarea > pre_height * 0.75 or xx + histarea > pre_width):
+                histarea = old_histarea
+            text(1,14,3,1,1,str(histarea),fv,7)
+            draw_Vbar(0,1,14,greyColor,'histarea',histarea)
+            old_histarea = histarea
+
+        if mousex == 0 and mousey == 0:
+            str_btn = 1
+        # determine button pressed
+        if (mousex > pre_width or (alt_dis ==1 and mousey > pre_height)or (alt_dis ==2 and mousey > pre_height *.75)) or str_btn == 1:
+          button_column,button_row,button_pos = cell_at(mousex,mousey)
+                      
+          # capture on STR button press
+          if str_btn == 1:
+              if str_cap == 0:
+                  button_column = 1
+                  button_row = 1
+              elif str_cap == 1 or str_cap == 2:
+                  button_column = 2
+                  button_row = 1
+              elif str_cap == 3:
+                  button_column = 2
+                  button_row = 10
+              str_btn = 0
+          
+          handler = button_keys.get((button_column,button_row))
+          if handler != None:
+              handler()
                      
-        # RESTART
-        if restart > 0:
-            poll = p.poll()
-            if poll == None:
-                os.killpg(p.pid, signal.SIGTERM)
-            if rotate == 0:
-                text(0,0,6,2,1,"Waiting for preview ...",int(fv*1.7),1)
-                time.sleep(1)
-            preview()
+        handled = 1
+
+    # RESTART, once for all the presses handled so far. A running camera session takes the changes at once,
+    # a restart of rpicam-vid waits until no button has been pressed for restart_quiet seconds
+    if restart > 0 and ((sess_type > 0 and session_key() == sess_key) or time.monotonic() - press_time >= restart_quiet):
+        update_preview(1)
+        restart = 0
+        handled = 1
+
+    # show anything the handlers drew outside the button, text and bar areas
+    if handled == 1:
+        pygame.display.update()
+        handled = 0
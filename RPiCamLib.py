@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Gordon999
+# SPDX-License-Identifier: MIT
+
+"""Copyright (c) 2026
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE."""
+
+# Helpers shared by RPiCamGUI.py and RPiCamera.py. They only work on their arguments, the scripts' own
+# settings and state are passed in, so this file is the one copy of them. Keep it next to the two scripts.
+#
+# The helpers that still read the scripts' globals (preview pipe and camera session, analysis scheduler,
+# text and button drawing, press handling) are kept in each script. RPiCamGUI.py holds the reference copy
+# and RPiCamera.py follows it, except where its one column layout and fixed preview size make it differ
+# on purpose: layout(), cell_at(), preview_target(), zoom_crop(), scale_surface() and scale_rgb().
+
+import numpy as np
+import cv2
+import pygame
+
+hist_yy = np.arange(0,100)
+
+def jpeg_size(jpg):
+    # read width and height from the jpeg SOF header without decoding, returns None if not found
+    i = 2
+    while i + 9 < len(jpg):
+        if jpg[i] != 0xff:
+            return None
+        marker = jpg[i + 1]
+        if marker in (0xc0,0xc1,0xc2):
+            return (jpg[i + 7] << 8) + jpg[i + 8],(jpg[i + 5] << 8) + jpg[i + 6]
+        if marker == 0xd9 or marker == 0xda:
+            return None
+        i += 2 + (jpg[i + 2] << 8) + jpg[i + 3]
+    return None
+
+def yuv_release(frm):
+    # give the buffer of a yuv420 frame back to its reader once it has been converted or dropped
+    if type(frm) == tuple:
+        frm[4].append(frm[0])
+
+def yuv_rgb(frm,out,size):
+    # convert a yuv420 frame to RGB at size (w,h, the size the main loop shows it). The scaled planes go in out (a new
+    # array if None or the wrong size), returns out,rgb
+    buf,w,h,stride,free = frm
+    ys = stride * h
+    cs = (stride // 2) * (h // 2)
+    Y = buf[0:ys].reshape(h,stride)[:,0:w]
+    U = buf[ys:ys + cs].reshape(h // 2,stride // 2)[:,0:w // 2]
+    V = buf[ys + cs:ys + (cs * 2)].reshape(h // 2,stride // 2)[:,0:w // 2]
+    tw,th = size
+    tw = (tw // 2) * 2
+    th = (th // 2) * 2
+    if out is None or out.shape != ((th * 3) // 2,tw):
+        out = np.empty(((th * 3) // 2,tw),dtype=np.uint8)
+    flat = out.reshape(-1)
+    cs = (tw // 2) * (th // 2)
+    out[0:th] = cv2.resize(Y,(tw,th),interpolation=cv2.INTER_AREA)
+    flat[tw * th:(tw * th) + cs] = cv2.resize(U,(tw // 2,th // 2),interpolation=cv2.INTER_AREA).reshape(-1)
+    flat[(tw * th) + cs:] = cv2.resize(V,(tw // 2,th // 2),interpolation=cv2.INTER_AREA).reshape(-1)
+    rgb = cv2.cvtColor(out,cv2.COLOR_YUV2RGB_I420)
+    return out,rgb
+
+def fake_frame(pw,ph,t,ctrls):
+    # moving test pattern for preview_backend 2, follows brightness, contrast and colour gains of the session controls ctrls
+    x = (np.arange(pw,dtype=np.float32) * (255/pw) + t * 4) % 256
+    y = np.arange(ph,dtype=np.float32) * (255/ph)
+    frm = np.empty((ph,pw,3),dtype=np.float32)
+    frm[:,:,0] = x[None,:]
+    frm[:,:,1] = y[:,None]
+    frm[:,:,2] = ((np.arange(ph)[:,None] // 32 + np.arange(pw)[None,:] // 32 + t // 10) % 2) * 255
+    if ctrls.get("AwbEnable",True) == False:
+        frm[:,:,0] *= ctrls["ColourGains"][0]/2
+        frm[:,:,2] *= ctrls["ColourGains"][1]/2
+    frm = (frm - 128) * ctrls.get("Contrast",1) + 128 + ctrls.get("Brightness",0) * 255
+    return np.clip(frm,0,255).astype(np.uint8)
+
+def small_rgb(image,w,h):
+    # the preview frame scaled to w x h as an RGB array (rows,columns,3)
+    return np.frombuffer(pygame.image.tostring(pygame.transform.scale(image,(w,h)),"RGB"),dtype=np.uint8).reshape(h,w,3)
+
+def tile_scores(gray,tile_cols,tile_rows):
+    # focus scores of every tile of a tile_rows x tile_cols grid over gray, each metric is a whole frame filter followed by
+    # per tile means. Returns an array 3 x tile_rows x tile_cols of Laplacian variance, Tenengrad and Brenner scores
+    th = gray.shape[0] // tile_rows
+    tw = gray.shape[1] // tile_cols
+    g = gray[0:th * tile_rows,0:tw * tile_cols].astype(np.float32)
+    lap = cv2.Laplacian(g,cv2.CV_32F)
+    gx = cv2.Sobel(g,cv2.CV_32F,1,0)
+    gy = cv2.Sobel(g,cv2.CV_32F,0,1)
+    bren = np.zeros_like(g)
+    bren[:,0:-2] = (g[:,2:] - g[:,0:-2]) ** 2
+    means = np.stack((lap,lap * lap,(gx * gx) + (gy * gy),bren)).reshape(4,tile_rows,th,tile_cols,tw).mean((2,4))
+    return np.stack((means[1] - (means[0] ** 2),means[2],means[3]))
+
+def hist_counts(crop,gray,gray3):
+    # counts of the 256 levels of luminance, red, green and blue in the histogram area, and of luminance in the
+    # noise area (gray3, None if not wanted), one np.bincount pass each. Returns an array of rows lum,red,green,blue(,noise)
+    rows = [gray,crop[:,:,0],crop[:,:,1],crop[:,:,2]]
+    if gray3 is not None:
+        rows.append(gray3)
+    counts = np.zeros((len(rows),256),dtype=np.int64)
+    for r in range(0,len(rows)):
+        counts[r] = np.bincount(rows[r].ravel(),minlength=256)[0:256]
+    return counts
+
+def hist_log(counts):
+    # scale histogram counts for the graph, 25 * log10(count), 0 stays 0
+    return (25 * np.log10(np.maximum(counts,1))).astype(int)
+
+def hist_trace(v):
+    # mask of the 256 x 100 graph pixels on the line joining the scaled counts v of successive levels, as the original loops drew it
+    prev = np.concatenate(([0],v[0:255]))
+    lo = np.where(v > prev,prev,v + 1)
+    hi = np.where(v > prev,v,prev + 1)
+    return (hist_yy >= lo[:,None]) & (hist_yy < hi[:,None]) & (v > 0)[:,None]